@@ -7,6 +7,8 @@ It supports different animation types and durations.
 
 from typing import Dict, Any, List, Optional, Union
 
+from svg_metrics import instrumented
+
 def generate_simple_animation(prompt: str, duration: int = 2000, 
                               animation_type: str = "simple") -> Dict[str, str]:
     """
@@ -372,6 +374,7 @@ def extract_animation_elements(prompt: str) -> Dict[str, Any]:
     return animation_elements
 
 
+@instrumented
 def generate_svg_animation(prompt: str, duration: int = 2000, 
                           animation_type: str = "simple") -> Dict[str, Any]:
     """
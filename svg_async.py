@@ -0,0 +1,261 @@
+"""
+SVG Async Module for SVG-MCP.
+
+This module provides asyncio entry points for the SVG-MCP tools. Calls are
+offloaded to a thread or process pool so CPU-bound work (optimization,
+transformation) never blocks the event loop, with backpressure (a limit on
+running calls and a bounded wait queue), cancellation and per-call timeouts.
+
+A timed-out or cancelled call that has already started keeps its worker until
+it finishes (Python cannot interrupt it), but the slot stays taken until then,
+so a slow document delays only the calls queued behind the pool limit.
+"""
+
+import os
+import asyncio
+import weakref
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+
+from svg_animation import generate_svg_animation
+from svg_components import get_svg_component
+from svg_interactivity import add_svg_interactivity
+from svg_manipulation import transform_svg_element
+from svg_optimization import optimize_svg
+from svg_recolor import recolor_svg
+
+
+class SVGServiceBusy(Exception):
+    """Raised when a call is rejected because the wait queue is full."""
+
+
+class AsyncSVGExecutor:
+    """Worker pool with bounded concurrency for running SVG-MCP calls from asyncio."""
+
+    def __init__(self, max_workers: Optional[int] = None, use_processes: bool = False,
+                 max_in_flight: Optional[int] = None, max_queue: int = 100,
+                 default_timeout: Optional[float] = None):
+        """
+        Create an executor.
+
+        Args:
+            max_workers: Pool size (defaults to the CPU count)
+            use_processes: Use a process pool (true parallelism for CPU-bound
+                calls) instead of threads
+            max_in_flight: Calls allowed in the pool at once from each event loop
+                (defaults to max_workers)
+            max_queue: Calls allowed to wait for a slot; further calls are
+                rejected with SVGServiceBusy
+            default_timeout: Timeout in seconds for calls that do not set one
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.max_in_flight = max_in_flight or self.max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor: Executor = executor_class(max_workers=self.max_workers)
+        # asyncio semaphores belong to the loop that first waits on them, so
+        # each event loop using the executor gets its own
+        self._slots_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._queued = 0
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0, "cancelled": 0}
+
+    def _slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        slots = self._slots_by_loop.get(loop)
+        if slots is None:
+            slots = self._slots_by_loop[loop] = asyncio.Semaphore(self.max_in_flight)
+        return slots
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently holding a slot."""
+        return sum(self.max_in_flight - slots._value for slots in list(self._slots_by_loop.values()))
+
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting for a slot."""
+        return self._queued
+
+    async def run(self, func: Callable[..., Any], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Run a function in the pool.
+
+        Args:
+            func: The function to call (must be picklable with a process pool)
+            *args: Positional arguments for the function
+            timeout: Seconds to wait, including time spent queued (defaults to
+                the executor's default_timeout)
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's return value
+
+        Raises:
+            SVGServiceBusy: If the wait queue is full
+            asyncio.TimeoutError: If the call did not finish in time
+            asyncio.CancelledError: If the awaiting task was cancelled
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        slots = self._slots(loop)
+
+        if slots.locked() and self._queued >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise SVGServiceBusy(f"Queue full ({self.max_queue} calls waiting)")
+
+        self._queued += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise
+        finally:
+            self._queued -= 1
+
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            slots.release()
+            raise
+
+        def release_slot(_) -> None:
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                # The loop has been closed; its slots went with it
+                pass
+
+        # The slot is released when the work ends, not when the caller stops waiting
+        future.add_done_callback(release_slot)
+
+        remaining = max(0.0, deadline - loop.time()) if deadline is not None else None
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), remaining)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.stats["timed_out"] += 1
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            self.stats["cancelled"] += 1
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        self.stats["completed"] += 1
+        return result
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = True) -> None:
+        """Shut the pool down, cancelling calls that have not started."""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+
+_default_executor: Optional[AsyncSVGExecutor] = None
+
+
+def configure_async_executor(**options: Any) -> AsyncSVGExecutor:
+    """
+    Replace the executor used by the *_async functions.
+
+    Args:
+        **options: AsyncSVGExecutor arguments
+
+    Returns:
+        The new default executor
+    """
+    global _default_executor
+    if _default_executor is not None:
+        _default_executor.shutdown(wait=False)
+    _default_executor = AsyncSVGExecutor(**options)
+    return _default_executor
+
+
+def get_async_executor() -> AsyncSVGExecutor:
+    """Get the default executor, creating a thread pool executor on first use."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = AsyncSVGExecutor()
+    return _default_executor
+
+
+async def optimize_svg_async(svg_code: str, level: str = "standard", *,
+                             timeout: Optional[float] = None,
+                             executor: Optional[AsyncSVGExecutor] = None,
+                             **options: Any) -> Dict[str, Any]:
+    """Async variant of optimize_svg (extra options are passed through)."""
+    return await (executor or get_async_executor()).run(
+        optimize_svg, svg_code, level, timeout=timeout, **options)
+
+
+async def transform_svg_element_async(svg_code: str, selector: str, transform: Dict[str, Any],
+                                      return_patch: bool = False, *,
+                                      timeout: Optional[float] = None,
+                                      executor: Optional[AsyncSVGExecutor] = None) -> Dict[str, Any]:
+    """Async variant of transform_svg_element."""
+    return await (executor or get_async_executor()).run(
+        transform_svg_element, svg_code, selector, transform, return_patch, timeout=timeout)
+
+
+async def generate_svg_animation_async(prompt: str, duration: int = 2000,
+                                       animation_type: str = "simple", *,
+                                       timeout: Optional[float] = None,
+                                       executor: Optional[AsyncSVGExecutor] = None) -> Dict[str, Any]:
+    """Async variant of generate_svg_animation."""
+    return await (executor or get_async_executor()).run(
+        generate_svg_animation, prompt, duration, animation_type, timeout=timeout)
+
+
+async def get_svg_component_async(component_type: str, variant: str, *,
+                                  timeout: Optional[float] = None,
+                                  executor: Optional[AsyncSVGExecutor] = None,
+                                  **options: Any) -> Dict[str, Any]:
+    """Async variant of get_svg_component (size, color, palette, ... are passed through)."""
+    return await (executor or get_async_executor()).run(
+        get_svg_component, component_type, variant, timeout=timeout, **options)
+
+
+async def add_svg_interactivity_async(svg_code: str, interaction_type: str, selector: str,
+                                      configuration: Dict[str, Any], *,
+                                      timeout: Optional[float] = None,
+                                      executor: Optional[AsyncSVGExecutor] = None,
+                                      **options: Any) -> Dict[str, Any]:
+    """Async variant of add_svg_interactivity (mode, minify, ... are passed through)."""
+    return await (executor or get_async_executor()).run(
+        add_svg_interactivity, svg_code, interaction_type, selector, configuration,
+        timeout=timeout, **options)
+
+
+async def recolor_svg_async(svg_code: str, palette: Any = "default", *,
+                            timeout: Optional[float] = None,
+                            executor: Optional[AsyncSVGExecutor] = None,
+                            **options: Any) -> Dict[str, Any]:
+    """Async variant of recolor_svg."""
+    return await (executor or get_async_executor()).run(
+        recolor_svg, svg_code, palette, timeout=timeout, **options)
+
+
+async def gather_bounded(calls: List[Callable[[], Any]]) -> List[Any]:
+    """
+    Await many *_async calls, returning exceptions in place of failed results.
+
+    Args:
+        calls: Zero-argument callables returning awaitables, e.g.
+            lambda: optimize_svg_async(code)
+
+    Returns:
+        Results (or exceptions) in input order
+    """
+    return await asyncio.gather(*(call() for call in calls), return_exceptions=True)
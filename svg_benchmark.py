@@ -0,0 +1,454 @@
+"""
+SVG Benchmark Module for SVG-MCP.
+
+This module benchmarks the SVG-MCP entry points against a synthetic corpus of
+representative documents (icons, path-heavy maps, deeply nested groups and
+text-heavy charts) at several sizes. It measures throughput, latency
+percentiles and peak memory, writes the results as JSON and compares two runs
+to flag regressions.
+
+Import time of the modules is measured in fresh interpreters (benchmark
+'import'), so regressions in startup cost are caught like any other.
+
+Selection is benchmarked on ElementTree and on the compact document
+(benchmark 'select_elements_compact'); the 'huge' corpus size, for comparing
+them on documents of over a hundred thousand elements, only runs on request.
+
+Usage:
+    python svg_benchmark.py run --output results.json
+    python svg_benchmark.py run --sizes huge --filter select_elements
+    python svg_benchmark.py compare baseline.json results.json --threshold 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from svg_animation import generate_svg_animation
+from svg_components import get_svg_component
+from svg_interactivity import add_svg_interactivity
+from svg_manipulation import SVGSelector, transform_svg_element
+from svg_optimization import optimize_svg
+
+# Number of repeated features per corpus size
+CORPUS_SIZES = {"small": 1, "medium": 10, "large": 100, "huge": 2000}
+
+# Sizes run unless others are requested
+DEFAULT_SIZES = ["small", "medium", "large"]
+
+CORPUS_KINDS = ["icon", "map", "nested", "chart"]
+
+# Selector targeting the dominant element of each corpus kind
+KIND_SELECTORS = {"icon": "path", "map": "path", "nested": "rect", "chart": "text"}
+
+# Metrics compared between runs; 'higher' metrics regress when they drop
+COMPARED_METRICS = {
+    "p50_ms": "lower",
+    "p90_ms": "lower",
+    "p99_ms": "lower",
+    "ops_per_sec": "higher",
+    "peak_memory_bytes": "lower",
+}
+
+# Modules whose import time is benchmarked
+STARTUP_MODULES = ["svg_mcp", "svg_optimization", "svg_manipulation", "svg_components",
+                   "svg_animation", "svg_interactivity", "svg_server"]
+
+# Times an import in a fresh interpreter, after the interpreter's own startup
+STARTUP_SCRIPT = ("import sys, time; start = time.perf_counter(); import {module}; "
+                  "sys.stdout.write(repr(time.perf_counter() - start))")
+
+SVG_HEADER = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {w} {h}" width="{w}" height="{h}">'
+
+
+def _number(rng: random.Random, low: float, high: float) -> str:
+    """Random coordinate with the long decimals editors tend to emit."""
+    return f"{rng.uniform(low, high):.6f}"
+
+
+def _icon_svg(rng: random.Random, scale: int) -> str:
+    parts = [SVG_HEADER.format(w=24, h=24),
+             '<!-- generated icon -->',
+             '<metadata><rdf>editor data</rdf></metadata>']
+    for i in range(5 * scale):
+        points = " ".join(f"L{_number(rng, 0, 24)} {_number(rng, 0, 24)}" for _ in range(4))
+        parts.append(f'  <path id="p{i}" d="M{_number(rng, 0, 24)} {_number(rng, 0, 24)} {points} Z" '
+                     f'style="fill:none; stroke:#333333; stroke-width:2"/>')
+    parts.append('</svg>')
+    return "\n".join(parts)
+
+
+def _map_svg(rng: random.Random, scale: int) -> str:
+    parts = [SVG_HEADER.format(w=1000, h=600)]
+    for region in range(20 * scale):
+        cx, cy = rng.uniform(50, 950), rng.uniform(50, 550)
+        points = []
+        for step in range(40):
+            points.append(f"L{cx + rng.uniform(-40, 40):.5f},{cy + rng.uniform(-40, 40):.5f}")
+        parts.append(f'  <g class="region r{region % 7}">\n'
+                     f'    <path d="M{cx:.5f},{cy:.5f} {" ".join(points)} Z" fill="#{rng.randrange(0xffffff):06x}" '
+                     f'stroke="#ffffff" stroke-width="0.5"/>\n'
+                     f'  </g>')
+    parts.append('</svg>')
+    return "\n".join(parts)
+
+
+def _nested_svg(rng: random.Random, scale: int, depth: int = 20) -> str:
+    parts = [SVG_HEADER.format(w=500, h=500)]
+    for branch in range(3 * scale):
+        for level in range(depth):
+            parts.append("  " * (level + 1) +
+                         f'<g transform="translate({_number(rng, -2, 2)} {_number(rng, -2, 2)})" '
+                         f'class="level{level}">')
+        parts.append("  " * (depth + 1) +
+                     f'<rect x="{_number(rng, 0, 480)}" y="{_number(rng, 0, 480)}" width="10" height="10" '
+                     f'fill="#{rng.randrange(0xffffff):06x}"/>')
+        parts.append("  " * (depth + 1) + '<g></g>')
+        for level in range(depth - 1, -1, -1):
+            parts.append("  " * (level + 1) + '</g>')
+    parts.append('</svg>')
+    return "\n".join(parts)
+
+
+def _chart_svg(rng: random.Random, scale: int) -> str:
+    bars = 30 * scale
+    width = max(800, bars * 12)
+    parts = [SVG_HEADER.format(w=width, h=400),
+             '  <style>.label { font-family: sans-serif; font-size: 10px; }</style>']
+    for tick in range(11):
+        y = 380 - tick * 36
+        parts.append(f'  <line x1="40" y1="{y}" x2="{width}" y2="{y}" stroke="#dddddd"/>')
+        parts.append(f'  <text class="label" x="35" y="{y}" text-anchor="end">{tick * 10}</text>')
+    for bar in range(bars):
+        value = rng.uniform(0, 360)
+        x = 45 + bar * 12
+        parts.append(f'  <rect x="{x}" y="{380 - value:.4f}" width="8" height="{value:.4f}" fill="#3498db"/>')
+        parts.append(f'  <text class="label" x="{x + 4}" y="395" transform="rotate(45 {x + 4} 395)">'
+                     f'Category {bar} ({value:.2f})</text>')
+    parts.append('</svg>')
+    return "\n".join(parts)
+
+
+CORPUS_GENERATORS: Dict[str, Callable[[random.Random, int], str]] = {
+    "icon": _icon_svg,
+    "map": _map_svg,
+    "nested": _nested_svg,
+    "chart": _chart_svg,
+}
+
+
+def generate_corpus(kinds: Optional[List[str]] = None, sizes: Optional[List[str]] = None,
+                    seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate the synthetic benchmark corpus.
+
+    Args:
+        kinds: Document kinds to generate (defaults to CORPUS_KINDS)
+        sizes: Corpus sizes to generate (defaults to DEFAULT_SIZES)
+        seed: Random seed, so the corpus is identical between runs
+
+    Returns:
+        List of documents with 'name', 'kind', 'size' and 'svg_code'
+    """
+    corpus = []
+    for kind in kinds or CORPUS_KINDS:
+        for size in sizes or DEFAULT_SIZES:
+            rng = random.Random(f"{seed}-{kind}-{size}")
+            corpus.append({
+                "name": f"{kind}-{size}",
+                "kind": kind,
+                "size": size,
+                "svg_code": CORPUS_GENERATORS[kind](rng, CORPUS_SIZES[size])
+            })
+    return corpus
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(percentile / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def measure(func: Callable[[], Any], iterations: int = 20, warmup: int = 2,
+            input_bytes: int = 0, time_budget: float = 5.0) -> Dict[str, Any]:
+    """
+    Measure latency, throughput and peak memory of a callable.
+
+    Peak memory is taken from a separate traced call so tracing does not
+    distort the latency figures.
+
+    Args:
+        func: Callable taking no arguments
+        iterations: Maximum number of timed calls
+        warmup: Number of untimed calls made first
+        input_bytes: Size of the input, used to report MB/s
+        time_budget: Seconds of timed calls after which the case stops early;
+            a case whose first call exceeds the budget is measured once and
+            its peak memory is not traced
+
+    Returns:
+        Dictionary of measurements
+    """
+    # The first call doubles as warm-up and tells whether the case fits the budget
+    start = time.perf_counter()
+    func()
+    first_call = time.perf_counter() - start
+
+    latencies = []
+    peak_memory = None
+    if first_call > time_budget:
+        latencies.append(first_call * 1000)
+    else:
+        for _ in range(warmup - 1):
+            func()
+
+        deadline = time.perf_counter() + time_budget
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if time.perf_counter() > deadline:
+                break
+
+        tracemalloc.start()
+        try:
+            func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return _summarize(latencies, input_bytes, peak_memory)
+
+
+def _summarize(latencies: List[float], input_bytes: int = 0,
+               peak_memory: Optional[int] = None) -> Dict[str, Any]:
+    """Latency percentiles and throughput of a list of call times in milliseconds."""
+    latencies = sorted(latencies)
+    total_seconds = sum(latencies) / 1000
+    result = {
+        "iterations": len(latencies),
+        "input_bytes": input_bytes,
+        "mean_ms": round(sum(latencies) / len(latencies), 4),
+        "min_ms": round(latencies[0], 4),
+        "p50_ms": round(_percentile(latencies, 50), 4),
+        "p90_ms": round(_percentile(latencies, 90), 4),
+        "p99_ms": round(_percentile(latencies, 99), 4),
+        "max_ms": round(latencies[-1], 4),
+        "ops_per_sec": round(len(latencies) / total_seconds, 2) if total_seconds else 0.0,
+        "peak_memory_bytes": peak_memory
+    }
+    if input_bytes:
+        result["mb_per_sec"] = round(input_bytes * len(latencies) / total_seconds / 1e6, 3) if total_seconds else 0.0
+    return result
+
+
+def measure_startup(module: str, runs: int = 10) -> Dict[str, Any]:
+    """
+    Measure the import time of a module, each run in a fresh interpreter.
+
+    Args:
+        module: Name of the module to import
+        runs: Number of timed imports (one untimed import is made first so
+            bytecode caches are written)
+
+    Returns:
+        Dictionary of measurements (peak memory is not traced)
+    """
+    command = [sys.executable, "-c", STARTUP_SCRIPT.format(module=module)]
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    latencies = []
+    for run in range(runs + 1):
+        output = subprocess.run(command, cwd=cwd, capture_output=True, text=True, check=True).stdout
+        if run:
+            latencies.append(float(output) * 1000)
+    return _summarize(latencies)
+
+
+def benchmark_cases(corpus: List[Dict[str, Any]]) -> List[Tuple[str, str, int, Callable[[], Any]]]:
+    """
+    Build the benchmark cases for every entry point.
+
+    Returns:
+        List of (benchmark name, case name, input bytes, callable)
+    """
+    cases = []
+    for doc in corpus:
+        svg_code = doc["svg_code"]
+        size = len(svg_code.encode('utf-8'))
+        selector = KIND_SELECTORS[doc["kind"]]
+        cases.append(("optimize_svg", doc["name"], size,
+                      lambda s=svg_code: optimize_svg(s, "aggressive")))
+        cases.append(("transform_svg_element", doc["name"], size,
+                      lambda s=svg_code, sel=selector: transform_svg_element(
+                          s, sel, {"translate": {"x": 5, "y": 5}, "fill": "#ff0000"})))
+        cases.append(("select_elements", doc["name"], size,
+                      lambda s=svg_code, sel=selector: SVGSelector.select_elements(s, sel)))
+        cases.append(("select_elements_compact", doc["name"], size,
+                      lambda s=svg_code, sel=selector: SVGSelector.select_elements(s, sel, compact=True)))
+        cases.append(("add_svg_interactivity", doc["name"], size,
+                      lambda s=svg_code, sel=selector: add_svg_interactivity(
+                          s, "hover", sel, {"mouseoverAction": "setAttribute",
+                                            "mouseoverParameters": {"attributeName": "opacity",
+                                                                    "attributeValue": "0.5"}})))
+
+    for component_type, variant in [("loader", "spinner"), ("icon", "check"), ("background", "waves")]:
+        cases.append(("get_svg_component", f"{component_type}-{variant}", 0,
+                      lambda c=component_type, v=variant: get_svg_component(c, v, palette="ocean")))
+
+    for name, prompt in [("bounce", "a red ball bouncing"),
+                         ("scene", "blue circle rotating while a green square pulses and a star fades")]:
+        cases.append(("generate_svg_animation", name, 0,
+                      lambda p=prompt: generate_svg_animation(p, 2000)))
+    return cases
+
+
+def run_benchmarks(sizes: Optional[List[str]] = None, kinds: Optional[List[str]] = None,
+                   iterations: int = 20, warmup: int = 2, time_budget: float = 5.0,
+                   name_filter: Optional[str] = None, seed: int = 0,
+                   startup_runs: int = 10) -> Dict[str, Any]:
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes: Corpus sizes to include
+        kinds: Corpus kinds to include
+        iterations: Timed calls per case
+        warmup: Untimed calls per case
+        time_budget: Seconds of timed calls per case
+        name_filter: Only run benchmarks whose name contains this string
+        seed: Corpus seed
+        startup_runs: Fresh interpreters per module import benchmark (0 skips them)
+
+    Returns:
+        Dictionary with run metadata and one result per (benchmark, case)
+    """
+    corpus = generate_corpus(kinds, sizes, seed)
+    results = []
+    for benchmark, case, input_bytes, func in benchmark_cases(corpus):
+        if name_filter and name_filter not in benchmark:
+            continue
+        measurement = measure(func, iterations, warmup, input_bytes, time_budget)
+        results.append({"benchmark": benchmark, "case": case, **measurement})
+
+    if startup_runs and (not name_filter or name_filter in "import"):
+        for module in STARTUP_MODULES:
+            results.append({"benchmark": "import", "case": module, **measure_startup(module, startup_runs)})
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "time_budget": time_budget,
+            "seed": seed,
+            "startup_runs": startup_runs
+        },
+        "results": results
+    }
+
+
+def compare_runs(baseline: Dict[str, Any], current: Dict[str, Any],
+                 threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare two benchmark runs.
+
+    Args:
+        baseline: Results of the reference run
+        current: Results of the new run
+        threshold: Relative change beyond which a worse metric is a regression
+
+    Returns:
+        One entry per compared metric of each case present in both runs
+    """
+    baseline_results = {(r["benchmark"], r["case"]): r for r in baseline.get("results", [])}
+    comparison = []
+    for result in current.get("results", []):
+        reference = baseline_results.get((result["benchmark"], result["case"]))
+        if reference is None:
+            continue
+        for metric, better in COMPARED_METRICS.items():
+            old, new = reference.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -threshold if better == "higher" else change > threshold
+            comparison.append({
+                "benchmark": result["benchmark"],
+                "case": result["case"],
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regression": worse
+            })
+    return comparison
+
+
+def _format_results(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<24} {'case':<18} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'peak KB':>10}"]
+    for r in results:
+        peak = f"{r['peak_memory_bytes'] / 1024:.1f}" if r["peak_memory_bytes"] is not None else "-"
+        lines.append(f"{r['benchmark']:<24} {r['case']:<18} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} "
+                     f"{r['ops_per_sec']:>10.1f} {peak:>10}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the SVG-MCP entry points")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite")
+    run_parser.add_argument("--output", "-o", help="Write results as JSON to this file")
+    run_parser.add_argument("--sizes", nargs="+", choices=list(CORPUS_SIZES), help="Corpus sizes")
+    run_parser.add_argument("--kinds", nargs="+", choices=CORPUS_KINDS, help="Corpus kinds")
+    run_parser.add_argument("--iterations", type=int, default=20)
+    run_parser.add_argument("--warmup", type=int, default=2)
+    run_parser.add_argument("--time-budget", type=float, default=5.0, help="Seconds per case")
+    run_parser.add_argument("--filter", dest="name_filter", help="Only run matching benchmarks")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--startup-runs", type=int, default=10,
+                            help="Fresh interpreters per import benchmark (0 skips them)")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run = run_benchmarks(args.sizes, args.kinds, args.iterations, args.warmup,
+                             args.time_budget, args.name_filter, args.seed, args.startup_runs)
+        print(_format_results(run["results"]))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(run, f, indent=2)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    comparison = compare_runs(baseline, current, args.threshold)
+    regressions = [c for c in comparison if c["regression"]]
+    for c in regressions:
+        print(f"REGRESSION {c['benchmark']} {c['case']} {c['metric']}: "
+              f"{c['baseline']} -> {c['current']} ({c['change']:+.1%})")
+    print(f"{len(comparison)} metrics compared, {len(regressions)} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+"""
+SVG CLI Module for SVG-MCP.
+
+This module is the `sutra-svg` command line tool. It runs the optimize,
+transform, recolor and interactivity tools over files, directories, globs or
+stdin, processes many files in parallel, skips files that have not changed
+since the last run (tracked in a manifest of modification times and content
+hashes) and prints aggregate size and throughput statistics.
+
+Usage:
+    python svg_cli.py optimize icons/ -o dist/ --jobs 8 --manifest .svg-manifest.json
+    python svg_cli.py transform logo.svg --selector "#mark" --transform '{"scale": {"x": 2}}'
+    python svg_cli.py recolor "assets/**/*.svg" --in-place --palette pastel
+    cat chart.svg | python svg_cli.py interactivity --type hover --selector rect --config '{}'
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+from typing import Dict, Any, List, Optional, Tuple
+
+PROG = "sutra-svg"
+
+MANIFEST_VERSION = 1
+
+GLOB_CHARACTERS = set("*?[")
+
+
+# Tool modules are imported inside the operations so `--help` and runs that
+# skip every file stay fast
+def _optimize(svg_code: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    from svg_optimization import optimize_svg
+    result = optimize_svg(svg_code, options["level"], optimize_for=options["optimize_for"])
+    return {"error": result["error"]} if "error" in result else {"svg_code": result["optimized_svg"]}
+
+
+def _transform(svg_code: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    from svg_manipulation import transform_svg_element
+    result = transform_svg_element(svg_code, options["selector"], options["transform"])
+    return {"svg_code": result["modified_svg"]} if result["success"] else {"error": result["error"]}
+
+
+def _recolor(svg_code: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    from svg_recolor import recolor_svg
+    result = recolor_svg(svg_code, options["palette"], options["source_palette"], options["mapping"])
+    return {"svg_code": result["svg_code"]} if result["success"] else {"error": result["error"]}
+
+
+def _interactivity(svg_code: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    from svg_interactivity import add_svg_interactivity
+    result = add_svg_interactivity(svg_code, options["type"], options["selector"], options["config"],
+                                   mode=options["mode"], minify=options["minify"])
+    return {"svg_code": result["svg_code"]} if result["success"] else {"error": result["error"]}
+
+
+OPERATIONS = {
+    "optimize": _optimize,
+    "transform": _transform,
+    "recolor": _recolor,
+    "interactivity": _interactivity,
+}
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _options_digest(command: str, options: Dict[str, Any]) -> str:
+    return _sha1(json.dumps([command, options], sort_keys=True).encode('utf-8'))
+
+
+def _process_file(job: Tuple[str, Dict[str, Any], str, Optional[str]]) -> Dict[str, Any]:
+    """Run one operation on one file (a top-level function so process pools can pickle it)."""
+    command, options, input_path, output_path = job
+    start = time.perf_counter()
+    try:
+        with open(input_path, "rb") as f:
+            data = f.read()
+        result = OPERATIONS[command](data.decode('utf-8'), options)
+        if "error" in result:
+            return {"input_path": input_path, "success": False, "error": result["error"]}
+
+        output = result["svg_code"].encode('utf-8')
+        if output_path:
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            with open(output_path, "wb") as f:
+                f.write(output)
+
+        return {
+            "input_path": input_path,
+            "output_path": output_path,
+            "success": True,
+            "input_bytes": len(data),
+            "output_bytes": len(output),
+            "input_sha1": _sha1(data),
+            "output_sha1": _sha1(output),
+            "svg_code": None if output_path else result["svg_code"],
+            "time_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+    except Exception as e:
+        return {"input_path": input_path, "success": False, "error": str(e)}
+
+
+def expand_inputs(inputs: List[str]) -> List[Tuple[str, str]]:
+    """
+    Expand files, directories (recursively, *.svg) and glob patterns.
+
+    Returns:
+        (path, path relative to the input it came from) pairs, without duplicates
+    """
+    expanded = []
+    seen = set()
+
+    def add(path: str, base: Optional[str]) -> None:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            expanded.append((path, os.path.relpath(path, base) if base else os.path.basename(path)))
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for path in sorted(glob.glob(os.path.join(item, "**", "*.svg"), recursive=True)):
+                add(path, item)
+        elif GLOB_CHARACTERS & set(item):
+            base = item[:min(item.index(c) for c in GLOB_CHARACTERS if c in item)]
+            base = os.path.dirname(base) or None
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, base)
+        else:
+            add(item, None)
+    return expanded
+
+
+class Manifest:
+    """Record of processed files, used to skip inputs that have not changed."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("files", {})
+
+    def is_current(self, input_path: str, output_path: Optional[str], options_digest: str) -> bool:
+        """
+        Whether a file was already processed with the same options and has not changed.
+
+        The modification time and size are checked first; if they differ the
+        content hash decides, so touched but unchanged files are still skipped.
+        """
+        entry = self.entries.get(os.path.abspath(input_path))
+        if not entry or entry["options"] != options_digest or entry["output_path"] != output_path:
+            return False
+        if output_path and not os.path.exists(output_path):
+            return False
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["size"]:
+            return True
+        with open(input_path, "rb") as f:
+            if _sha1(f.read()) != entry["sha1"]:
+                return False
+        entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+        return True
+
+    def record(self, result: Dict[str, Any], options_digest: str) -> None:
+        input_path = result["input_path"]
+        # In-place runs record the rewritten file, which is what the next run reads
+        in_place = result["output_path"] and os.path.abspath(result["output_path"]) == os.path.abspath(input_path)
+        stat = os.stat(input_path)
+        self.entries[os.path.abspath(input_path)] = {
+            "options": options_digest,
+            "output_path": result["output_path"],
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha1": result["output_sha1"] if in_place else result["input_sha1"]
+        }
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+def run_files(command: str, options: Dict[str, Any], inputs: List[Tuple[str, str]],
+              output_dir: Optional[str] = None, in_place: bool = False, jobs: Optional[int] = None,
+              use_processes: bool = True, manifest: Optional[Manifest] = None) -> Dict[str, Any]:
+    """
+    Run an operation over files.
+
+    Args:
+        command: Operation name (see OPERATIONS)
+        options: Operation options
+        inputs: (path, relative output path) pairs from expand_inputs
+        output_dir: Directory the outputs are written to, mirroring the inputs
+        in_place: Overwrite the inputs
+        jobs: Number of parallel workers (defaults to the CPU count)
+        use_processes: Use a process pool instead of threads
+        manifest: Manifest used to skip unchanged files and updated with the results
+
+    Returns:
+        Dictionary with per-file results, skipped files and totals
+    """
+    options_digest = _options_digest(command, options)
+    work, skipped = [], []
+    for path, relative in inputs:
+        output_path = path if in_place else os.path.join(output_dir, relative) if output_dir else None
+        if manifest is not None and output_path and manifest.is_current(path, output_path, options_digest):
+            skipped.append(path)
+        else:
+            work.append((command, options, path, output_path))
+
+    start = time.perf_counter()
+    if len(work) <= 1 or jobs == 1:
+        results = [_process_file(job) for job in work]
+    else:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=jobs) as executor:
+            chunksize = max(1, len(work) // ((jobs or os.cpu_count() or 1) * 4))
+            results = list(executor.map(_process_file, work, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    if manifest is not None:
+        for result in results:
+            if result["success"] and result["output_path"]:
+                manifest.record(result, options_digest)
+        manifest.save()
+
+    succeeded = [r for r in results if r["success"]]
+    input_bytes = sum(r["input_bytes"] for r in succeeded)
+    output_bytes = sum(r["output_bytes"] for r in succeeded)
+    return {
+        "success": len(succeeded) == len(results),
+        "files": results,
+        "skipped": skipped,
+        "stats": {
+            "files_processed": len(succeeded),
+            "files_failed": len(results) - len(succeeded),
+            "files_skipped": len(skipped),
+            "input_bytes": input_bytes,
+            "output_bytes": output_bytes,
+            "bytes_saved": input_bytes - output_bytes,
+            "percentage_reduction": round((input_bytes - output_bytes) / input_bytes * 100, 2)
+            if input_bytes else 0,
+            "elapsed_seconds": round(elapsed, 4),
+            "files_per_sec": round(len(results) / elapsed, 2) if elapsed else 0.0,
+            "mb_per_sec": round(input_bytes / elapsed / 1e6, 3) if elapsed else 0.0
+        }
+    }
+
+
+def _format_stats(stats: Dict[str, Any]) -> str:
+    return (f"{stats['files_processed']} processed, {stats['files_skipped']} skipped, "
+            f"{stats['files_failed']} failed | {stats['input_bytes']} -> {stats['output_bytes']} bytes "
+            f"({0.0 - stats['percentage_reduction']:+.2f}%) | {stats['elapsed_seconds']:.3f} s, "
+            f"{stats['files_per_sec']:.1f} files/s, {stats['mb_per_sec']:.2f} MB/s")
+
+
+def _json_argument(value: str) -> Any:
+    """Parse a JSON argument, reading it from a file when given as @path."""
+    try:
+        if value.startswith("@"):
+            with open(value[1:], encoding="utf-8") as f:
+                return json.load(f)
+        return json.loads(value)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"invalid JSON argument: {e}")
+
+
+def _command_options(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.command == "optimize":
+        return {"level": args.level, "optimize_for": args.optimize_for}
+    if args.command == "transform":
+        return {"selector": args.selector, "transform": args.transform}
+    if args.command == "recolor":
+        return {"palette": args.palette, "source_palette": args.source_palette, "mapping": args.mapping}
+    return {"type": args.type, "selector": args.selector, "config": args.config,
+            "mode": args.mode, "minify": args.minify}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from svg_interactivity import INTERACTIVITY_MODES
+
+    parser = argparse.ArgumentParser(prog=PROG, description="Optimize and edit SVG files with the SVG-MCP tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="*", help="Files, directories or glob patterns ('-' or none reads stdin)")
+    output = common.add_mutually_exclusive_group()
+    output.add_argument("--output-dir", "-o", help="Write outputs here, mirroring the input layout")
+    output.add_argument("--in-place", action="store_true", help="Overwrite the input files")
+    common.add_argument("--jobs", "-j", type=int, help="Parallel workers (defaults to the CPU count)")
+    common.add_argument("--threads", action="store_true", help="Use threads instead of processes")
+    common.add_argument("--manifest", help="Manifest file used to skip unchanged inputs")
+    common.add_argument("--quiet", "-q", action="store_true", help="Do not print statistics")
+    common.add_argument("--json", action="store_true", help="Print the results as JSON instead")
+
+    optimize = subparsers.add_parser("optimize", parents=[common], help="Optimize SVG files")
+    optimize.add_argument("--level", choices=["light", "standard", "aggressive"], default="standard")
+    optimize.add_argument("--optimize-for", choices=["raw", "gzip", "brotli"], default="raw")
+
+    transform = subparsers.add_parser("transform", parents=[common], help="Transform matching elements")
+    transform.add_argument("--selector", required=True)
+    transform.add_argument("--transform", type=_json_argument, required=True,
+                           help="Transform JSON, or @file")
+
+    recolor = subparsers.add_parser("recolor", parents=[common], help="Recolor to a palette")
+    recolor.add_argument("--palette", default="default")
+    recolor.add_argument("--source-palette")
+    recolor.add_argument("--mapping", type=_json_argument, help="Color mapping JSON, or @file")
+
+    interactivity = subparsers.add_parser("interactivity", parents=[common], help="Add interactivity")
+    interactivity.add_argument("--type", required=True,
+                               choices=["click", "hover", "drag", "tooltip", "custom"])
+    interactivity.add_argument("--selector", required=True)
+    interactivity.add_argument("--config", type=_json_argument, default={},
+                               help="Configuration JSON, or @file")
+    interactivity.add_argument("--mode", choices=INTERACTIVITY_MODES, default="inline")
+    interactivity.add_argument("--minify", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    options = _command_options(args)
+
+    if not args.inputs or args.inputs == ["-"]:
+        result = OPERATIONS[args.command](sys.stdin.read(), options)
+        if "error" in result:
+            print(f"{PROG}: {result['error']}", file=sys.stderr)
+            return 1
+        sys.stdout.write(result["svg_code"])
+        return 0
+
+    inputs = expand_inputs(args.inputs)
+    missing = [path for path, _ in inputs if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"no such file: {missing[0]}")
+    if not inputs:
+        parser.error("no SVG files matched the inputs")
+    to_stdout = not args.output_dir and not args.in_place
+    if to_stdout and len(inputs) > 1:
+        parser.error("several inputs need --output-dir or --in-place")
+
+    manifest = Manifest(args.manifest) if args.manifest else None
+    run = run_files(args.command, options, inputs, args.output_dir, args.in_place,
+                    args.jobs, not args.threads, manifest)
+
+    for result in run["files"]:
+        if not result["success"]:
+            print(f"{PROG}: {result['input_path']}: {result['error']}", file=sys.stderr)
+        elif to_stdout:
+            sys.stdout.write(result["svg_code"])
+
+    if args.json:
+        for result in run["files"]:
+            result.pop("svg_code", None)
+        json.dump(run, sys.stderr if to_stdout else sys.stdout, indent=2)
+        print(file=sys.stderr if to_stdout else sys.stdout)
+    elif not args.quiet:
+        print(_format_stats(run["stats"]), file=sys.stderr)
+    return 0 if run["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+"""
+SVG Compact Document Module for SVG-MCP.
+
+This module provides a compact representation of huge SVG documents. Where
+ElementTree allocates an object and an attribute dictionary per element, a
+CompactDocument keeps the whole tree in a few typed arrays:
+
+- elements are numbered in document order, with a tag id, the index of their
+  parent and the index just past their subtree;
+- tag and attribute names share one interned name table;
+- attribute values are interned strings, except numbers, which are stored as
+  doubles (only when they serialize back to the same text);
+- text and tails are references into the value table.
+
+It supports the same selectors as SVGSelector (except :within and
+:intersects), attribute updates and serialization, and serializes exactly as
+ElementTree does, so it can stand in for ElementTree in SVGSelector.select_elements.
+Parsing is slower than ElementTree's, as every attribute is stored from Python,
+so it pays off where memory, not time, is the limit.
+"""
+
+import io
+import re
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+from xml.parsers import expat
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from svg_geometry import NUMBER_PATTERN as LEADING_NUMBER_PATTERN
+from svg_metrics import count, timed
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+ET.register_namespace("", SVG_NAMESPACE)
+ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+
+# Values up to this length are interned, longer ones (path data) are rarely repeated
+INTERN_MAX_LENGTH = 64
+
+# Attribute values stored as numbers, if they serialize back to the same text
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+
+TAG_PATTERN = re.compile(r'[\w.-]+')
+
+# Marks a removed attribute in the attribute columns
+REMOVED = 0xFFFFFFFF
+
+NO_VALUE = -1
+
+
+def _format_number(value: float) -> str:
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _leading_number(value: Optional[str], default: Optional[float]) -> Optional[float]:
+    """Leading number of an attribute value, ignoring units, as svg_geometry.parse_number does."""
+    match = LEADING_NUMBER_PATTERN.match(value.strip()) if value is not None else None
+    return float(match.group(0)) if match else default
+
+
+def _escape_cdata(text: str) -> str:
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attrib(text: str) -> str:
+    text = _escape_cdata(text)
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+class CompactDocument:
+    """An SVG document stored in columnar arrays, with elements addressed by index."""
+
+    def __init__(self, svg_code: str):
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self.values: List[str] = []
+        self._value_ids: Dict[str, int] = {}
+        self.numbers = array("d")
+
+        self.tags = array("I")
+        self.parents = array("i")
+        self.ends = array("I")
+        self.texts = array("i")
+        self.tails = array("i")
+        self.attribute_offsets = array("I", [0])
+        self.attribute_names = array("I")
+        self.attribute_values = array("q")
+
+        # Attributes added after parsing, per element, in insertion order
+        self._added: Dict[int, Dict[int, int]] = {}
+        # Whether namespaced names may be used in a different order than they were interned
+        self._names_changed = False
+
+        with timed("parse", module="svg_compact"):
+            self._parse(svg_code)
+
+    def _name(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def _string(self, value: str) -> int:
+        if len(value) > INTERN_MAX_LENGTH:
+            self.values.append(value)
+            return len(self.values) - 1
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = self._value_ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def _value(self, value: str) -> int:
+        """Reference to a value: a value id, or a negative number index."""
+        if value.isdigit() and value.isascii() and len(value) < 16 and (value[0] != "0" or len(value) == 1):
+            # Integers without leading zeros always format back to themselves
+            self.numbers.append(float(value))
+            return -len(self.numbers)
+        if len(value) < 24 and NUMBER_PATTERN.fullmatch(value):
+            number = float(value)
+            if _format_number(number) == value:
+                self.numbers.append(number)
+                return -len(self.numbers)
+        return self._string(value)
+
+    def _resolve(self, reference: int) -> str:
+        return self.values[reference] if reference >= 0 else _format_number(self.numbers[-reference - 1])
+
+    def _parse(self, svg_code: str) -> None:
+        parser = expat.ParserCreate(None, "}")
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+
+        tags, parents, ends, texts, tails = self.tags, self.parents, self.ends, self.texts, self.tails
+        offsets, attribute_names, attribute_values = \
+            self.attribute_offsets, self.attribute_names, self.attribute_values
+        name_ids, qualify, value = self._name_ids, self._name, self._value
+        stack: List[int] = []
+        data: List[str] = []
+        # Element whose text or tail the pending character data is
+        pending = [None, None]
+
+        def flush() -> None:
+            if data:
+                target, index = pending
+                target[index] = self._string("".join(data))
+                data.clear()
+
+        def start(tag: str, attributes: List[str]) -> None:
+            flush()
+            index = len(tags)
+            name_id = name_ids.get(tag)
+            if name_id is None:
+                name_id = qualify("{" + tag if "}" in tag else tag)
+                name_ids[tag] = name_id
+            tags.append(name_id)
+            parents.append(stack[-1] if stack else -1)
+            ends.append(0)
+            texts.append(NO_VALUE)
+            tails.append(NO_VALUE)
+            if attributes:
+                keys = attributes[0::2]
+                for key in keys:
+                    if key not in name_ids:
+                        name_ids[key] = qualify("{" + key if "}" in key else key)
+                attribute_names.extend(map(name_ids.__getitem__, keys))
+                attribute_values.extend(map(value, attributes[1::2]))
+            offsets.append(len(attribute_names))
+            stack.append(index)
+            pending[0], pending[1] = texts, index
+
+        def end(tag: str) -> None:
+            flush()
+            index = stack.pop()
+            ends[index] = len(tags)
+            pending[0], pending[1] = tails, index
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = data.append
+        try:
+            parser.Parse(svg_code, True)
+        except expat.ExpatError as e:
+            error = ET.ParseError(f"{expat.ErrorString(e.code)}: line {e.lineno}, column {e.offset}")
+            error.code, error.position = e.code, (e.lineno, e.offset)
+            raise error from None
+        # The namespace-prefixed spellings of names were only needed while parsing
+        self._name_ids = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def tag(self, index: int) -> str:
+        """Tag of an element, with its namespace in braces as in ElementTree."""
+        return self.names[self.tags[index]]
+
+    def children(self, index: int) -> Iterator[int]:
+        """Indices of the children of an element."""
+        child, end = index + 1, self.ends[index]
+        while child < end:
+            yield child
+            child = self.ends[child]
+
+    def _attribute_items(self, index: int) -> Iterator[Tuple[int, int]]:
+        """(name id, value reference) pairs of an element, in order."""
+        for i in range(self.attribute_offsets[index], self.attribute_offsets[index + 1]):
+            name_id = self.attribute_names[i]
+            if name_id != REMOVED:
+                yield name_id, self.attribute_values[i]
+        added = self._added.get(index)
+        if added:
+            yield from added.items()
+
+    def attributes(self, index: int) -> Dict[str, str]:
+        """Attributes of an element, in document order."""
+        return {self.names[name_id]: self._resolve(reference) for name_id, reference in self._attribute_items(index)}
+
+    def get(self, index: int, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Value of an attribute of an element."""
+        name_id = self._name_ids.get(name)
+        if name_id is not None:
+            names = self.attribute_names
+            for i in range(self.attribute_offsets[index], self.attribute_offsets[index + 1]):
+                if names[i] == name_id:
+                    return self._resolve(self.attribute_values[i])
+            added = self._added.get(index)
+            if added and name_id in added:
+                return self._resolve(added[name_id])
+        return default
+
+    def get_number(self, index: int, name: str, default: Optional[float] = None) -> Optional[float]:
+        """Value of a numeric attribute of an element; text values give their leading number ('10px' -> 10)."""
+        name_id = self._name_ids.get(name)
+        if name_id is not None:
+            names = self.attribute_names
+            for i in range(self.attribute_offsets[index], self.attribute_offsets[index + 1]):
+                if names[i] == name_id:
+                    reference = self.attribute_values[i]
+                    if reference < 0:
+                        return self.numbers[-reference - 1]
+                    return _leading_number(self.values[reference], default)
+        return _leading_number(self.get(index, name), default)
+
+    def set(self, index: int, name: str, value: str) -> None:
+        """Set an attribute of an element (added attributes come last, as in ElementTree)."""
+        if name not in self._name_ids and name[:1] == "{":
+            self._names_changed = True
+        name_id = self._name(name)
+        names = self.attribute_names
+        for i in range(self.attribute_offsets[index], self.attribute_offsets[index + 1]):
+            if names[i] == name_id:
+                self.attribute_values[i] = self._value(value)
+                return
+        self._added.setdefault(index, {})[name_id] = self._value(value)
+
+    def remove(self, index: int, name: str) -> None:
+        """Remove an attribute of an element, if it is set."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            return
+        names = self.attribute_names
+        for i in range(self.attribute_offsets[index], self.attribute_offsets[index + 1]):
+            if names[i] == name_id:
+                names[i] = REMOVED
+                self._names_changed |= name[:1] == "{"
+                return
+        added = self._added.get(index)
+        if added and added.pop(name_id, None) is not None:
+            self._names_changed |= name[:1] == "{"
+
+    def text(self, index: int) -> Optional[str]:
+        """Text of an element before its first child."""
+        reference = self.texts[index]
+        return self.values[reference] if reference != NO_VALUE else None
+
+    def tail(self, index: int) -> Optional[str]:
+        """Text following an element, before its next sibling."""
+        reference = self.tails[index]
+        return self.values[reference] if reference != NO_VALUE else None
+
+    def set_text(self, index: int, text: Optional[str]) -> None:
+        self.texts[index] = self._string(text) if text is not None else NO_VALUE
+
+    def set_tail(self, index: int, tail: Optional[str]) -> None:
+        self.tails[index] = self._string(tail) if tail is not None else NO_VALUE
+
+    def select(self, selector: str) -> List[int]:
+        """
+        Find the elements that match a CSS-like selector.
+
+        Matches the same elements as SVGSelector.match_elements: descendants
+        of the root in the SVG namespace with the selector's tag (any element
+        without one), id, classes and attributes.
+
+        Args:
+            selector: A CSS-like selector (e.g., 'circle', '#myId', '.myClass')
+
+        Returns:
+            Indices of the matching elements in document order
+        """
+        from svg_manipulation import SVGSelector
+        selector_parts = SVGSelector._parse_selector(selector)
+        if selector_parts["regions"]:
+            raise ValueError("Compact documents do not support :within and :intersects selectors")
+
+        tag = selector_parts["tag"]
+        if tag == "*":
+            svg_ids = {i for i, name in enumerate(self.names) if name.startswith(f"{{{SVG_NAMESPACE}}}")}
+            candidates = [i for i in range(1, len(self.tags)) if self.tags[i] in svg_ids]
+        elif tag:
+            if not TAG_PATTERN.fullmatch(tag):
+                # ElementTree rejects the path built from such a tag
+                raise SyntaxError(f"Invalid tag in selector: {tag}")
+            tag_id = self._name_ids.get(f"{{{SVG_NAMESPACE}}}{tag}")
+            tags = self.tags
+            candidates = [i for i in range(1, len(tags)) if tags[i] == tag_id] if tag_id is not None else []
+        else:
+            candidates = range(1, len(self.tags))
+
+        conditions = list(selector_parts["attrs"].items())
+        if selector_parts["id"]:
+            conditions.insert(0, ("id", selector_parts["id"]))
+        matches = []
+        for index in candidates:
+            if any(self.get(index, attr) != value for attr, value in conditions):
+                continue
+            if selector_parts["classes"]:
+                classes = (self.get(index, "class") or "").split()
+                if any(cls not in classes for cls in selector_parts["classes"]):
+                    continue
+            matches.append(index)
+
+        count("selector_queries")
+        count("selector_matches", len(matches))
+        return matches
+
+    def describe(self, indices: List[int]) -> List[Dict[str, Any]]:
+        """
+        Describe selected elements, assigning an id to elements without one,
+        like SVGSelector.describe_elements.
+
+        Args:
+            indices: Elements returned by select
+
+        Returns:
+            List of selected elements info (id, tag and attributes)
+        """
+        elements_info = []
+        for i, index in enumerate(indices):
+            elem_id = self.get(index, "id", f"_selected_{i}")
+            if not self.get(index, "id"):
+                self.set(index, "id", elem_id)
+            elements_info.append({
+                "id": elem_id,
+                "tag": self.tag(index).split("}")[-1],
+                "attributes": self.attributes(index)
+            })
+        return elements_info
+
+    def _qualified_names(self) -> Tuple[List[Optional[str]], Dict[str, str]]:
+        """Serialized name of every name id and the namespaces to declare, as ElementTree computes them."""
+        if self._names_changed:
+            # Names must be qualified in the order ElementTree meets them
+            order, seen = [], set()
+            for index in range(len(self.tags)):
+                for name_id in (self.tags[index], *(name_id for name_id, _ in self._attribute_items(index))):
+                    if name_id not in seen:
+                        seen.add(name_id)
+                        order.append(name_id)
+        else:
+            order = range(len(self.names))
+
+        qualified: List[Optional[str]] = [None] * len(self.names)
+        namespaces: Dict[str, str] = {}
+        for name_id in order:
+            name = self.names[name_id]
+            if name[:1] != "{":
+                qualified[name_id] = name
+                continue
+            uri, local = name[1:].rsplit("}", 1)
+            prefix = namespaces.get(uri)
+            if prefix is None:
+                prefix = ET._namespace_map.get(uri)
+                if prefix is None:
+                    prefix = "ns%d" % len(namespaces)
+                if prefix != "xml":
+                    namespaces[uri] = prefix
+            qualified[name_id] = f"{prefix}:{local}" if prefix else local
+        return qualified, namespaces
+
+    def tostring(self) -> str:
+        """Serialize the document exactly as ET.tostring(root, encoding='unicode') would."""
+        with timed("serialize", module="svg_compact"):
+            qualified, namespaces = self._qualified_names()
+            values, resolve = self.values, self._resolve
+            texts, tails, ends = self.texts, self.tails, self.ends
+            stream = io.StringIO()
+            write = stream.write
+            stack: List[int] = []
+            for index in range(len(self.tags)):
+                while stack and ends[stack[-1]] <= index:
+                    closed = stack.pop()
+                    write(f"</{qualified[self.tags[closed]]}>")
+                    if tails[closed] != NO_VALUE:
+                        write(_escape_cdata(values[tails[closed]]))
+
+                tag = qualified[self.tags[index]]
+                write("<" + tag)
+                if index == 0:
+                    for uri, prefix in sorted(namespaces.items(), key=lambda item: item[1]):
+                        write(f' xmlns{":" + prefix if prefix else ""}="{_escape_attrib(uri)}"')
+                for name_id, reference in self._attribute_items(index):
+                    write(f' {qualified[name_id]}="{_escape_attrib(resolve(reference))}"')
+
+                text = values[texts[index]] if texts[index] != NO_VALUE else ""
+                if text or ends[index] > index + 1:
+                    write(">")
+                    if text:
+                        write(_escape_cdata(text))
+                    stack.append(index)
+                else:
+                    write(" />")
+                    if tails[index] != NO_VALUE:
+                        write(_escape_cdata(values[tails[index]]))
+            while stack:
+                closed = stack.pop()
+                write(f"</{qualified[self.tags[closed]]}>")
+                if tails[closed] != NO_VALUE:
+                    write(_escape_cdata(values[tails[closed]]))
+            return stream.getvalue()
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the document's arrays and tables, in bytes."""
+        size = sum(column.itemsize * len(column) for column in (
+            self.numbers, self.tags, self.parents, self.ends, self.texts, self.tails,
+            self.attribute_offsets, self.attribute_names, self.attribute_values))
+        size += sum(sys.getsizeof(s) for s in self.names) + sum(sys.getsizeof(s) for s in self.values)
+        size += sys.getsizeof(self.names) + sys.getsizeof(self.values)
+        size += sys.getsizeof(self._name_ids) + sys.getsizeof(self._value_ids)
+        return size
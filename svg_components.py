@@ -5,7 +5,11 @@ This module provides a collection of reusable SVG components inspired by SVG-Loa
 Each component can be customized in size, color, and other parameters.
 """
 
-from typing import Dict, Any, List, Optional, Union
+import math
+import importlib
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple
+
+from svg_metrics import count_cache, instrumented
 
 # Define color palettes for consistent styling
 COLOR_PALETTES = {
@@ -41,13 +45,342 @@ COLOR_PALETTES = {
     }
 }
 
+
+# Variant generators keyed by (component_type, variant). A generator receives
+# keyword arguments (variant, size, color, palette_colors and any component
+# specific options) and returns the SVG code of the component. The variant "*"
+# is the fallback used when a requested variant is not registered.
+_COMPONENT_REGISTRY: Dict[Tuple[str, str], Callable[..., str]] = {}
+
+# Variants provided by packs that have not been imported yet, keyed like the registry
+_LAZY_VARIANTS: Dict[Tuple[str, str], Union[str, Callable[[], None]]] = {}
+
+# Packs with no declared variant list, imported on the first miss for their component type
+_LAZY_PACKS: Dict[str, List[Union[str, Callable[[], None]]]] = {}
+
+# Resolvers consulted for variants that are neither registered nor in a lazy pack
+_COMPONENT_RESOLVERS: Dict[str, List[Callable[[str], Optional[Callable[..., str]]]]] = {}
+
+FALLBACK_VARIANT = "*"
+
+
+def register_component(component_type: str, variant: str,
+                       generator: Optional[Callable[..., str]] = None):
+    """
+    Register a generator for a component variant.
+
+    Can be used directly or as a decorator:
+
+        @register_component("icon", "star")
+        def star_icon(size, color, stroke_width, **kwargs):
+            ...
+
+    Args:
+        component_type: Category of component ('loader', 'icon', 'background' or a new one)
+        variant: Name of the variant ('*' registers the fallback for the category)
+        generator: Function returning the SVG code of the component
+
+    Returns:
+        The generator (so the function can be used as a decorator)
+    """
+    def decorator(func: Callable[..., str]) -> Callable[..., str]:
+        _COMPONENT_REGISTRY[(component_type, variant)] = func
+        _LAZY_VARIANTS.pop((component_type, variant), None)
+        return func
+
+    if generator is not None:
+        return decorator(generator)
+    return decorator
+
+
+def register_component_pack(component_type: str, pack: Union[str, Callable[[], None]],
+                            variants: Optional[List[str]] = None) -> None:
+    """
+    Register a pack of variants that is only imported when first needed.
+
+    Args:
+        component_type: Category of component the pack provides
+        pack: Module name to import, or a callable that registers the variants
+        variants: Variant names provided by the pack. When omitted, the pack is
+            loaded on the first lookup of an unknown variant of this category
+    """
+    if variants is None:
+        _LAZY_PACKS.setdefault(component_type, []).append(pack)
+        return
+
+    for variant in variants:
+        if (component_type, variant) not in _COMPONENT_REGISTRY:
+            _LAZY_VARIANTS[(component_type, variant)] = pack
+
+
+def register_component_resolver(component_type: str,
+                                resolver: Callable[[str], Optional[Callable[..., str]]]) -> None:
+    """
+    Register a resolver that provides generators on demand.
+
+    Resolvers suit large variant collections (such as imported icon packs) where
+    registering every variant up front would be too slow. Resolved generators are
+    cached in the registry.
+
+    Args:
+        component_type: Category of component the resolver provides
+        resolver: Function taking a variant name and returning a generator or None
+    """
+    _COMPONENT_RESOLVERS.setdefault(component_type, []).append(resolver)
+
+
+def _load_pack(pack: Union[str, Callable[[], None]]) -> None:
+    """Import a lazily registered pack so it registers its variants."""
+    if callable(pack):
+        pack()
+    else:
+        importlib.import_module(pack)
+
+
+def resolve_component(component_type: str, variant: str) -> Optional[Callable[..., str]]:
+    """
+    Look up the generator for a component variant.
+
+    Args:
+        component_type: Category of component
+        variant: Name of the variant
+
+    Returns:
+        The registered generator, the category fallback, or None if the category is unknown
+    """
+    key = (component_type, variant)
+    generator = _COMPONENT_REGISTRY.get(key)
+    count_cache("component_registry", generator is not None)
+    if generator is not None:
+        return generator
+
+    pack = _LAZY_VARIANTS.pop(key, None)
+    if pack is not None:
+        _load_pack(pack)
+        generator = _COMPONENT_REGISTRY.get(key)
+        if generator is not None:
+            return generator
+
+    while _LAZY_PACKS.get(component_type):
+        _load_pack(_LAZY_PACKS[component_type].pop(0))
+        generator = _COMPONENT_REGISTRY.get(key)
+        if generator is not None:
+            return generator
+
+    for resolver in _COMPONENT_RESOLVERS.get(component_type, []):
+        generator = resolver(variant)
+        if generator is not None:
+            _COMPONENT_REGISTRY[key] = generator
+            return generator
+
+    return _COMPONENT_REGISTRY.get((component_type, FALLBACK_VARIANT))
+
+
+def list_components(component_type: Optional[str] = None,
+                    include_lazy: bool = True) -> Dict[str, List[str]]:
+    """
+    List the registered component variants.
+
+    Args:
+        component_type: Restrict the listing to one category
+        include_lazy: Include variants of packs that have not been imported yet
+
+    Returns:
+        Dictionary mapping each category to its sorted variant names
+    """
+    keys = list(_COMPONENT_REGISTRY)
+    if include_lazy:
+        keys += list(_LAZY_VARIANTS)
+
+    listing: Dict[str, List[str]] = {}
+    for ctype, variant in keys:
+        if variant == FALLBACK_VARIANT or (component_type and ctype != component_type):
+            continue
+        listing.setdefault(ctype, []).append(variant)
+
+    return {ctype: sorted(set(variants)) for ctype, variants in listing.items()}
+
+
+def _get_palette_colors(palette: str) -> Dict[str, str]:
+    """Get palette colors or use defaults if palette doesn't exist."""
+    return COLOR_PALETTES.get(palette, COLOR_PALETTES["default"])
+
+
+# ---------------------------------------------------------------------------
+# Loaders
+# ---------------------------------------------------------------------------
+
+def _loader_svg(size: int, body: str) -> str:
+    """Wrap loader content in a square SVG document."""
+    viewBox = f"0 0 {size} {size}"
+    svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">\n'
+    svg_code += body
+    svg_code += '</svg>'
+    return svg_code
+
+
+def _animation_attr(animated: bool) -> str:
+    """SMIL timing attributes shared by loader animations."""
+    # Animation duration
+    duration = 1000 if animated else 0
+    return "" if not animated else f' dur="{duration}ms" repeatCount="indefinite"'
+
+
+@register_component("loader", "bars")
+def _loader_bars(size: int, color: str, animated: bool = True, **kwargs) -> str:
+    animation_attr = _animation_attr(animated)
+    bar_width = size / 10
+    bar_spacing = size / 20
+    bar_height = size * 0.6
+    start_x = (size - ((bar_width * 5) + (bar_spacing * 4))) / 2
+    start_y = (size - bar_height) / 2
+
+    body = ""
+    for i in range(5):
+        x = start_x + (i * (bar_width + bar_spacing))
+        y = start_y + bar_height
+
+        if animated:
+            anim_values = f"{bar_height};{bar_height/4};{bar_height}"
+            anim_begin = f"{(i * 0.1)}s"
+            animation = f'<animate attributeName="height" values="{anim_values}"{animation_attr} begin="{anim_begin}"/>\n'
+            animation += f'<animate attributeName="y" values="{y-bar_height};{y-bar_height/4};{y-bar_height}"{animation_attr} begin="{anim_begin}"/>'
+        else:
+            animation = ""
+
+        body += f'  <rect x="{x}" y="{y-bar_height}" width="{bar_width}" height="{bar_height}" fill="{color}">\n'
+        if animation:
+            body += f'    {animation}\n'
+        body += f'  </rect>\n'
+
+    return _loader_svg(size, body)
+
+
+@register_component("loader", "circles")
+def _loader_circles(size: int, color: str, animated: bool = True, **kwargs) -> str:
+    animation_attr = _animation_attr(animated)
+    circle_radius = size / 12
+    center = size / 2
+    orbit_radius = size / 3
+
+    body = ""
+    for i in range(8):
+        angle = i * 45
+        if animated:
+            anim_begin = f"{(i * 0.125)}s"
+            animation = f'<animate attributeName="opacity" values="1;0.2;1"{animation_attr} begin="{anim_begin}"/>\n'
+        else:
+            animation = ""
+
+        x = center + orbit_radius * math.cos(math.radians(angle))
+        y = center + orbit_radius * math.sin(math.radians(angle))
+
+        body += f'  <circle cx="{x}" cy="{y}" r="{circle_radius}" fill="{color}">\n'
+        if animation:
+            body += f'    {animation}\n'
+        body += f'  </circle>\n'
+
+    return _loader_svg(size, body)
+
+
+@register_component("loader", "dots")
+def _loader_dots(size: int, color: str, palette_colors: Dict[str, str],
+                 animated: bool = True, **kwargs) -> str:
+    animation_attr = _animation_attr(animated)
+    secondary_color = palette_colors["secondary"]
+    dot_radius = size / 10
+    spacing = size / 5
+
+    body = ""
+    for i in range(3):
+        x = (size / 2) + (i - 1) * spacing
+        y = size / 2
+
+        if animated:
+            anim_begin = f"{(i * 0.15)}s"
+            animation = f'<animate attributeName="cy" values="{y};{y-spacing/2};{y}"{animation_attr} begin="{anim_begin}"/>\n'
+            animation += f'<animate attributeName="fill" values="{color};{secondary_color};{color}"{animation_attr} begin="{anim_begin}"/>'
+        else:
+            animation = ""
+
+        body += f'  <circle cx="{x}" cy="{y}" r="{dot_radius}" fill="{color}">\n'
+        if animation:
+            body += f'    {animation}\n'
+        body += f'  </circle>\n'
+
+    return _loader_svg(size, body)
+
+
+@register_component("loader", "spinner")
+def _loader_spinner(size: int, color: str, palette_colors: Dict[str, str],
+                    animated: bool = True, **kwargs) -> str:
+    animation_attr = _animation_attr(animated)
+    stroke_width = size / 20
+    radius = (size / 2) - stroke_width
+
+    if animated:
+        animation = f'<animateTransform attributeName="transform" type="rotate" values="0 {size/2} {size/2};360 {size/2} {size/2}"{animation_attr}/>'
+    else:
+        animation = ""
+
+    body = f'  <circle cx="{size/2}" cy="{size/2}" r="{radius}" fill="none" stroke="{palette_colors["neutral"]}" stroke-width="{stroke_width}" opacity="0.3"/>\n'
+    body += f'  <path d="M {size/2} {stroke_width} A {radius} {radius} 0 0 1 {size-stroke_width} {size/2}" fill="none" stroke="{color}" stroke-width="{stroke_width}" stroke-linecap="round">\n'
+
+    if animation:
+        body += f'    {animation}\n'
+
+    body += f'  </path>\n'
+    return _loader_svg(size, body)
+
+
+@register_component("loader", "pulse")
+def _loader_pulse(size: int, color: str, animated: bool = True, **kwargs) -> str:
+    animation_attr = _animation_attr(animated)
+    circle_radius = size / 6
+    center = size / 2
+
+    if animated:
+        animation1 = f'<animate attributeName="r" values="{circle_radius};{circle_radius*2};{circle_radius}"{animation_attr}/>\n'
+        animation2 = f'<animate attributeName="opacity" values="1;0;1"{animation_attr}/>'
+    else:
+        animation1 = ""
+        animation2 = ""
+
+    body = f'  <circle cx="{center}" cy="{center}" r="{circle_radius}" fill="{color}">\n'
+    if animation1:
+        body += f'    {animation1}\n'
+    if animation2:
+        body += f'    {animation2}\n'
+    body += f'  </circle>\n'
+    return _loader_svg(size, body)
+
+
+@register_component("loader", FALLBACK_VARIANT)
+def _loader_fallback(size: int, color: str, animated: bool = True, **kwargs) -> str:
+    # Default to a simple spinner if component type is not recognized
+    animation_attr = _animation_attr(animated)
+    if animated:
+        animation = f'<animateTransform attributeName="transform" type="rotate" values="0 {size/2} {size/2};360 {size/2} {size/2}"{animation_attr}/>'
+    else:
+        animation = ""
+
+    body = f'  <circle cx="{size/2}" cy="{size/2}" r="{size/3}" fill="none" stroke="{color}" stroke-width="{size/12}" stroke-dasharray="{size/3}">\n'
+
+    if animation:
+        body += f'    {animation}\n'
+
+    body += f'  </circle>\n'
+    return _loader_svg(size, body)
+
+
 def get_loaders(component_type: str, size: int = 100, color: str = None, 
                palette: str = "default", animated: bool = True) -> Dict[str, Any]:
     """
     Get SVG loaders/spinners components.
     
     Args:
-        component_type: Type of loader ('bars', 'circles', 'dots', 'spinner', 'pulse')
+        component_type: Type of loader ('bars', 'circles', 'dots', 'spinner', 'pulse'
+            or any registered loader variant)
         size: Size of the component in pixels
         color: Primary color (overrides palette color if provided)
         palette: Color palette to use
@@ -56,156 +389,14 @@ def get_loaders(component_type: str, size: int = 100, color: str = None,
     Returns:
         Dictionary containing the SVG code and component information
     """
-    # Get palette colors or use defaults if palette doesn't exist
-    palette_colors = COLOR_PALETTES.get(palette, COLOR_PALETTES["default"])
+    palette_colors = _get_palette_colors(palette)
     
     # Use provided color or default to palette primary color
     primary_color = color if color else palette_colors["primary"]
-    secondary_color = palette_colors["secondary"]
-    accent_color = palette_colors["accent"]
-    
-    # Animation duration
-    duration = 1000 if animated else 0
-    animation_attr = "" if not animated else f' dur="{duration}ms" repeatCount="indefinite"'
-    
-    svg_code = ""
-    viewBox = f"0 0 {size} {size}"
-    
-    if component_type == "bars":
-        bar_width = size / 10
-        bar_spacing = size / 20
-        bar_height = size * 0.6
-        start_x = (size - ((bar_width * 5) + (bar_spacing * 4))) / 2
-        start_y = (size - bar_height) / 2
-        
-        svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">\n'
-        
-        for i in range(5):
-            x = start_x + (i * (bar_width + bar_spacing))
-            y = start_y + bar_height
-            
-            if animated:
-                anim_values = f"{bar_height};{bar_height/4};{bar_height}"
-                anim_begin = f"{(i * 0.1)}s"
-                animation = f'<animate attributeName="height" values="{anim_values}"{animation_attr} begin="{anim_begin}"/>\n'
-                animation += f'<animate attributeName="y" values="{y-bar_height};{y-bar_height/4};{y-bar_height}"{animation_attr} begin="{anim_begin}"/>'
-            else:
-                animation = ""
-            
-            svg_code += f'  <rect x="{x}" y="{y-bar_height}" width="{bar_width}" height="{bar_height}" fill="{primary_color}">\n'
-            if animation:
-                svg_code += f'    {animation}\n'
-            svg_code += f'  </rect>\n'
-        
-        svg_code += '</svg>'
-    
-    elif component_type == "circles":
-        circle_radius = size / 12
-        center = size / 2
-        orbit_radius = size / 3
-        
-        svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">\n'
-        
-        for i in range(8):
-            angle = i * 45
-            if animated:
-                anim_begin = f"{(i * 0.125)}s"
-                animation = f'<animate attributeName="opacity" values="1;0.2;1"{animation_attr} begin="{anim_begin}"/>\n'
-            else:
-                animation = ""
-            
-            x = center + orbit_radius * math.cos(math.radians(angle))
-            y = center + orbit_radius * math.sin(math.radians(angle))
-            
-            svg_code += f'  <circle cx="{x}" cy="{y}" r="{circle_radius}" fill="{primary_color}">\n'
-            if animation:
-                svg_code += f'    {animation}\n'
-            svg_code += f'  </circle>\n'
-        
-        svg_code += '</svg>'
     
-    elif component_type == "dots":
-        dot_radius = size / 10
-        spacing = size / 5
-        
-        svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">\n'
-        
-        for i in range(3):
-            x = (size / 2) + (i - 1) * spacing
-            y = size / 2
-            
-            if animated:
-                anim_begin = f"{(i * 0.15)}s"
-                animation = f'<animate attributeName="cy" values="{y};{y-spacing/2};{y}"{animation_attr} begin="{anim_begin}"/>\n'
-                animation += f'<animate attributeName="fill" values="{primary_color};{secondary_color};{primary_color}"{animation_attr} begin="{anim_begin}"/>'
-            else:
-                animation = ""
-            
-            svg_code += f'  <circle cx="{x}" cy="{y}" r="{dot_radius}" fill="{primary_color}">\n'
-            if animation:
-                svg_code += f'    {animation}\n'
-            svg_code += f'  </circle>\n'
-        
-        svg_code += '</svg>'
-    
-    elif component_type == "spinner":
-        stroke_width = size / 20
-        radius = (size / 2) - stroke_width
-        circumference = 2 * math.pi * radius
-        
-        svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">\n'
-        
-        if animated:
-            animation = f'<animateTransform attributeName="transform" type="rotate" values="0 {size/2} {size/2};360 {size/2} {size/2}"{animation_attr}/>'
-        else:
-            animation = ""
-        
-        svg_code += f'  <circle cx="{size/2}" cy="{size/2}" r="{radius}" fill="none" stroke="{palette_colors["neutral"]}" stroke-width="{stroke_width}" opacity="0.3"/>\n'
-        svg_code += f'  <path d="M {size/2} {stroke_width} A {radius} {radius} 0 0 1 {size-stroke_width} {size/2}" fill="none" stroke="{primary_color}" stroke-width="{stroke_width}" stroke-linecap="round">\n'
-        
-        if animation:
-            svg_code += f'    {animation}\n'
-        
-        svg_code += f'  </path>\n'
-        svg_code += '</svg>'
-    
-    elif component_type == "pulse":
-        circle_radius = size / 6
-        center = size / 2
-        
-        svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">\n'
-        
-        if animated:
-            animation1 = f'<animate attributeName="r" values="{circle_radius};{circle_radius*2};{circle_radius}"{animation_attr}/>\n'
-            animation2 = f'<animate attributeName="opacity" values="1;0;1"{animation_attr}/>'
-        else:
-            animation1 = ""
-            animation2 = ""
-        
-        svg_code += f'  <circle cx="{center}" cy="{center}" r="{circle_radius}" fill="{primary_color}">\n'
-        if animation1:
-            svg_code += f'    {animation1}\n'
-        if animation2:
-            svg_code += f'    {animation2}\n'
-        svg_code += f'  </circle>\n'
-        svg_code += '</svg>'
-    
-    else:
-        # Default to a simple spinner if component type is not recognized
-        svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}">\n'
-        
-        if animated:
-            animation = f'<animateTransform attributeName="transform" type="rotate" values="0 {size/2} {size/2};360 {size/2} {size/2}"{animation_attr}/>'
-        else:
-            animation = ""
-        
-        svg_code += f'  <circle cx="{size/2}" cy="{size/2}" r="{size/3}" fill="none" stroke="{primary_color}" stroke-width="{size/12}" stroke-dasharray="{size/3}">\n'
-        
-        if animation:
-            svg_code += f'    {animation}\n'
-        
-        svg_code += f'  </circle>\n'
-        svg_code += '</svg>'
+    generator = resolve_component("loader", component_type)
+    svg_code = generator(variant=component_type, size=size, color=primary_color,
+                         palette_colors=palette_colors, animated=animated)
     
     return {
         "svg_code": svg_code,
@@ -217,56 +408,79 @@ def get_loaders(component_type: str, size: int = 100, color: str = None,
     }
 
 
+# ---------------------------------------------------------------------------
+# Icons
+# ---------------------------------------------------------------------------
+
+def _icon_svg(body: str, size: int, color: str, stroke_width: int) -> str:
+    """Wrap icon strokes in a 24x24 stroked SVG document."""
+    viewBox = "0 0 24 24"
+    svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}" fill="none" stroke="{color}" stroke-width="{stroke_width}" stroke-linecap="round" stroke-linejoin="round">\n'
+    svg_code += body
+    svg_code += '</svg>'
+    return svg_code
+
+
+def _register_static_icon(name: str, body: str) -> None:
+    """Register an icon whose strokes do not depend on the parameters."""
+    def generator(size: int, color: str, stroke_width: int = 2, **kwargs) -> str:
+        return _icon_svg(body, size, color, stroke_width)
+    generator.__name__ = f"_icon_{name.strip('*') or 'fallback'}"
+    register_component("icon", name, generator)
+
+
+_register_static_icon("arrow",
+                      '  <line x1="5" y1="12" x2="19" y2="12" />\n'
+                      '  <polyline points="12 5 19 12 12 19" />\n')
+
+_register_static_icon("alert",
+                      '  <circle cx="12" cy="12" r="10" />\n'
+                      '  <line x1="12" y1="8" x2="12" y2="12" />\n'
+                      '  <line x1="12" y1="16" x2="12.01" y2="16" />\n')
+
+_register_static_icon("check",
+                      '  <polyline points="20 6 9 17 4 12" />\n')
+
+_register_static_icon("cross",
+                      '  <line x1="18" y1="6" x2="6" y2="18" />\n'
+                      '  <line x1="6" y1="6" x2="18" y2="18" />\n')
+
+_register_static_icon("info",
+                      '  <circle cx="12" cy="12" r="10" />\n'
+                      '  <line x1="12" y1="16" x2="12" y2="12" />\n'
+                      '  <line x1="12" y1="8" x2="12.01" y2="8" />\n')
+
+# Default to a simple circle if icon name is not recognized
+_register_static_icon(FALLBACK_VARIANT,
+                      '  <circle cx="12" cy="12" r="10" />\n')
+
+
 def get_icons(icon_name: str, size: int = 24, color: str = None, 
-             palette: str = "default", stroke_width: int = 2) -> Dict[str, Any]:
+             palette: str = "default", stroke_width: Optional[int] = None) -> Dict[str, Any]:
     """
     Get SVG icon components.
     
     Args:
-        icon_name: Name of the icon ('arrow', 'alert', 'check', 'cross', 'info')
+        icon_name: Name of the icon ('arrow', 'alert', 'check', 'cross', 'info'
+            or any registered icon variant)
         size: Size of the icon in pixels
         color: Primary color (overrides palette color if provided)
         palette: Color palette to use
-        stroke_width: Width of the stroke lines
+        stroke_width: Width of the stroke lines (defaults to the icon's own)
         
     Returns:
         Dictionary containing the SVG code and component information
     """
-    # Get palette colors or use defaults if palette doesn't exist
-    palette_colors = COLOR_PALETTES.get(palette, COLOR_PALETTES["default"])
+    palette_colors = _get_palette_colors(palette)
     
     # Use provided color or default to palette primary color
     primary_color = color if color else palette_colors["primary"]
     
-    viewBox = "0 0 24 24"
-    svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{viewBox}" width="{size}" height="{size}" fill="none" stroke="{primary_color}" stroke-width="{stroke_width}" stroke-linecap="round" stroke-linejoin="round">\n'
-    
-    if icon_name == "arrow":
-        svg_code += '  <line x1="5" y1="12" x2="19" y2="12" />\n'
-        svg_code += '  <polyline points="12 5 19 12 12 19" />\n'
-    
-    elif icon_name == "alert":
-        svg_code += '  <circle cx="12" cy="12" r="10" />\n'
-        svg_code += '  <line x1="12" y1="8" x2="12" y2="12" />\n'
-        svg_code += '  <line x1="12" y1="16" x2="12.01" y2="16" />\n'
-    
-    elif icon_name == "check":
-        svg_code += '  <polyline points="20 6 9 17 4 12" />\n'
-    
-    elif icon_name == "cross":
-        svg_code += '  <line x1="18" y1="6" x2="6" y2="18" />\n'
-        svg_code += '  <line x1="6" y1="6" x2="18" y2="18" />\n'
-    
-    elif icon_name == "info":
-        svg_code += '  <circle cx="12" cy="12" r="10" />\n'
-        svg_code += '  <line x1="12" y1="16" x2="12" y2="12" />\n'
-        svg_code += '  <line x1="12" y1="8" x2="12.01" y2="8" />\n'
-    
-    else:
-        # Default to a simple circle if icon name is not recognized
-        svg_code += '  <circle cx="12" cy="12" r="10" />\n'
-    
-    svg_code += '</svg>'
+    # Only override the icon's own stroke width when one is given
+    options = {} if stroke_width is None else {"stroke_width": stroke_width}
+    generator = resolve_component("icon", icon_name)
+    svg_code = generator(variant=icon_name, size=size, color=primary_color,
+                         palette_colors=palette_colors, **options)
     
     return {
         "svg_code": svg_code,
@@ -278,13 +492,88 @@ def get_icons(icon_name: str, size: int = 24, color: str = None,
     }
 
 
+# ---------------------------------------------------------------------------
+# Backgrounds
+# ---------------------------------------------------------------------------
+
+def _background_svg(pattern_type: str, size: int, body: str) -> str:
+    """Wrap pattern content in a full-size SVG filled with the pattern."""
+    pattern_id = f"pattern-{pattern_type}"
+    viewBox = f"0 0 {size} {size}"
+    
+    svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" width="100%" height="100%">\n'
+    svg_code += f'  <defs>\n'
+    svg_code += f'    <pattern id="{pattern_id}" viewBox="{viewBox}" width="{size/500}" height="{size/500}" patternUnits="objectBoundingBox">\n'
+    svg_code += body
+    svg_code += f'    </pattern>\n'
+    svg_code += f'  </defs>\n'
+    svg_code += f'  <rect width="100%" height="100%" fill="url(#{pattern_id})" />\n'
+    svg_code += '</svg>'
+    return svg_code
+
+
+@register_component("background", "grid")
+@register_component("background", FALLBACK_VARIANT)
+def _background_grid(variant: str, size: int, color: str, **kwargs) -> str:
+    # Also the default when the pattern type is not recognized
+    body = f'      <path d="M {size} 0 L 0 0 0 {size}" fill="none" stroke="{color}" stroke-width="1" />\n'
+    return _background_svg(variant, size, body)
+
+
+@register_component("background", "dots")
+def _background_dots(variant: str, size: int, color: str, **kwargs) -> str:
+    dot_size = size / 20
+    spacing = size / 5
+
+    body = ""
+    for x in range(0, size, int(spacing)):
+        for y in range(0, size, int(spacing)):
+            body += f'      <circle cx="{x}" cy="{y}" r="{dot_size}" fill="{color}" />\n'
+    return _background_svg(variant, size, body)
+
+
+@register_component("background", "waves")
+def _background_waves(variant: str, size: int, color: str, **kwargs) -> str:
+    amplitude = size / 10
+    frequency = 3
+    points = []
+
+    for x in range(0, size + 1, int(size / 20)):
+        y = amplitude * math.sin((x / size) * frequency * 2 * math.pi) + (size / 2)
+        points.append(f"{x},{y}")
+
+    body = f'      <polyline points="{" ".join(points)}" fill="none" stroke="{color}" stroke-width="2" />\n'
+    return _background_svg(variant, size, body)
+
+
+@register_component("background", "stripes")
+def _background_stripes(variant: str, size: int, color: str, **kwargs) -> str:
+    stripe_width = size / 10
+
+    body = ""
+    for i in range(0, size, int(stripe_width * 2)):
+        body += f'      <rect x="{i}" y="0" width="{stripe_width}" height="{size}" fill="{color}" opacity="0.5" />\n'
+    return _background_svg(variant, size, body)
+
+
+@register_component("background", "geometric")
+def _background_geometric(variant: str, size: int, color: str,
+                          palette_colors: Dict[str, str], **kwargs) -> str:
+    body = f'      <polygon points="0,0 {size},0 {size/2},{size/2}" fill="{color}" opacity="0.3" />\n'
+    body += f'      <polygon points="0,{size} {size},{size} {size/2},{size/2}" fill="{palette_colors["secondary"]}" opacity="0.3" />\n'
+    body += f'      <polygon points="0,0 0,{size} {size/2},{size/2}" fill="{palette_colors["accent"]}" opacity="0.3" />\n'
+    body += f'      <polygon points="{size},0 {size},{size} {size/2},{size/2}" fill="{palette_colors["neutral"]}" opacity="0.3" />\n'
+    return _background_svg(variant, size, body)
+
+
 def get_backgrounds(pattern_type: str, size: int = 100, 
                    color: str = None, palette: str = "default") -> Dict[str, Any]:
     """
     Get SVG background pattern components.
     
     Args:
-        pattern_type: Type of pattern ('grid', 'dots', 'waves', 'stripes', 'geometric')
+        pattern_type: Type of pattern ('grid', 'dots', 'waves', 'stripes', 'geometric'
+            or any registered background variant)
         size: Size of the pattern in pixels
         color: Primary color (overrides palette color if provided)
         palette: Color palette to use
@@ -292,64 +581,14 @@ def get_backgrounds(pattern_type: str, size: int = 100,
     Returns:
         Dictionary containing the SVG code and component information
     """
-    # Get palette colors or use defaults if palette doesn't exist
-    palette_colors = COLOR_PALETTES.get(palette, COLOR_PALETTES["default"])
+    palette_colors = _get_palette_colors(palette)
     
     # Use provided color or default to palette primary color
     primary_color = color if color else palette_colors["primary"]
-    secondary_color = palette_colors["secondary"]
-    accent_color = palette_colors["accent"]
-    neutral_color = palette_colors["neutral"]
-    
-    pattern_id = f"pattern-{pattern_type}"
-    viewBox = f"0 0 {size} {size}"
-    
-    svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" width="100%" height="100%">\n'
-    svg_code += f'  <defs>\n'
-    svg_code += f'    <pattern id="{pattern_id}" viewBox="{viewBox}" width="{size/500}" height="{size/500}" patternUnits="objectBoundingBox">\n'
-    
-    if pattern_type == "grid":
-        svg_code += f'      <path d="M {size} 0 L 0 0 0 {size}" fill="none" stroke="{primary_color}" stroke-width="1" />\n'
-    
-    elif pattern_type == "dots":
-        dot_size = size / 20
-        spacing = size / 5
-        
-        for x in range(0, size, int(spacing)):
-            for y in range(0, size, int(spacing)):
-                svg_code += f'      <circle cx="{x}" cy="{y}" r="{dot_size}" fill="{primary_color}" />\n'
-    
-    elif pattern_type == "waves":
-        amplitude = size / 10
-        frequency = 3
-        points = []
-        
-        for x in range(0, size + 1, int(size / 20)):
-            y = amplitude * math.sin((x / size) * frequency * 2 * math.pi) + (size / 2)
-            points.append(f"{x},{y}")
-        
-        svg_code += f'      <polyline points="{" ".join(points)}" fill="none" stroke="{primary_color}" stroke-width="2" />\n'
     
-    elif pattern_type == "stripes":
-        stripe_width = size / 10
-        
-        for i in range(0, size, int(stripe_width * 2)):
-            svg_code += f'      <rect x="{i}" y="0" width="{stripe_width}" height="{size}" fill="{primary_color}" opacity="0.5" />\n'
-    
-    elif pattern_type == "geometric":
-        svg_code += f'      <polygon points="0,0 {size},0 {size/2},{size/2}" fill="{primary_color}" opacity="0.3" />\n'
-        svg_code += f'      <polygon points="0,{size} {size},{size} {size/2},{size/2}" fill="{secondary_color}" opacity="0.3" />\n'
-        svg_code += f'      <polygon points="0,0 0,{size} {size/2},{size/2}" fill="{accent_color}" opacity="0.3" />\n'
-        svg_code += f'      <polygon points="{size},0 {size},{size} {size/2},{size/2}" fill="{neutral_color}" opacity="0.3" />\n'
-    
-    else:
-        # Default to a simple grid if pattern type is not recognized
-        svg_code += f'      <path d="M {size} 0 L 0 0 0 {size}" fill="none" stroke="{primary_color}" stroke-width="1" />\n'
-    
-    svg_code += f'    </pattern>\n'
-    svg_code += f'  </defs>\n'
-    svg_code += f'  <rect width="100%" height="100%" fill="url(#{pattern_id})" />\n'
-    svg_code += '</svg>'
+    generator = resolve_component("background", pattern_type)
+    svg_code = generator(variant=pattern_type, size=size, color=primary_color,
+                         palette_colors=palette_colors)
     
     return {
         "svg_code": svg_code,
@@ -360,13 +599,48 @@ def get_backgrounds(pattern_type: str, size: int = 100,
     }
 
 
+def _get_custom_component(component_type: str, variant: str, size: int, color: str,
+                          palette: str, **kwargs) -> Optional[Dict[str, Any]]:
+    """Build a component from a category that only exists in the registry."""
+    generator = resolve_component(component_type, variant)
+    if generator is None:
+        return None
+
+    palette_colors = _get_palette_colors(palette)
+    primary_color = color if color else palette_colors["primary"]
+    svg_code = generator(variant=variant, size=size, color=primary_color,
+                         palette_colors=palette_colors, **kwargs)
+
+    return {
+        "svg_code": svg_code,
+        "component_type": component_type,
+        "variant": variant,
+        "size": size,
+        "color": primary_color,
+        "palette": palette
+    }
+
+
+# Builders for the built-in categories, dispatched by component type
+_COMPONENT_BUILDERS = {
+    "loader": lambda variant, size, color, palette, kwargs:
+        get_loaders(variant, size, color, palette, kwargs.get("animated", True)),
+    "icon": lambda variant, size, color, palette, kwargs:
+        get_icons(variant, size, color, palette, kwargs.get("stroke_width")),
+    "background": lambda variant, size, color, palette, kwargs:
+        get_backgrounds(variant, size, color, palette),
+}
+
+
+@instrumented
 def get_svg_component(component_type: str, variant: str, size: int = 100, 
                      color: str = None, palette: str = "default", **kwargs) -> Dict[str, Any]:
     """
     Main function to get SVG components.
     
     Args:
-        component_type: Category of component ('loader', 'icon', 'background')
+        component_type: Category of component ('loader', 'icon', 'background'
+            or any category added with register_component)
         variant: Specific variant of the component
         size: Size of the component in pixels
         color: Primary color (overrides palette color if provided)
@@ -376,29 +650,22 @@ def get_svg_component(component_type: str, variant: str, size: int = 100,
     Returns:
         Dictionary containing the SVG code and component information
     """
-    if component_type == "loader":
-        animated = kwargs.get("animated", True)
-        return get_loaders(variant, size, color, palette, animated)
-    
-    elif component_type == "icon":
-        stroke_width = kwargs.get("stroke_width", 2)
-        return get_icons(variant, size, color, palette, stroke_width)
-    
-    elif component_type == "background":
-        return get_backgrounds(variant, size, color, palette)
+    builder = _COMPONENT_BUILDERS.get(component_type)
+    if builder is not None:
+        return builder(variant, size, color, palette, kwargs)
+    
+    result = _get_custom_component(component_type, variant, size, color, palette, **kwargs)
+    if result is not None:
+        return result
+    
+    # If component type is not recognized, return a default SVG with error message
+    svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">\n'
+    svg_code += f'  <rect width="{size}" height="{size}" fill="#f8d7da" />\n'
+    svg_code += f'  <text x="{size/2}" y="{size/2}" font-family="Arial" font-size="{size/10}" text-anchor="middle" fill="#721c24">Unknown Component</text>\n'
+    svg_code += '</svg>'
     
-    else:
-        # If component type is not recognized, return a default SVG with error message
-        svg_code = f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">\n'
-        svg_code += f'  <rect width="{size}" height="{size}" fill="#f8d7da" />\n'
-        svg_code += f'  <text x="{size/2}" y="{size/2}" font-family="Arial" font-size="{size/10}" text-anchor="middle" fill="#721c24">Unknown Component</text>\n'
-        svg_code += '</svg>'
-        
-        return {
-            "svg_code": svg_code,
-            "error": f"Unknown component type: {component_type}",
-            "size": size
-        }
-
-# Import required for math functions
-import math
\ No newline at end of file
+    return {
+        "svg_code": svg_code,
+        "error": f"Unknown component type: {component_type}",
+        "size": size
+    }
@@ -0,0 +1,558 @@
+"""
+SVG Equivalence Module for SVG-MCP.
+
+This module checks that an optimized SVG document renders like the original
+without rasterizing either. Both documents are reduced to their paint items,
+the shapes, text and images that are actually painted, in paint order. Each
+item carries its resolved style, with inherited properties, `style`
+declarations, currentColor and referenced gradients, clip paths, masks and
+filters. Its geometry is the outline transformed to root user space. Items are
+compared pairwise, coordinates within a tolerance.
+
+It also checks optimizer rules one at a time, across a corpus in parallel, and
+reports which rule broke which file.
+
+Stylesheets (<style> elements) are not evaluated; class names are compared
+instead, so moving a class between elements is reported.
+"""
+
+import os
+import re
+import math
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from svg_geometry import (CONTAINER_TAGS, IDENTITY, NON_RENDERED_TAGS, XLINK_HREF, GridIndex, Matrix, Point, _scale,
+                          _text_segments, distance_to_outline, document_bounds, flatten_segments, local_name,
+                          multiply, parse_number, parse_transform, presentation_attributes, shape_segments)
+from svg_metrics import instrumented, timed
+from svg_optimization import OPTIMIZATION_LEVELS, _resolve_rules
+from svg_recolor import normalize_color
+
+# Inherited properties that affect rendering
+INHERITED_PROPERTIES = frozenset({
+    "fill", "fill-opacity", "fill-rule", "stroke", "stroke-width", "stroke-opacity", "stroke-linecap",
+    "stroke-linejoin", "stroke-miterlimit", "stroke-dasharray", "stroke-dashoffset", "marker-start",
+    "marker-mid", "marker-end", "font-family", "font-size", "font-weight", "font-style", "text-anchor",
+    "visibility", "color"
+})
+
+# Properties applying to an element and its whole subtree without being inherited
+SUBTREE_PROPERTIES = frozenset({"opacity", "clip-path", "mask", "filter", "display"})
+
+STYLE_PROPERTIES = INHERITED_PROPERTIES | SUBTREE_PROPERTIES
+
+# Properties holding lengths, compared in root units like coordinates
+LENGTH_PROPERTIES = {"stroke-width", "stroke-dashoffset", "font-size"}
+
+# Properties on a 0-1 scale and the difference allowed between them
+UNIT_INTERVAL_PROPERTIES = {"opacity", "fill-opacity", "stroke-opacity"}
+UNIT_INTERVAL_TOLERANCE = 0.01
+
+INITIAL_STYLE: Dict[str, Any] = {
+    "fill": "#000000", "fill-opacity": 1.0, "fill-rule": "nonzero", "stroke": "none", "stroke-width": 1.0,
+    "stroke-opacity": 1.0, "stroke-linecap": "butt", "stroke-linejoin": "miter", "stroke-miterlimit": 4.0,
+    "stroke-dasharray": "none", "stroke-dashoffset": 0.0, "font-family": "", "font-size": 16.0,
+    "font-weight": "normal", "font-style": "normal", "text-anchor": "start", "visibility": "visible",
+    "color": "#000000", "opacity": 1.0, "references": ()
+}
+
+# Properties that only matter for some paint items
+FILL_PROPERTIES = ("fill-opacity", "fill-rule")
+STROKE_PROPERTIES = ("stroke-width", "stroke-opacity", "stroke-linecap", "stroke-linejoin", "stroke-miterlimit",
+                     "stroke-dasharray", "stroke-dashoffset")
+FONT_PROPERTIES = ("font-family", "font-size", "font-weight", "font-style", "text-anchor")
+MARKER_PROPERTIES = ("marker-start", "marker-mid", "marker-end")
+MARKER_TAGS = {"path", "line", "polyline", "polygon"}
+
+# Default tolerance as a fraction of the document diagonal
+RELATIVE_TOLERANCE = 0.001
+
+REFERENCE_PATTERN = re.compile(r'url\(\s*[\'"]?#([^)\'"\s]+)[\'"]?\s*\)')
+NUMBER_PATTERN = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+# Nesting of use references followed before giving up (they may be circular)
+MAX_USE_DEPTH = 16
+
+
+class _Document:
+    """A parsed document's paint items, with the definitions they reference resolved."""
+
+    def __init__(self, root: ET.Element):
+        self.root = root
+        self.ids = {elem.get("id"): elem for elem in root.iter() if elem.get("id")}
+        self._canonical: Dict[str, str] = {}
+        self.items: List[Dict[str, Any]] = []
+        self._visit(root, IDENTITY, INITIAL_STYLE, 0)
+
+    def canonical(self, ref: str) -> str:
+        """Id-independent description of a referenced element (gradient, clip path, ...)."""
+        if ref not in self._canonical:
+            self._canonical[ref] = "missing"
+            target = self.ids.get(ref)
+            self._canonical[ref] = self._describe(target, 0) if target is not None else "missing"
+        return self._canonical[ref]
+
+    def _describe(self, elem: ET.Element, depth: int) -> str:
+        attributes = []
+        for name, value in sorted(elem.attrib.items()):
+            if name == "id":
+                continue
+            if local_name(name) == "href" and value.startswith("#") and depth < 8:
+                value = self.canonical(value[1:])
+            value = REFERENCE_PATTERN.sub(lambda m: f"url({self.canonical(m.group(1)) if depth < 8 else m.group(1)})",
+                                          value)
+            # Numbers are compared to four significant digits
+            value = NUMBER_PATTERN.sub(lambda m: format(float(m.group(0)), ".4g"), value)
+            attributes.append(f"{local_name(name)}={value}")
+        children = "".join(self._describe(child, depth + 1) for child in elem if local_name(child.tag))
+        text = (elem.text or "").strip()
+        return f"<{local_name(elem.tag)} {' '.join(attributes)}>{text}{children}</>"
+
+    def _paint(self, value: str, style: Dict[str, Any]) -> str:
+        value = value.strip()
+        reference = REFERENCE_PATTERN.match(value)
+        if reference:
+            return f"url({self.canonical(reference.group(1))})"
+        if value == "currentColor":
+            return style["color"]
+        return normalize_color(value) or value.lower()
+
+    def _resolve(self, elem: ET.Element, style: Dict[str, Any], matrix: Matrix) -> Optional[Dict[str, Any]]:
+        """Computed style of an element from its parent's, or None if it is not displayed."""
+        properties = presentation_attributes(elem, STYLE_PROPERTIES)
+        style = dict(style)
+        # Subtree properties are accumulated rather than inherited
+        references = list(style["references"])
+        for name, value in properties.items():
+            value = value.strip()
+            if value == "inherit":
+                continue
+            if name == "display":
+                if value == "none":
+                    return None
+            elif name == "opacity":
+                style["opacity"] *= max(0.0, min(1.0, parse_number(value, 1.0)))
+            elif name in ("clip-path", "mask", "filter"):
+                if value != "none":
+                    reference = REFERENCE_PATTERN.match(value)
+                    references.append(f"{name}:{self.canonical(reference.group(1)) if reference else value}")
+            elif name in ("fill", "stroke", "color"):
+                style[name] = self._paint(value, style)
+            elif name in LENGTH_PROPERTIES:
+                style[name] = parse_number(value, INITIAL_STYLE[name]) * _scale(matrix)
+            elif name in UNIT_INTERVAL_PROPERTIES or name == "stroke-miterlimit":
+                style[name] = parse_number(value, INITIAL_STYLE[name])
+            elif name == "stroke-dasharray":
+                numbers = [float(n) * _scale(matrix) for n in NUMBER_PATTERN.findall(value)]
+                style[name] = tuple(numbers) if numbers and any(numbers) else "none"
+            elif name.startswith("marker-"):
+                reference = REFERENCE_PATTERN.match(value)
+                style[name] = self.canonical(reference.group(1)) if reference else value
+            else:
+                style[name] = value
+        style["references"] = tuple(sorted(references))
+        classes = elem.get("class")
+        if classes:
+            style["classes"] = tuple(sorted(set(style.get("classes", ())) | set(classes.split())))
+        return style
+
+    def _visit(self, elem: ET.Element, matrix: Matrix, style: Dict[str, Any], depth: int) -> None:
+        tag = local_name(elem.tag)
+        if not tag or tag in NON_RENDERED_TAGS:
+            return
+        if elem is not self.root:
+            matrix = multiply(matrix, parse_transform(elem.get("transform")))
+            if tag == "svg":
+                matrix = multiply(matrix, (1.0, 0.0, 0.0, 1.0, parse_number(elem.get("x")), parse_number(elem.get("y"))))
+        style = self._resolve(elem, style, matrix)
+        if style is None:
+            return
+
+        if tag in CONTAINER_TAGS:
+            for child in elem:
+                self._visit(child, matrix, style, depth)
+        elif tag == "use":
+            target = self.ids.get((elem.get("href") or elem.get(XLINK_HREF) or "").lstrip("#"))
+            if target is None or depth >= MAX_USE_DEPTH:
+                return
+            matrix = multiply(matrix, (1.0, 0.0, 0.0, 1.0, parse_number(elem.get("x")), parse_number(elem.get("y"))))
+            if local_name(target.tag) == "symbol":
+                for child in target:
+                    self._visit(child, matrix, style, depth + 1)
+            else:
+                self._visit(target, matrix, style, depth + 1)
+        elif tag == "text":
+            self._add_text(elem, matrix, style)
+        else:
+            self._add_shape(elem, tag, matrix, style)
+
+    def _add_shape(self, elem: ET.Element, tag: str, matrix: Matrix, style: Dict[str, Any]) -> None:
+        if style["visibility"] != "visible" or style["opacity"] <= 0:
+            return
+        if tag in ("image", "foreignObject"):
+            kind, painted = tag, True
+        else:
+            kind, painted = "shape", style["fill"] != "none" or style["stroke"] != "none"
+        segments = shape_segments(elem)
+        if not painted or not segments:
+            return
+        style = _effective_style(style, kind, tag)
+        if kind == "image":
+            style["href"] = elem.get("href") or elem.get(XLINK_HREF)
+        self.items.append({"kind": kind, "element": _label(elem), "style": style,
+                           "segments": _transform_segments(segments, matrix)})
+
+    def _add_text(self, elem: ET.Element, matrix: Matrix, style: Dict[str, Any]) -> None:
+        if style["visibility"] != "visible" or style["opacity"] <= 0:
+            return
+        content = " ".join("".join(elem.itertext()).split())
+        segments = _text_segments(elem, style["font-size"] / (_scale(matrix) or 1.0))
+        if not content or not segments:
+            return
+        style = dict(_effective_style(style, "text", "text"), text=content)
+        self.items.append({"kind": "text", "element": _label(elem), "style": style,
+                           "segments": _transform_segments(segments, matrix)})
+
+
+def _transform_segments(segments: List[Tuple[Point, ...]], matrix: Matrix) -> List[Tuple[Point, ...]]:
+    if matrix == IDENTITY:
+        return segments
+    a, b, c, d, e, f = matrix
+    return [tuple((a * x + c * y + e, b * x + d * y + f) for x, y in segment) for segment in segments]
+
+
+def _effective_style(style: Dict[str, Any], kind: str, tag: str) -> Dict[str, Any]:
+    """The computed properties that affect how an item is painted."""
+    ignored = {"color", "visibility"}
+    if kind in ("image", "foreignObject"):
+        ignored.update(("fill", "stroke") + FILL_PROPERTIES + STROKE_PROPERTIES)
+    if style["fill"] == "none":
+        ignored.update(FILL_PROPERTIES)
+    if style["stroke"] == "none":
+        ignored.update(STROKE_PROPERTIES)
+    if kind != "text":
+        ignored.update(FONT_PROPERTIES)
+    if tag not in MARKER_TAGS:
+        ignored.update(MARKER_PROPERTIES)
+    return {name: value for name, value in style.items() if name not in ignored}
+
+
+def _label(elem: ET.Element) -> str:
+    return f"{local_name(elem.tag)}#{elem.get('id')}" if elem.get("id") else local_name(elem.tag)
+
+
+def paint_items(root: ET.Element) -> List[Dict[str, Any]]:
+    """
+    The shapes, text and images a parsed document paints, in paint order.
+
+    Each item has a 'kind' ('shape', 'text', 'image' or 'foreignObject'), an
+    'element' label, its computed 'style' and its outline 'segments' (lines
+    and Bézier curves, as from svg_geometry.parse_path) in root user space.
+    """
+    return _Document(root).items
+
+
+def _dedupe(points: List[Point], tolerance: float) -> List[Point]:
+    kept = points[:1]
+    for point in points[1:]:
+        if math.hypot(point[0] - kept[-1][0], point[1] - kept[-1][1]) > tolerance:
+            kept.append(point)
+    return kept
+
+
+def _line_distance(x: float, y: float, line: Tuple[Point, Point]) -> float:
+    (x0, y0), (x1, y1) = line
+    dx, dy = x1 - x0, y1 - y0
+    length = dx * dx + dy * dy
+    t = max(0.0, min(1.0, ((x - x0) * dx + (y - y0) * dy) / length)) if length else 0.0
+    return math.hypot(x - x0 - t * dx, y - y0 - t * dy)
+
+
+def _line_index(subpaths: List[List[Point]], tolerance: float) -> GridIndex:
+    """Grid index of the lines of a flattened outline, with cells about as large as its lines."""
+    lines = [(points[i], points[min(i + 1, len(points) - 1)])
+             for points in subpaths for i in range(max(1, len(points) - 1))]
+    extent = sum(abs(b[0] - a[0]) + abs(b[1] - a[1]) for a, b in lines) / (2 * len(lines))
+    index = GridIndex(max(2 * tolerance, extent, 1e-9))
+    for a, b in lines:
+        index.insert((a, b), (min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1])))
+    return index
+
+
+def _directed_distance(points: List[List[Point]], outline: List[List[Point]], tolerance: float) -> float:
+    """
+    Largest distance from the points of one outline to the lines of another,
+    up to the first point farther than `tolerance`.
+    """
+    index = _line_index(outline, tolerance)
+    largest = 0.0
+    for x, y in (point for subpath in points for point in subpath):
+        nearest = min((_line_distance(x, y, line) for line in index.query_point(x, y, tolerance)), default=math.inf)
+        if nearest > tolerance:
+            return distance_to_outline(outline, x, y)
+        largest = max(largest, nearest)
+    return largest
+
+
+def outline_distance(a: List[Tuple[Point, ...]], b: List[Tuple[Point, ...]], tolerance: float) -> float:
+    """
+    Largest distance between two outlines given as segments.
+
+    Outlines made of the same kinds of segments are compared by their control
+    points, which bound the distance between the curves. Otherwise (segments
+    merged, split or converted by an optimization) both are flattened and
+    every point of each is measured against the nearby lines of the other,
+    found through a grid index. Past the tolerance, the distance of the first
+    point found that far is returned.
+    """
+    if a == b:
+        return 0.0
+    if len(a) == len(b) and all(len(p) == len(q) for p, q in zip(a, b)):
+        return max(math.hypot(x1 - x2, y1 - y2) for p, q in zip(a, b) for (x1, y1), (x2, y2) in zip(p, q))
+    first = [_dedupe(points, tolerance) for points in flatten_segments(a)]
+    second = [_dedupe(points, tolerance) for points in flatten_segments(b)]
+    if not first or not second:
+        return 0.0 if not first and not second else math.inf
+    distance = _directed_distance(first, second, tolerance)
+    if distance > tolerance:
+        return distance
+    return max(distance, _directed_distance(second, first, tolerance))
+
+
+def _style_differences(a: Dict[str, Any], b: Dict[str, Any], tolerance: float) -> List[str]:
+    differences = []
+    for name in sorted(set(a) | set(b)):
+        old, new = a.get(name), b.get(name)
+        if old == new:
+            continue
+        if isinstance(old, float) and isinstance(new, float):
+            allowed = UNIT_INTERVAL_TOLERANCE if name in UNIT_INTERVAL_PROPERTIES else tolerance
+            if name == "stroke-miterlimit":
+                allowed = 1e-6
+            if abs(old - new) <= allowed + 1e-9:
+                continue
+        elif isinstance(old, tuple) and isinstance(new, tuple) and name == "stroke-dasharray":
+            if len(old) == len(new) and all(abs(x - y) <= tolerance for x, y in zip(old, new)):
+                continue
+        differences.append(f"{name}: {old!r} -> {new!r}")
+    return differences
+
+
+def compare_paint_items(original: List[Dict[str, Any]], optimized: List[Dict[str, Any]],
+                        tolerance: float, max_differences: int = 10) -> List[Dict[str, Any]]:
+    """Differences between two paint item lists, in paint order."""
+    differences: List[Dict[str, Any]] = []
+    if len(original) != len(optimized):
+        differences.append({
+            "index": None,
+            "kind": "count",
+            "detail": f"{len(original)} painted items became {len(optimized)}"
+        })
+    for index, (a, b) in enumerate(zip(original, optimized)):
+        if len(differences) >= max_differences:
+            break
+        found = []
+        if a["kind"] != b["kind"]:
+            found.append(("kind", f"{a['kind']} -> {b['kind']}"))
+        else:
+            found.extend(("style", detail) for detail in _style_differences(a["style"], b["style"], tolerance))
+            distance = outline_distance(a["segments"], b["segments"], tolerance)
+            if distance > tolerance:
+                found.append(("geometry", f"outline moved by {distance:.6g} (tolerance {tolerance:.6g})"))
+        for kind, detail in found:
+            differences.append({
+                "index": index,
+                "kind": kind,
+                "original_element": a["element"],
+                "optimized_element": b["element"],
+                "detail": detail
+            })
+    return differences[:max_differences]
+
+
+def _default_tolerance(root: ET.Element, items: List[Dict[str, Any]]) -> float:
+    bounds = document_bounds(root)
+    if bounds is None:
+        points = [point for item in items for segment in item["segments"] for point in segment]
+        if points:
+            xs, ys = [p[0] for p in points], [p[1] for p in points]
+            bounds = (min(xs), min(ys), max(xs), max(ys))
+    diagonal = math.hypot(bounds[2] - bounds[0], bounds[3] - bounds[1]) if bounds else 0.0
+    return diagonal * RELATIVE_TOLERANCE if diagonal > 0 else 0.01
+
+
+def _parse(svg_code: str) -> ET.Element:
+    with timed("parse", module="svg_equivalence"):
+        return ET.fromstring(svg_code)
+
+
+@instrumented
+def compare_svg(original_svg: str, optimized_svg: str, tolerance: Optional[float] = None,
+                max_differences: int = 10) -> Dict[str, Any]:
+    """
+    Check that an optimized SVG document renders like the original.
+
+    Args:
+        original_svg: The original SVG code
+        optimized_svg: The optimized SVG code
+        tolerance: Largest distance, in root user units, coordinates may move
+            (defaults to 0.1% of the document diagonal)
+        max_differences: Most differences reported
+
+    Returns:
+        Dictionary telling whether the documents are equivalent, with their differences
+    """
+    try:
+        original_root = _parse(original_svg)
+    except ET.ParseError as e:
+        return {"success": False, "error": f"Error parsing the original SVG: {str(e)}"}
+    original = paint_items(original_root)
+    if tolerance is None:
+        tolerance = _default_tolerance(original_root, original)
+
+    try:
+        optimized = paint_items(_parse(optimized_svg))
+    except ET.ParseError as e:
+        differences = [{"index": None, "kind": "parse", "detail": f"Optimized SVG does not parse: {str(e)}"}]
+        optimized = []
+    else:
+        differences = compare_paint_items(original, optimized, tolerance, max_differences)
+
+    return {
+        "success": True,
+        "equivalent": not differences,
+        "differences": differences,
+        "stats": {
+            "painted_items_original": len(original),
+            "painted_items_optimized": len(optimized),
+            "tolerance": tolerance
+        }
+    }
+
+
+@instrumented
+def verify_optimization_rules(svg_code: str, level: str = "aggressive",
+                              rules: Optional[List[Union[str, Dict[str, Any]]]] = None,
+                              tolerance: Optional[float] = None, max_differences: int = 10) -> Dict[str, Any]:
+    """
+    Check every rule of an optimization level (or rule list) for rendering changes.
+
+    Rules are applied in order and each output is compared with its input. The
+    output of a rule that changes the rendering is discarded, so the following
+    rules are checked on a correct document and each break is attributed to
+    the rule that caused it.
+
+    Args:
+        svg_code: The SVG code
+        level: Optimization level whose rules are checked
+        rules: Rule list checked instead of the level's rules
+        tolerance: Largest distance coordinates may move (defaults to 0.1% of
+            the document diagonal)
+        max_differences: Most differences reported per rule
+
+    Returns:
+        Dictionary containing the result of each rule and the rules that broke the document
+    """
+    try:
+        resolved_rules = _resolve_rules(rules if rules is not None else OPTIMIZATION_LEVELS.get(level, []))
+    except KeyError as e:
+        return {"success": False, "error": f"Unknown optimization rule: {e.args[0]}"}
+    try:
+        root = _parse(svg_code)
+    except ET.ParseError as e:
+        return {"success": False, "error": f"Error parsing SVG: {str(e)}"}
+
+    items = paint_items(root)
+    if tolerance is None:
+        tolerance = _default_tolerance(root, items)
+
+    results = []
+    for name, rule in resolved_rules:
+        try:
+            output = rule(svg_code)
+        except Exception as e:
+            # A failing rule is reported like a breaking one, without stopping the others
+            differences = [{"index": None, "kind": "error", "detail": f"Rule raised {type(e).__name__}: {str(e)}"}]
+            results.append({"rule": name, "changed": False, "equivalent": False, "differences": differences})
+            continue
+        if output == svg_code:
+            results.append({"rule": name, "changed": False, "equivalent": True})
+            continue
+        try:
+            output_items = paint_items(_parse(output))
+        except ET.ParseError as e:
+            differences = [{"index": None, "kind": "parse", "detail": f"Output does not parse: {str(e)}"}]
+        else:
+            differences = compare_paint_items(items, output_items, tolerance, max_differences)
+        results.append({"rule": name, "changed": True, "equivalent": not differences, "differences": differences})
+        if not differences:
+            svg_code, items = output, output_items
+
+    broken = [result["rule"] for result in results if not result["equivalent"]]
+    return {
+        "success": True,
+        "equivalent": not broken,
+        "broken_rules": broken,
+        "rules": results,
+        "tolerance": tolerance
+    }
+
+
+def _verify_file_job(args: Tuple[str, str, Optional[List[Any]], Optional[float]]) -> Dict[str, Any]:
+    path, level, rules, tolerance = args
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            svg_code = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {"path": path, "success": False, "error": str(e)}
+    return dict(verify_optimization_rules(svg_code, level, rules, tolerance), path=path)
+
+
+@instrumented
+def verify_optimization_files(input_paths: List[str], level: str = "aggressive",
+                              rules: Optional[List[Union[str, Dict[str, Any]]]] = None,
+                              tolerance: Optional[float] = None, workers: Optional[int] = None,
+                              use_processes: bool = True) -> Dict[str, Any]:
+    """
+    Check optimization rules for rendering changes across many SVG files in parallel.
+
+    Args:
+        input_paths: SVG files to check
+        level: Optimization level whose rules are checked
+        rules: Rule list checked instead of the level's rules (names or
+            dictionaries, so they can be sent to worker processes)
+        tolerance: Largest distance coordinates may move (defaults to 0.1% of
+            each document's diagonal)
+        workers: Number of parallel workers (defaults to the CPU count)
+        use_processes: Use a process pool instead of threads
+
+    Returns:
+        Dictionary containing per-file results and, for each rule that broke
+        any file, the files it broke
+    """
+    start = time.perf_counter()
+    jobs = [(path, level, rules, tolerance) for path in input_paths]
+    if len(jobs) <= 1:
+        results = [_verify_file_job(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(_verify_file_job, jobs, chunksize=chunksize))
+
+    broken_rules: Dict[str, List[str]] = {}
+    for result in results:
+        for rule in result.get("broken_rules", ()):
+            broken_rules.setdefault(rule, []).append(result["path"])
+    checked = [result for result in results if result["success"]]
+    return {
+        "success": len(checked) == len(results),
+        "files": results,
+        "files_checked": len(checked),
+        "files_broken": sum(1 for result in checked if not result["equivalent"]),
+        "broken_rules": broken_rules,
+        "elapsed": round(time.perf_counter() - start, 3)
+    }
@@ -0,0 +1,880 @@
+"""
+SVG Geometry Module for SVG-MCP.
+
+This module computes bounding boxes of SVG elements: basic shapes, path data
+(lines, Bezier curves and arcs, bounded exactly rather than by their control
+points), text (estimated from the font size), `use` references and groups, with
+transforms applied. It also provides a uniform grid spatial index used to find
+the elements intersecting a rectangle without testing every element, and
+SVGGeometry, which answers range queries and hit tests (which elements are
+painted at a point, taking fills, strokes and fill rules into account) on a
+parsed document.
+
+Bounding boxes are (min_x, min_y, max_x, max_y) tuples in the user space of
+the root element (viewBox coordinates).
+"""
+
+import math
+import re
+import hashlib
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Set
+
+from svg_metrics import count_cache, instrumented, timed
+
+Matrix = Tuple[float, float, float, float, float, float]
+BBox = Tuple[float, float, float, float]
+Point = Tuple[float, float]
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# Elements whose content is never rendered directly
+NON_RENDERED_TAGS = {
+    "defs", "symbol", "clipPath", "mask", "marker", "pattern", "linearGradient",
+    "radialGradient", "filter", "style", "script", "title", "desc", "metadata"
+}
+
+CONTAINER_TAGS = {"svg", "g", "a", "switch"}
+
+# Average glyph advance and ascent as fractions of the font size, used to
+# estimate text extents without font metrics
+TEXT_ADVANCE = 0.6
+TEXT_ASCENT = 0.8
+DEFAULT_FONT_SIZE = 16.0
+
+# Control point distance approximating a quarter circle with a cubic Bezier
+KAPPA = 0.5522847498
+
+# Straight lines approximating each curve in outlines used for hit testing
+CURVE_STEPS = 16
+
+# Documents whose geometry hit_test_svg keeps
+GEOMETRY_CACHE_SIZE = 8
+
+NUMBER_PATTERN = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+TRANSFORM_PATTERN = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+PATH_COMMAND_PATTERN = re.compile(r'[MmLlHhVvCcSsQqTtAaZz]')
+
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+# Presentation properties read by compute_bboxes, and their initial values
+PRESENTATION_PROPERTIES = (
+    "font-size", "fill", "fill-rule", "stroke", "stroke-width", "display", "visibility", "pointer-events"
+)
+DEFAULT_STYLE: Dict[str, Any] = {
+    "font-size": DEFAULT_FONT_SIZE, "fill": True, "fill-rule": "nonzero", "stroke": False,
+    "stroke-width": 1.0, "display": True, "visibility": True, "pointer-events": True
+}
+
+
+def local_name(tag: Any) -> str:
+    """Tag name without its namespace ('' for comments and processing instructions)."""
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_number(value: Optional[str], default: float = 0.0) -> float:
+    """Leading number of an attribute value, ignoring units ('12px' -> 12)."""
+    if value is None:
+        return default
+    match = NUMBER_PATTERN.match(value.strip())
+    return float(match.group(0)) if match else default
+
+
+def multiply(m1: Matrix, m2: Matrix) -> Matrix:
+    """Product m1 * m2, the transform applying m2 first and then m1."""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1 * a2 + c1 * b2, b1 * a2 + d1 * b2,
+            a1 * c2 + c1 * d2, b1 * c2 + d1 * d2,
+            a1 * e2 + c1 * f2 + e1, b1 * e2 + d1 * f2 + f1)
+
+
+def apply_matrix(m: Matrix, x: float, y: float) -> Point:
+    return (m[0] * x + m[2] * y + m[4], m[1] * x + m[3] * y + m[5])
+
+
+def _scale(m: Matrix) -> float:
+    """Average length scale of a transform, used for stroke widths."""
+    return math.sqrt(abs(m[0] * m[3] - m[1] * m[2]))
+
+
+def _stretch(m: Matrix) -> float:
+    """Largest length scale of a transform (its largest singular value), bounding how far it moves a displacement."""
+    a, b, c, d = m[0], m[1], m[2], m[3]
+    squares = a * a + b * b + c * c + d * d
+    determinant = a * d - b * c
+    return math.sqrt((squares + math.sqrt(max(0.0, squares * squares - 4 * determinant * determinant))) / 2)
+
+
+def parse_transform(value: Optional[str]) -> Matrix:
+    """Matrix of a transform attribute (a list of transform functions)."""
+    matrix = IDENTITY
+    if not value:
+        return matrix
+    for name, args_text in TRANSFORM_PATTERN.findall(value):
+        args = [float(n) for n in NUMBER_PATTERN.findall(args_text)]
+        if name == "matrix" and len(args) == 6:
+            step = tuple(args)
+        elif name == "translate" and args:
+            step = (1.0, 0.0, 0.0, 1.0, args[0], args[1] if len(args) > 1 else 0.0)
+        elif name == "scale" and args:
+            step = (args[0], 0.0, 0.0, args[1] if len(args) > 1 else args[0], 0.0, 0.0)
+        elif name == "rotate" and args:
+            angle = math.radians(args[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, 0.0, 0.0)
+            if len(args) == 3:
+                cx, cy = args[1], args[2]
+                step = multiply(multiply((1.0, 0.0, 0.0, 1.0, cx, cy), step), (1.0, 0.0, 0.0, 1.0, -cx, -cy))
+        elif name == "skewX" and args:
+            step = (1.0, 0.0, math.tan(math.radians(args[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY" and args:
+            step = (1.0, math.tan(math.radians(args[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        matrix = multiply(matrix, step)
+    return matrix
+
+
+def union(boxes: Iterable[Optional[BBox]]) -> Optional[BBox]:
+    """Smallest box containing every box (None if there are none)."""
+    result = None
+    for box in boxes:
+        if box is None:
+            continue
+        if result is None:
+            result = box
+        else:
+            result = (min(result[0], box[0]), min(result[1], box[1]),
+                      max(result[2], box[2]), max(result[3], box[3]))
+    return result
+
+
+def intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def expand(box: BBox, margin: float) -> BBox:
+    return (box[0] - margin, box[1] - margin, box[2] + margin, box[3] + margin)
+
+
+def _arc_to_cubics(x1: float, y1: float, rx: float, ry: float, rotation: float,
+                   large_arc: bool, sweep: bool, x2: float, y2: float) -> List[Tuple[Point, ...]]:
+    """Convert an elliptical arc to cubic Bezier segments (SVG implementation notes F.6.5)."""
+    if (x1, y1) == (x2, y2):
+        return []
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return [((x1, y1), (x2, y2))]
+
+    phi = math.radians(rotation)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+
+    # Radii too small to reach the end point are scaled up
+    scale = (x1p / rx) ** 2 + (y1p / ry) ** 2
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+
+    numerator = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    denominator = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    coefficient = math.sqrt(max(0.0, numerator / denominator)) if denominator else 0.0
+    if large_arc == sweep:
+        coefficient = -coefficient
+    cxp, cyp = coefficient * rx * y1p / ry, -coefficient * ry * x1p / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (x1 + x2) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y1 + y2) / 2
+
+    def angle(ux, uy, vx, vy):
+        return math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+    start = angle(1, 0, (x1p - cxp) / rx, (y1p - cyp) / ry)
+    sweep_angle = angle((x1p - cxp) / rx, (y1p - cyp) / ry, (-x1p - cxp) / rx, (-y1p - cyp) / ry)
+    if not sweep and sweep_angle > 0:
+        sweep_angle -= 2 * math.pi
+    elif sweep and sweep_angle < 0:
+        sweep_angle += 2 * math.pi
+
+    def point(a):
+        return (cx + rx * math.cos(a) * cos_phi - ry * math.sin(a) * sin_phi,
+                cy + rx * math.cos(a) * sin_phi + ry * math.sin(a) * cos_phi)
+
+    def tangent(a):
+        return (-rx * math.sin(a) * cos_phi - ry * math.cos(a) * sin_phi,
+                -rx * math.sin(a) * sin_phi + ry * math.cos(a) * cos_phi)
+
+    count = max(1, math.ceil(abs(sweep_angle) / (math.pi / 2) - 1e-9))
+    delta = sweep_angle / count
+    handle = 4 / 3 * math.tan(delta / 4)
+    segments = []
+    previous = (x1, y1)
+    for i in range(count):
+        a1, a2 = start + i * delta, start + (i + 1) * delta
+        (t1x, t1y), (t2x, t2y) = tangent(a1), tangent(a2)
+        end = (x2, y2) if i == count - 1 else point(a2)
+        p2 = point(a2)
+        segments.append((previous, (previous[0] + handle * t1x, previous[1] + handle * t1y),
+                         (p2[0] - handle * t2x, p2[1] - handle * t2y), end))
+        previous = end
+    return segments
+
+
+def parse_path(d: str) -> List[Tuple[Point, ...]]:
+    """
+    Parse path data into absolute segments.
+
+    Segments are tuples of points: (start, end) for lines, (start, control,
+    end) for quadratic and (start, control1, control2, end) for cubic Bezier
+    curves. Arcs are converted to cubic curves. Parsing stops at the first
+    error, as renderers do.
+    """
+    segments: List[Tuple[Point, ...]] = []
+    tokens = [(m.group(0), m.start()) for m in re.finditer(
+        r'[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', d)]
+    position = 0
+    command = None
+    x = y = start_x = start_y = 0.0
+    last_control = None
+    last_command = None
+
+    def number():
+        nonlocal position
+        if position >= len(tokens) or PATH_COMMAND_PATTERN.fullmatch(tokens[position][0]):
+            raise ValueError("expected a number")
+        position += 1
+        return float(tokens[position - 1][0])
+
+    def flag():
+        # Arc flags may be written without separators ("a1 1 0 01 2 2")
+        nonlocal position
+        token, offset = tokens[position]
+        if token[0] not in "01":
+            raise ValueError("expected a flag")
+        if len(token) > 1:
+            rest = token[1:]
+            tokens[position] = (rest, offset + 1)
+        else:
+            position += 1
+        return token[0] == "1"
+
+    try:
+        while position < len(tokens):
+            token = tokens[position][0]
+            if PATH_COMMAND_PATTERN.fullmatch(token):
+                command = token
+                position += 1
+            elif command is None:
+                break
+            elif command in "Mm":
+                # Coordinates after a moveto are implicit linetos
+                command = "L" if command == "M" else "l"
+
+            relative = command.islower()
+            upper = command.upper()
+            ox, oy = (x, y) if relative else (0.0, 0.0)
+
+            if upper == "Z":
+                if (x, y) != (start_x, start_y):
+                    segments.append(((x, y), (start_x, start_y)))
+                x, y = start_x, start_y
+                last_control = None
+                last_command = "Z"
+                # Numbers cannot follow a closepath without a new command
+                command = None
+                continue
+            if upper == "M":
+                x, y = ox + number(), oy + number()
+                start_x, start_y = x, y
+                last_control = None
+            elif upper == "L":
+                end = (ox + number(), oy + number())
+                segments.append(((x, y), end))
+                x, y = end
+                last_control = None
+            elif upper == "H":
+                end = ((x if relative else 0.0) + number(), y)
+                segments.append(((x, y), end))
+                x, y = end
+                last_control = None
+            elif upper == "V":
+                end = (x, (y if relative else 0.0) + number())
+                segments.append(((x, y), end))
+                x, y = end
+                last_control = None
+            elif upper in "CS":
+                if upper == "C":
+                    c1 = (ox + number(), oy + number())
+                elif last_command in ("C", "S") and last_control:
+                    c1 = (2 * x - last_control[0], 2 * y - last_control[1])
+                else:
+                    c1 = (x, y)
+                c2 = (ox + number(), oy + number())
+                end = (ox + number(), oy + number())
+                segments.append(((x, y), c1, c2, end))
+                x, y = end
+                last_control = c2
+            elif upper in "QT":
+                if upper == "Q":
+                    c = (ox + number(), oy + number())
+                elif last_command in ("Q", "T") and last_control:
+                    c = (2 * x - last_control[0], 2 * y - last_control[1])
+                else:
+                    c = (x, y)
+                end = (ox + number(), oy + number())
+                segments.append(((x, y), c, end))
+                x, y = end
+                last_control = c
+            elif upper == "A":
+                rx, ry, rotation = number(), number(), number()
+                large_arc, sweep = flag(), flag()
+                end = (ox + number(), oy + number())
+                segments.extend(_arc_to_cubics(x, y, rx, ry, rotation, large_arc, sweep, *end))
+                x, y = end
+                last_control = None
+            last_command = upper
+    except (ValueError, IndexError):
+        pass
+    return segments
+
+
+def _extremes(*coordinates: float) -> List[float]:
+    """Parameters in (0, 1) where a quadratic or cubic Bezier coordinate is extreme."""
+    if len(coordinates) == 3:
+        p0, p1, p2 = coordinates
+        denominator = p0 - 2 * p1 + p2
+        return [(p0 - p1) / denominator] if denominator else []
+
+    p0, p1, p2, p3 = coordinates
+    a = p3 - 3 * p2 + 3 * p1 - p0
+    b = 2 * (p2 - 2 * p1 + p0)
+    c = p1 - p0
+    if abs(a) < 1e-12:
+        return [-c / b] if b else []
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return []
+    root = math.sqrt(discriminant)
+    return [(-b + root) / (2 * a), (-b - root) / (2 * a)]
+
+
+def _bezier_point(points: Tuple[Point, ...], t: float) -> Point:
+    u = 1 - t
+    if len(points) == 3:
+        (x0, y0), (x1, y1), (x2, y2) = points
+        return (u * u * x0 + 2 * u * t * x1 + t * t * x2, u * u * y0 + 2 * u * t * y1 + t * t * y2)
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+    return (u ** 3 * x0 + 3 * u * u * t * x1 + 3 * u * t * t * x2 + t ** 3 * x3,
+            u ** 3 * y0 + 3 * u * u * t * y1 + 3 * u * t * t * y2 + t ** 3 * y3)
+
+
+def segments_bbox(segments: List[Tuple[Point, ...]], matrix: Matrix = IDENTITY) -> Optional[BBox]:
+    """
+    Exact bounding box of path segments after a transform.
+
+    Affine transforms map Bezier curves to Bezier curves, so the control points
+    are transformed first and the extremes found on the transformed curves.
+    """
+    xs: List[float] = []
+    ys: List[float] = []
+    for segment in segments:
+        points = tuple(apply_matrix(matrix, px, py) for px, py in segment) if matrix != IDENTITY else segment
+        for px, py in (points[0], points[-1]):
+            xs.append(px)
+            ys.append(py)
+        if len(points) > 2:
+            for axis in (0, 1):
+                for t in _extremes(*(p[axis] for p in points)):
+                    if 0 < t < 1:
+                        px, py = _bezier_point(points, t)
+                        xs.append(px)
+                        ys.append(py)
+    if not xs:
+        return None
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _ellipse_segments(cx: float, cy: float, rx: float, ry: float) -> List[Tuple[Point, ...]]:
+    kx, ky = rx * KAPPA, ry * KAPPA
+    return [
+        ((cx + rx, cy), (cx + rx, cy + ky), (cx + kx, cy + ry), (cx, cy + ry)),
+        ((cx, cy + ry), (cx - kx, cy + ry), (cx - rx, cy + ky), (cx - rx, cy)),
+        ((cx - rx, cy), (cx - rx, cy - ky), (cx - kx, cy - ry), (cx, cy - ry)),
+        ((cx, cy - ry), (cx + kx, cy - ry), (cx + rx, cy - ky), (cx + rx, cy)),
+    ]
+
+
+def _polygon_segments(points: List[Point], closed: bool) -> List[Tuple[Point, ...]]:
+    if len(points) == 1:
+        return [(points[0], points[0])]
+    segments = list(zip(points, points[1:]))
+    if closed and len(points) > 2:
+        segments.append((points[-1], points[0]))
+    return segments
+
+
+def parse_points(value: Optional[str]) -> List[Point]:
+    numbers = [float(n) for n in NUMBER_PATTERN.findall(value or "")]
+    return list(zip(numbers[0::2], numbers[1::2]))
+
+
+def shape_segments(elem: ET.Element) -> Optional[List[Tuple[Point, ...]]]:
+    """Outline of a basic shape or path as segments (None for other elements)."""
+    tag = local_name(elem.tag)
+    get = elem.get
+    if tag == "path":
+        return parse_path(get("d", ""))
+    if tag in ("rect", "image", "foreignObject", "use"):
+        x, y = parse_number(get("x")), parse_number(get("y"))
+        width, height = parse_number(get("width")), parse_number(get("height"))
+        if tag == "use" or width <= 0 or height <= 0:
+            return None
+        return _polygon_segments([(x, y), (x + width, y), (x + width, y + height), (x, y + height)], True)
+    if tag == "circle":
+        r = parse_number(get("r"))
+        return _ellipse_segments(parse_number(get("cx")), parse_number(get("cy")), r, r) if r > 0 else None
+    if tag == "ellipse":
+        rx, ry = parse_number(get("rx")), parse_number(get("ry"))
+        if rx <= 0 or ry <= 0:
+            return None
+        return _ellipse_segments(parse_number(get("cx")), parse_number(get("cy")), rx, ry)
+    if tag == "line":
+        return [((parse_number(get("x1")), parse_number(get("y1"))),
+                 (parse_number(get("x2")), parse_number(get("y2"))))]
+    if tag in ("polyline", "polygon"):
+        points = parse_points(get("points"))
+        return _polygon_segments(points, tag == "polygon") if points else None
+    return None
+
+
+def _text_segments(elem: ET.Element, font_size: float) -> Optional[List[Tuple[Point, ...]]]:
+    """Estimated extent of a text element from its position, length and font size."""
+    content = "".join(elem.itertext())
+    if not content.strip():
+        return None
+    x = parse_number((elem.get("x") or "0").split()[0] if elem.get("x") else None)
+    y = parse_number((elem.get("y") or "0").split()[0] if elem.get("y") else None)
+    width = len(content) * font_size * TEXT_ADVANCE
+    anchor = elem.get("text-anchor")
+    if anchor == "middle":
+        x -= width / 2
+    elif anchor == "end":
+        x -= width
+    top, bottom = y - font_size * TEXT_ASCENT, y + font_size * (1 - TEXT_ASCENT)
+    return _polygon_segments([(x, top), (x + width, top), (x + width, bottom), (x, bottom)], True)
+
+
+def document_bounds(root: ET.Element) -> Optional[BBox]:
+    """Area of the root user space shown by the document (its viewBox, or its width and height)."""
+    view_box = [float(n) for n in NUMBER_PATTERN.findall(root.get("viewBox", ""))]
+    if len(view_box) == 4 and view_box[2] > 0 and view_box[3] > 0:
+        return (view_box[0], view_box[1], view_box[0] + view_box[2], view_box[1] + view_box[3])
+    width, height = parse_number(root.get("width")), parse_number(root.get("height"))
+    if width > 0 and height > 0:
+        return (0.0, 0.0, width, height)
+    return None
+
+
+def presentation_attributes(elem: ET.Element, properties: Iterable[str] = PRESENTATION_PROPERTIES) -> Dict[str, str]:
+    """Values of presentation properties set on an element, `style` declarations taking precedence."""
+    values = {name: elem.get(name) for name in properties if elem.get(name) is not None}
+    for declaration in (elem.get("style") or "").split(";"):
+        name, separator, value = declaration.partition(":")
+        if separator and name.strip() in properties:
+            values[name.strip()] = value.strip()
+    return values
+
+
+def compute_bboxes(root: ET.Element, include_stroke: bool = False,
+                   details: Optional[Dict[ET.Element, Tuple[Matrix, Dict[str, Any]]]] = None) -> Dict[ET.Element, BBox]:
+    """
+    Bounding boxes of every rendered element, in root user space.
+
+    Containers get the union of their children. Elements inside defs, symbols,
+    clip paths and other non-rendered containers are skipped; `use` elements
+    get the box of the element they reference.
+
+    Args:
+        root: Root element of the parsed SVG
+        include_stroke: Grow boxes by half the (inherited) stroke width, for
+            visibility tests rather than geometry
+        details: Dictionary receiving, for every element with a box, its
+            transform to root user space and its computed style (font-size,
+            fill, fill-rule, stroke, stroke-width, display, visibility and
+            pointer-events)
+
+    Returns:
+        Dictionary mapping elements to boxes (elements without geometry are absent)
+    """
+    ids = {elem.get("id"): elem for elem in root.iter() if elem.get("id")}
+    boxes: Dict[ET.Element, BBox] = {}
+
+    def visit(elem: ET.Element, matrix: Matrix, style: Dict[str, Any], record: bool, depth: int) -> Optional[BBox]:
+        tag = local_name(elem.tag)
+        # Depth bounds use chains, which may be circular
+        if not tag or tag in NON_RENDERED_TAGS or depth > 32:
+            return None
+        if elem is not root:
+            matrix = multiply(matrix, parse_transform(elem.get("transform")))
+            if tag == "svg":
+                matrix = multiply(matrix, (1.0, 0.0, 0.0, 1.0, parse_number(elem.get("x")), parse_number(elem.get("y"))))
+
+        properties = presentation_attributes(elem)
+        if properties:
+            style = dict(style)
+            for name, value in properties.items():
+                if name in ("font-size", "stroke-width"):
+                    style[name] = parse_number(value, style[name] if name == "font-size" else 1.0)
+                elif name in ("fill", "stroke", "pointer-events"):
+                    style[name] = value != "none"
+                elif name == "visibility":
+                    style[name] = value not in ("hidden", "collapse")
+                elif name == "display":
+                    # Descendants of an element that is not displayed cannot be displayed
+                    style[name] = style[name] and value != "none"
+                else:
+                    style[name] = value
+
+        if tag in CONTAINER_TAGS:
+            box = union([visit(child, matrix, style, record, depth) for child in elem])
+        elif tag == "use":
+            reference = (elem.get("href") or elem.get(XLINK_HREF) or "").lstrip("#")
+            target = ids.get(reference)
+            if target is None:
+                return None
+            matrix = multiply(matrix, (1.0, 0.0, 0.0, 1.0, parse_number(elem.get("x")), parse_number(elem.get("y"))))
+            # The referenced element is measured at the use's position without being recorded
+            if local_name(target.tag) == "symbol":
+                box = union([visit(child, matrix, style, False, depth + 1) for child in target])
+            else:
+                box = visit(target, matrix, style, False, depth + 1)
+        elif tag == "text":
+            segments = _text_segments(elem, style["font-size"])
+            box = segments_bbox(segments, matrix) if segments else None
+        else:
+            segments = shape_segments(elem)
+            box = segments_bbox(segments, matrix) if segments else None
+
+        if box is not None and include_stroke and style["stroke"] and tag not in CONTAINER_TAGS and tag != "use":
+            box = expand(box, style["stroke-width"] * _scale(matrix) / 2)
+        if box is not None and record:
+            boxes[elem] = box
+            if details is not None:
+                details[elem] = (matrix, style)
+        return box
+
+    visit(root, IDENTITY, dict(DEFAULT_STYLE), True, 0)
+    return boxes
+
+
+def _cells(box: BBox, cell_size: float) -> Iterable[Tuple[int, int]]:
+    for cx in range(math.floor(box[0] / cell_size), math.floor(box[2] / cell_size) + 1):
+        for cy in range(math.floor(box[1] / cell_size), math.floor(box[3] / cell_size) + 1):
+            yield cx, cy
+
+
+class GridIndex:
+    """
+    Uniform grid spatial index of bounding boxes.
+
+    Each item is stored in every cell its box overlaps; items whose box covers
+    more than `max_cells` cells are kept in a separate list that every query
+    checks, so very large elements do not flood the grid. Queries only visit
+    cells inside the occupied extent, and scan the occupied cells instead when
+    the query covers more cells than there are.
+    """
+
+    def __init__(self, cell_size: float, max_cells: int = 1024):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._large: List[int] = []
+        self._extent: Optional[Tuple[int, int, int, int]] = None
+        self.boxes: List[BBox] = []
+        self.items: List[Any] = []
+
+    def insert(self, item: Any, box: BBox) -> None:
+        index = len(self.items)
+        self.items.append(item)
+        self.boxes.append(box)
+        columns = math.floor(box[2] / self.cell_size) - math.floor(box[0] / self.cell_size) + 1
+        rows = math.floor(box[3] / self.cell_size) - math.floor(box[1] / self.cell_size) + 1
+        if columns * rows > self.max_cells:
+            self._large.append(index)
+            return
+        for cell in _cells(box, self.cell_size):
+            self._cells.setdefault(cell, []).append(index)
+        x0, y0 = math.floor(box[0] / self.cell_size), math.floor(box[1] / self.cell_size)
+        x1, y1 = x0 + columns - 1, y0 + rows - 1
+        if self._extent is None:
+            self._extent = (x0, y0, x1, y1)
+        else:
+            e = self._extent
+            self._extent = (min(e[0], x0), min(e[1], y0), max(e[2], x1), max(e[3], y1))
+
+    def _query_cells(self, box: BBox) -> Iterable[List[int]]:
+        """Item lists of the occupied cells the box overlaps."""
+        if self._extent is None:
+            return
+        x0 = max(math.floor(box[0] / self.cell_size), self._extent[0])
+        y0 = max(math.floor(box[1] / self.cell_size), self._extent[1])
+        x1 = min(math.floor(box[2] / self.cell_size), self._extent[2])
+        y1 = min(math.floor(box[3] / self.cell_size), self._extent[3])
+        if x1 < x0 or y1 < y0:
+            return
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            for (cx, cy), indices in self._cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    yield indices
+        else:
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    indices = self._cells.get((cx, cy))
+                    if indices:
+                        yield indices
+
+    def query_indices(self, box: BBox) -> List[int]:
+        """Insertion indices of the items whose box intersects `box`, in insertion order."""
+        found: Set[int] = set()
+        for indices in self._query_cells(box):
+            for index in indices:
+                if index not in found and intersects(self.boxes[index], box):
+                    found.add(index)
+        for index in self._large:
+            if intersects(self.boxes[index], box):
+                found.add(index)
+        return sorted(found)
+
+    def query(self, box: BBox) -> List[Any]:
+        """Items whose box intersects `box`, in insertion order."""
+        return [self.items[index] for index in self.query_indices(box)]
+
+    def query_point(self, x: float, y: float, radius: float = 0.0) -> List[Any]:
+        """Items whose box is within `radius` of a point, in insertion order."""
+        return self.query((x - radius, y - radius, x + radius, y + radius))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def flatten_segments(segments: List[Tuple[Point, ...]], matrix: Matrix = IDENTITY,
+                     steps: int = CURVE_STEPS) -> List[List[Point]]:
+    """
+    Transformed outline of path segments as polylines, one per subpath.
+
+    Curves are approximated by `steps` straight lines each. A subpath ends
+    where a segment does not start at the end of the previous one.
+    """
+    subpaths: List[List[Point]] = []
+    current: List[Point] = []
+    for segment in segments:
+        points = tuple(apply_matrix(matrix, px, py) for px, py in segment) if matrix != IDENTITY else segment
+        if not current or current[-1] != points[0]:
+            current = [points[0]]
+            subpaths.append(current)
+        if len(points) == 2:
+            current.append(points[1])
+        else:
+            current.extend(_bezier_point(points, i / steps) for i in range(1, steps))
+            current.append(points[-1])
+    return subpaths
+
+
+def point_in_outline(subpaths: List[List[Point]], x: float, y: float, fill_rule: str = "nonzero") -> bool:
+    """Whether a point is inside the area filled by an outline (open subpaths are closed, as for fills)."""
+    winding = crossings = 0
+    for points in subpaths:
+        for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+            side = (x1 - x0) * (y - y0) - (x - x0) * (y1 - y0)
+            if y0 <= y < y1 and side > 0:
+                winding += 1
+                crossings += 1
+            elif y1 <= y < y0 and side < 0:
+                winding -= 1
+                crossings += 1
+    return crossings % 2 == 1 if fill_rule == "evenodd" else winding != 0
+
+
+def distance_to_outline(subpaths: List[List[Point]], x: float, y: float) -> float:
+    """Distance from a point to the nearest line of an outline."""
+    best = math.inf
+    for points in subpaths:
+        if len(points) == 1:
+            best = min(best, math.hypot(x - points[0][0], y - points[0][1]))
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            dx, dy = x1 - x0, y1 - y0
+            length = dx * dx + dy * dy
+            t = max(0.0, min(1.0, ((x - x0) * dx + (y - y0) * dy) / length)) if length else 0.0
+            best = min(best, math.hypot(x - x0 - t * dx, y - y0 - t * dy))
+    return best
+
+
+class SVGGeometry:
+    """
+    Geometry of a parsed SVG document, for range queries and hit testing.
+
+    Bounding boxes are computed once for the whole document and indexed in a
+    grid; element outlines are computed on first use and cached. The geometry
+    describes the tree at construction time, so a new instance is needed after
+    the document changes.
+
+    Rectangles are given as x, y, width and height in root user space (viewBox
+    coordinates), like viewBox values and the `:within(x,y,w,h)` selector.
+    """
+
+    def __init__(self, root: ET.Element):
+        self.root = root
+        self._details: Dict[ET.Element, Tuple[Matrix, Dict[str, Any]]] = {}
+        self._boxes = compute_bboxes(root, details=self._details)
+        self._outlines: Dict[ET.Element, List[List[Point]]] = {}
+        self._order = {elem: i for i, elem in enumerate(root.iter())}
+
+        bounds = document_bounds(root) or self._boxes.get(root)
+        side = max(bounds[2] - bounds[0], bounds[3] - bounds[1]) if bounds else 0.0
+        # About one element per cell on average
+        cell_size = side / max(1, round(math.sqrt(len(self._boxes)))) if side > 0 else 1.0
+        self.index = GridIndex(cell_size)
+        for elem in sorted(self._boxes, key=self._order.__getitem__):
+            self.index.insert(elem, self._hit_box(elem))
+
+    def _hit_box(self, elem: ET.Element) -> BBox:
+        """Bounding box including the stroke, which can be hit too."""
+        matrix, style = self._details[elem]
+        if style["stroke"] and local_name(elem.tag) not in CONTAINER_TAGS:
+            return expand(self._boxes[elem], style["stroke-width"] * _scale(matrix) / 2)
+        return self._boxes[elem]
+
+    def bbox(self, elem: ET.Element) -> Optional[BBox]:
+        """Bounding box of an element without its stroke (None for elements without geometry)."""
+        return self._boxes.get(elem)
+
+    def transform(self, elem: ET.Element) -> Optional[Matrix]:
+        """Transform from an element's user space to root user space."""
+        details = self._details.get(elem)
+        return details[0] if details else None
+
+    def outline(self, elem: ET.Element) -> Optional[List[List[Point]]]:
+        """Outline of a shape, path, text or image in root user space, as polylines."""
+        if elem not in self._outlines:
+            details = self._details.get(elem)
+            tag = local_name(elem.tag)
+            if details is None or tag in CONTAINER_TAGS or tag == "use":
+                return None
+            matrix, style = details
+            segments = _text_segments(elem, style["font-size"]) if tag == "text" else shape_segments(elem)
+            self._outlines[elem] = flatten_segments(segments or [], matrix)
+        return self._outlines[elem]
+
+    def intersecting(self, x: float, y: float, width: float, height: float) -> List[ET.Element]:
+        """Elements whose bounding box intersects a rectangle, in document order."""
+        box = (x, y, x + width, y + height)
+        return [elem for elem in self.index.query(box) if intersects(self._boxes[elem], box)]
+
+    def within(self, x: float, y: float, width: float, height: float) -> List[ET.Element]:
+        """Elements whose bounding box lies entirely inside a rectangle, in document order."""
+        box = (x, y, x + width, y + height)
+        return [elem for elem in self.index.query(box)
+                if box[0] <= self._boxes[elem][0] and self._boxes[elem][2] <= box[2]
+                and box[1] <= self._boxes[elem][1] and self._boxes[elem][3] <= box[3]]
+
+    def hit(self, elem: ET.Element, x: float, y: float, tolerance: float = 0.0) -> bool:
+        """
+        Whether a point hits the painted area of an element (its fill or stroke).
+
+        Containers are hit through their children and `use` elements by their
+        bounding box. Hidden elements and elements with pointer-events="none"
+        are never hit.
+        """
+        details = self._details.get(elem)
+        tag = local_name(elem.tag)
+        if details is None or tag in CONTAINER_TAGS:
+            return False
+        matrix, style = details
+        if not (style["display"] and style["visibility"] and style["pointer-events"]):
+            return False
+        if tag == "use":
+            return intersects(expand(self._hit_box(elem), tolerance), (x, y, x, y))
+
+        subpaths = self.outline(elem)
+        filled = style["fill"] or tag in ("image", "foreignObject")
+        if filled and point_in_outline(subpaths, x, y, style["fill-rule"]):
+            return True
+        reach = tolerance + (style["stroke-width"] * _scale(matrix) / 2 if style["stroke"] else 0.0)
+        return reach > 0 and distance_to_outline(subpaths, x, y) <= reach
+
+    def hit_test(self, x: float, y: float, tolerance: float = 0.0) -> List[ET.Element]:
+        """
+        Elements painted at a point, topmost first.
+
+        Args:
+            x: X coordinate in root user space
+            y: Y coordinate in root user space
+            tolerance: Extra distance within which outlines still count as hit
+                (useful for thin lines and touch input)
+        """
+        candidates = self.index.query_point(x, y, tolerance)
+        return [elem for elem in reversed(candidates) if self.hit(elem, x, y, tolerance)]
+
+
+# Geometry of recently queried documents, keyed by a digest of their code
+_geometry_cache: "OrderedDict[str, SVGGeometry]" = OrderedDict()
+_geometry_cache_lock = threading.Lock()
+
+
+def _document_geometry(svg_code: str) -> SVGGeometry:
+    key = hashlib.sha1(svg_code.encode("utf-8")).hexdigest()
+    with _geometry_cache_lock:
+        geometry = _geometry_cache.get(key)
+        if geometry is not None:
+            _geometry_cache.move_to_end(key)
+    count_cache("geometry", geometry is not None)
+    if geometry is None:
+        with timed("parse", module="svg_geometry"):
+            root = ET.fromstring(svg_code)
+        geometry = SVGGeometry(root)
+        with _geometry_cache_lock:
+            _geometry_cache[key] = geometry
+            while len(_geometry_cache) > GEOMETRY_CACHE_SIZE:
+                _geometry_cache.popitem(last=False)
+    return geometry
+
+
+@instrumented
+def hit_test_svg(svg_code: str, x: float, y: float, tolerance: float = 0.0) -> Dict[str, Any]:
+    """
+    Find the elements of an SVG document painted at a point.
+
+    The geometry of the last few documents is kept, so repeated queries on
+    the same document (clicks on a large map) do not parse and measure it
+    again.
+
+    Args:
+        svg_code: The SVG code
+        x: X coordinate in root user space (viewBox coordinates)
+        y: Y coordinate in root user space
+        tolerance: Extra distance within which outlines still count as hit
+
+    Returns:
+        Dictionary containing the hit elements, topmost first
+    """
+    try:
+        geometry = _document_geometry(svg_code)
+    except ET.ParseError as e:
+        return {"success": False, "error": f"Error parsing SVG: {str(e)}"}
+
+    hits = geometry.hit_test(x, y, tolerance)
+    return {
+        "success": True,
+        "hits": [{
+            "id": elem.get("id"),
+            "tag": local_name(elem.tag),
+            "bbox": list(geometry.bbox(elem))
+        } for elem in hits]
+    }
@@ -0,0 +1,394 @@
+"""
+SVG Icon Pack Module for SVG-MCP.
+
+This module imports directories of SVG icon files into a packed index file that
+can be memory-mapped at startup. Imported icons are served through the component
+registry, so get_icons applies size, palette and stroke width to them like the
+built-in icons.
+"""
+
+import os
+import re
+import mmap
+import json
+import glob
+import struct
+from typing import Dict, Any, List, Optional, Tuple, Callable
+import xml.etree.ElementTree as ET
+
+from svg_optimization import optimize_svg
+from svg_components import register_component_resolver
+from svg_metrics import instrumented
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+# Icon bodies are serialized here, so keep the conventional prefixes whether or
+# not another module has registered them yet
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+PACK_MAGIC = b"SVGPACK1"
+# Header: magic, number of icons
+HEADER_FORMAT = "<8sI"
+# Index entry: name offset, name length, data offset, data length (relative to the blob)
+ENTRY_FORMAT = "<IIII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+
+# Placeholder written into icon bodies for each recolorable color slot
+COLOR_SLOT = "@@c{}@@"
+COLOR_SLOT_PATTERN = re.compile(r'@@c(\d+)@@')
+
+# Palette roles assigned to color slots, most frequent color first
+SLOT_ROLES = ["primary", "secondary", "accent", "neutral"]
+
+# Attributes on the icon root that are kept when rendering
+ROOT_PRESENTATION_ATTRIBUTES = ["fill", "stroke", "stroke-width", "stroke-linecap",
+                                "stroke-linejoin", "fill-rule", "clip-rule"]
+
+NON_COLOR_VALUES = {"none", "currentcolor", "inherit", "transparent", ""}
+
+
+def _local_name(tag: str) -> str:
+    """Remove the namespace from an ElementTree tag."""
+    return tag.split("}")[-1]
+
+
+def _is_recolorable(value: str) -> bool:
+    """Whether a paint value is a plain color that can become a parameter."""
+    value = value.strip().lower()
+    return value not in NON_COLOR_VALUES and not value.startswith("url(")
+
+
+def _extract_color_slots(root: ET.Element) -> List[str]:
+    """
+    Replace fill and stroke colors with slot placeholders.
+
+    Colors are ordered by number of uses so slot 0 is the dominant color.
+
+    Returns:
+        The original colors, indexed by slot
+    """
+    counts: Dict[str, int] = {}
+    usages: List[Tuple[ET.Element, str, str]] = []
+
+    for elem in root.iter():
+        for attr in ("fill", "stroke"):
+            value = elem.get(attr)
+            if value and _is_recolorable(value):
+                color = value.strip().lower()
+                counts[color] = counts.get(color, 0) + 1
+                usages.append((elem, attr, color))
+
+        style = elem.get("style")
+        if style:
+            for match in re.finditer(r'(?:^|;)\s*(fill|stroke)\s*:\s*([^;]+)', style):
+                if _is_recolorable(match.group(2)):
+                    color = match.group(2).strip().lower()
+                    counts[color] = counts.get(color, 0) + 1
+            usages.append((elem, "style", ""))
+
+    colors = sorted(counts, key=lambda c: (-counts[c], c))
+    slots = {color: COLOR_SLOT.format(i) for i, color in enumerate(colors)}
+
+    def replace_style_color(match):
+        color = match.group(3).strip().lower()
+        if color not in slots:
+            return match.group(0)
+        return f"{match.group(1)}{match.group(2)}:{slots[color]}"
+
+    for elem, attr, color in usages:
+        if attr == "style":
+            elem.set("style", re.sub(r'(^|;)(\s*(?:fill|stroke)\s*)\s*:\s*([^;]+)',
+                                     replace_style_color, elem.get("style")))
+        else:
+            elem.set(attr, slots[color])
+
+    return colors
+
+
+def _process_icon_file(path: str, name: str, level: str) -> Dict[str, Any]:
+    """
+    Normalize, optimize and parametrize a single icon file.
+
+    Returns:
+        Dictionary with the icon record, or an error description
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            svg_code = f.read()
+
+        optimized = optimize_svg(svg_code, level=level)["optimized_svg"]
+        root = ET.fromstring(optimized)
+
+        view_box = root.get("viewBox")
+        if not view_box:
+            width = re.sub(r'[^\d.]', '', root.get("width", "")) or "24"
+            height = re.sub(r'[^\d.]', '', root.get("height", "")) or width
+            view_box = f"0 0 {width} {height}"
+
+        colors = _extract_color_slots(root)
+
+        root_attrs = {}
+        for attr in ROOT_PRESENTATION_ATTRIBUTES:
+            if root.get(attr) is not None:
+                root_attrs[attr] = root.get(attr)
+
+        # Serialize children without namespace prefixes
+        for elem in root.iter():
+            elem.tag = _local_name(elem.tag)
+        body = "".join(ET.tostring(child, encoding="unicode") for child in root)
+
+        return {
+            "name": name,
+            "record": {
+                "viewBox": view_box,
+                "attrs": root_attrs,
+                "colors": colors,
+                "body": body
+            }
+        }
+
+    except Exception as e:
+        return {"name": name, "error": f"{path}: {str(e)}"}
+
+
+def _icon_name(path: str, directory: str) -> str:
+    """Icon name from its path relative to the pack directory."""
+    relative = os.path.relpath(path, directory)
+    stem = os.path.splitext(relative)[0]
+    return re.sub(r'[^a-zA-Z0-9\-_]+', '-', stem.replace(os.sep, "-")).strip('-').lower()
+
+
+def write_icon_pack(records: Dict[str, Dict[str, Any]], output_path: str) -> int:
+    """
+    Write icon records into a packed index file.
+
+    The file holds a header, a table of fixed-size entries sorted by name and a
+    blob with the names and the JSON-encoded records.
+
+    Args:
+        records: Icon records keyed by name
+        output_path: Path of the pack file to write
+
+    Returns:
+        Size of the written file in bytes
+    """
+    names = sorted(records, key=lambda n: n.encode("utf-8"))
+    entries = []
+    blob = bytearray()
+
+    for name in names:
+        name_bytes = name.encode("utf-8")
+        data_bytes = json.dumps(records[name], separators=(",", ":")).encode("utf-8")
+        name_offset = len(blob)
+        blob += name_bytes
+        data_offset = len(blob)
+        blob += data_bytes
+        entries.append(struct.pack(ENTRY_FORMAT, name_offset, len(name_bytes),
+                                   data_offset, len(data_bytes)))
+
+    with open(output_path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, PACK_MAGIC, len(names)))
+        for entry in entries:
+            f.write(entry)
+        f.write(blob)
+
+    return HEADER_SIZE + ENTRY_SIZE * len(names) + len(blob)
+
+
+@instrumented
+def import_icon_pack(directory: str, output_path: str, pattern: str = "**/*.svg",
+                     level: str = "standard", workers: Optional[int] = None,
+                     use_processes: bool = True) -> Dict[str, Any]:
+    """
+    Import a directory of SVG icons into a packed index file.
+
+    Args:
+        directory: Directory containing the icon files
+        output_path: Path of the pack file to write
+        pattern: Glob pattern, relative to the directory, selecting icon files
+        level: Optimization level applied to each icon
+        workers: Number of parallel workers (defaults to the CPU count)
+        use_processes: Use a process pool (CPU-bound optimization) instead of threads
+
+    Returns:
+        Dictionary containing import statistics and any per-file errors
+    """
+    paths = sorted(glob.glob(os.path.join(directory, pattern), recursive=True))
+    if not paths:
+        return {
+            "success": False,
+            "error": f"No SVG files found in '{directory}' matching '{pattern}'",
+            "icons_imported": 0
+        }
+
+    names = [_icon_name(path, directory) for path in paths]
+    levels = [level] * len(paths)
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    with executor_class(max_workers=workers) as executor:
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        results = list(executor.map(_process_icon_file, paths, names, levels,
+                                    chunksize=chunksize))
+
+    records = {}
+    errors = []
+    for result in results:
+        if "error" in result:
+            errors.append(result["error"])
+        elif result["name"] in records:
+            errors.append(f"Duplicate icon name: {result['name']}")
+        else:
+            records[result["name"]] = result["record"]
+
+    pack_size = write_icon_pack(records, output_path)
+
+    return {
+        "success": True,
+        "output_path": output_path,
+        "icons_imported": len(records),
+        "errors": errors,
+        "pack_size_bytes": pack_size,
+        "source_size_bytes": sum(os.path.getsize(path) for path in paths)
+    }
+
+
+class IconPack:
+    """Read-only, memory-mapped view of a packed icon index."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+        if magic != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Not an SVG icon pack: {path}")
+        self._blob_offset = HEADER_SIZE + ENTRY_SIZE * self.count
+
+    def _entry(self, index: int) -> Tuple[int, int, int, int]:
+        return struct.unpack_from(ENTRY_FORMAT, self._map, HEADER_SIZE + ENTRY_SIZE * index)
+
+    def _name_at(self, index: int) -> bytes:
+        name_offset, name_len, _, _ = self._entry(index)
+        start = self._blob_offset + name_offset
+        return self._map[start:start + name_len]
+
+    def _find(self, name: str) -> int:
+        """Binary search the sorted entry table; returns -1 if missing."""
+        key = name.encode("utf-8")
+        low, high = 0, self.count - 1
+        while low <= high:
+            mid = (low + high) // 2
+            current = self._name_at(mid)
+            if current == key:
+                return mid
+            if current < key:
+                low = mid + 1
+            else:
+                high = mid - 1
+        return -1
+
+    def __contains__(self, name: str) -> bool:
+        return self._find(name) >= 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def names(self) -> List[str]:
+        """List all icon names in the pack."""
+        return [self._name_at(i).decode("utf-8") for i in range(self.count)]
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get the raw record of an icon, or None if it is not in the pack."""
+        index = self._find(name)
+        if index < 0:
+            return None
+        _, _, data_offset, data_len = self._entry(index)
+        start = self._blob_offset + data_offset
+        return json.loads(self._map[start:start + data_len])
+
+    def render(self, name: str, size: int = 24, color: str = None,
+               palette_colors: Optional[Dict[str, str]] = None,
+               stroke_width: Optional[int] = None) -> Optional[str]:
+        """
+        Render an icon with the given size and colors.
+
+        Args:
+            name: Name of the icon
+            size: Size of the icon in pixels
+            color: Color for the dominant color slot
+            palette_colors: Palette providing colors for the remaining slots
+            stroke_width: Stroke width, applied when the icon defines one on its root
+
+        Returns:
+            The SVG code, or None if the icon is not in the pack
+        """
+        record = self.get(name)
+        if record is None:
+            return None
+
+        palette_colors = palette_colors or {}
+        slot_colors = []
+        for i, original in enumerate(record["colors"]):
+            role = SLOT_ROLES[i] if i < len(SLOT_ROLES) else None
+            if i == 0 and color:
+                slot_colors.append(color)
+            else:
+                slot_colors.append(palette_colors.get(role, original) if role else original)
+
+        def fill_slot(match):
+            return slot_colors[int(match.group(1))]
+
+        attrs = dict(record["attrs"])
+        if stroke_width is not None and "stroke-width" in attrs:
+            attrs["stroke-width"] = str(stroke_width)
+        attr_code = "".join(f' {k}="{COLOR_SLOT_PATTERN.sub(fill_slot, v)}"' for k, v in attrs.items())
+        body = COLOR_SLOT_PATTERN.sub(fill_slot, record["body"])
+
+        return (f'<svg xmlns="{SVG_NS}" viewBox="{record["viewBox"]}" '
+                f'width="{size}" height="{size}"{attr_code}>{body}</svg>')
+
+    def close(self) -> None:
+        """Release the memory map and the underlying file."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def register_icon_pack(path: str, component_type: str = "icon") -> IconPack:
+    """
+    Serve the icons of a pack file through get_icons / get_svg_component.
+
+    The pack is memory-mapped and looked up on demand, so registering a pack of
+    thousands of icons costs a single file open.
+
+    Args:
+        path: Path of the pack file
+        component_type: Category the icons are registered under
+
+    Returns:
+        The opened IconPack
+    """
+    pack = IconPack(path)
+
+    def resolver(variant: str) -> Optional[Callable[..., str]]:
+        if variant not in pack:
+            return None
+
+        def generator(size: int, color: str, palette_colors: Dict[str, str] = None,
+                      stroke_width: Optional[int] = None, **kwargs) -> str:
+            return pack.render(variant, size, color, palette_colors, stroke_width)
+        return generator
+
+    register_component_resolver(component_type, resolver)
+    return pack
@@ -0,0 +1,290 @@
+"""
+SVG Incremental Optimization Module for SVG-MCP.
+
+This module keeps an optimized SVG document alive between edits. The document
+is split into chunks (subtrees up to a size limit) that are optimized
+independently and cached; an edit only marks the chunks it touches as dirty, so
+re-optimizing after a small change costs time proportional to the change
+rather than to the whole document.
+"""
+
+import io
+import re
+import time
+from typing import Dict, Any, List, Optional, Set
+from xml.sax.saxutils import escape
+import xml.etree.ElementTree as ET
+
+from svg_manipulation import SVGSelector, SVGTransformer
+from svg_metrics import instrumented
+from svg_optimization import optimize_svg, OPTIMIZATION_LEVELS
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# Namespace declarations ElementTree writes on the top element of a fragment
+NAMESPACE_DECLARATION_PATTERN = re.compile(r'\s+xmlns(?::([\w.-]+))?="([^"]*)"')
+
+# Prefixes ElementTree reserves for namespaces it numbers itself
+RESERVED_PREFIX_PATTERN = re.compile(r'ns\d+$')
+
+# Declarations of the prefixes ElementTree numbers itself
+GENERATED_DECLARATION_PATTERN = re.compile(r'\sxmlns:(ns\d+)="([^"]*)"')
+
+
+def _document_prefixes(svg_code: str) -> Dict[str, str]:
+    """
+    Namespace prefixes declared by a document, by namespace URI.
+
+    ElementTree's process-wide prefix registry is left alone: SVG and xlink
+    keep their usual prefixes, and so do namespaces registered elsewhere.
+    """
+    registered = set(ET._namespace_map.values())
+    prefixes: Dict[str, str] = {}
+    for _, (prefix, uri) in ET.iterparse(io.StringIO(svg_code), events=("start-ns",)):
+        if (prefix and uri not in prefixes and uri not in ET._namespace_map and prefix not in registered
+                and not RESERVED_PREFIX_PATTERN.match(prefix) and prefix not in prefixes.values()):
+            prefixes[uri] = prefix
+    return prefixes
+
+
+def _tostring(elem: ET.Element, prefixes: Dict[str, str]) -> str:
+    """Serialize an element, using the document's prefixes for the namespaces ElementTree would number."""
+    text = ET.tostring(elem, encoding="unicode")
+    if not prefixes:
+        return text
+    first_tag_end = text.index(">")
+    renamed = {match.group(1): prefixes[match.group(2)]
+               for match in GENERATED_DECLARATION_PATTERN.finditer(text[:first_tag_end])
+               if match.group(2) in prefixes}
+    if not renamed:
+        return text
+
+    generated = "|".join(renamed)
+    # Tag names, attribute names (always followed by a quoted value) and declarations
+    name_pattern = re.compile(rf'(</?|\s)({generated}):(?=[\w.-]+(?:="|[\s/>]|$))|(\sxmlns:)({generated})(?==")')
+
+    def rename(match):
+        if match.group(2):
+            return f"{match.group(1)}{renamed[match.group(2)]}:"
+        return match.group(3) + renamed[match.group(4)]
+
+    # Text never contains '<', so every '<...>' run is a tag
+    return re.sub(r'<[^>]*>', lambda tag: name_pattern.sub(rename, tag.group(0)), text)
+
+
+class OptimizedDocument:
+    """
+    Handle to an SVG document whose optimized output is maintained incrementally.
+
+    Subtrees of at most `chunk_elements` elements are optimized as one chunk;
+    larger elements are split into their children, and their optimized start tag
+    and children are joined. Edits made through the handle (or reported with
+    mark_dirty) invalidate only the chunks containing the edited elements and
+    their ancestors.
+    """
+
+    def __init__(self, svg_code: str, level: str = "standard", chunk_elements: int = 64):
+        """
+        Parse an SVG document for incremental optimization.
+
+        Args:
+            svg_code: The SVG code to optimize
+            level: Optimization level applied to each chunk
+            chunk_elements: Largest subtree (in elements) optimized as a single chunk
+
+        Raises:
+            ET.ParseError: If the SVG code is not well-formed
+        """
+        self._prefixes = _document_prefixes(svg_code)
+        self.root = ET.fromstring(svg_code)
+        self.level = level
+        self.chunk_elements = chunk_elements
+        self.original_size = len(svg_code.encode('utf-8'))
+        self._strip_whitespace = "remove_unnecessary_whitespace" in OPTIMIZATION_LEVELS.get(level, [])
+
+        self._parents: Dict[ET.Element, ET.Element] = {}
+        self._sizes: Dict[ET.Element, int] = {}
+        self._mixed: Set[ET.Element] = set()
+        self._index(self.root)
+
+        # Optimized output of each chunk or container, and its namespace declarations
+        self._output: Dict[ET.Element, str] = {}
+        self._declarations: Dict[ET.Element, Dict[str, str]] = {}
+        self._dirty: Set[ET.Element] = set()
+
+    def _index(self, elem: ET.Element) -> int:
+        """Record parents, subtree sizes and mixed-content elements."""
+        size = 1
+        if elem.text and elem.text.strip():
+            self._mixed.add(elem)
+        for child in elem:
+            self._parents[child] = elem
+            size += self._index(child)
+            if child.tail and child.tail.strip():
+                self._mixed.add(elem)
+        self._sizes[elem] = size
+        return size
+
+    def _is_chunk(self, elem: ET.Element) -> bool:
+        return self._sizes[elem] <= self.chunk_elements or elem in self._mixed
+
+    def _serialize(self, elem: ET.Element) -> str:
+        """Serialize an element without its tail, recording and removing its namespace declarations."""
+        tail, elem.tail = elem.tail, None
+        try:
+            text = _tostring(elem, self._prefixes)
+        finally:
+            elem.tail = tail
+        if elem is self.root:
+            return text
+
+        declarations = {}
+        first_tag_end = text.index(">")
+
+        def strip_declaration(match):
+            declarations[match.group(1) or ""] = match.group(2)
+            return ""
+
+        first_tag = NAMESPACE_DECLARATION_PATTERN.sub(strip_declaration, text[:first_tag_end])
+        self._declarations[elem] = declarations
+        return first_tag + text[first_tag_end:]
+
+    def _optimize_fragment(self, text: str) -> str:
+        return optimize_svg(text, self.level)["optimized_svg"]
+
+    def _render(self, elem: ET.Element, stats: Dict[str, int]) -> str:
+        if elem in self._output and elem not in self._dirty:
+            return self._output[elem]
+
+        if self._is_chunk(elem):
+            output = self._optimize_fragment(self._serialize(elem))
+            stats["chunks_optimized"] += 1
+            self._dirty.difference_update(elem.iter())
+        else:
+            shallow = ET.Element(elem.tag, elem.attrib)
+            start_tag = self._serialize(shallow)
+            start_tag = self._optimize_fragment(start_tag[:start_tag.rindex("/")].rstrip() + ">")
+            declarations = dict(self._declarations.pop(shallow, {}))
+
+            parts = [start_tag]
+            if elem.text and not self._strip_whitespace:
+                parts.append(escape(elem.text))
+            for child in elem:
+                parts.append(self._render(child, stats))
+                declarations.update(self._declarations.get(child, {}))
+                if child.tail and not self._strip_whitespace:
+                    parts.append(escape(child.tail))
+            parts.append(f"</{start_tag[1:].split(None, 1)[0].rstrip('>/')}>")
+            output = "".join(parts)
+            self._declarations[elem] = declarations
+
+            if elem is self.root:
+                output = self._declare_namespaces(output, declarations)
+
+        self._output[elem] = output
+        self._dirty.discard(elem)
+        return output
+
+    def _declare_namespaces(self, output: str, declarations: Dict[str, str]) -> str:
+        """Add the namespaces used by the fragments to the root start tag."""
+        first_tag_end = output.index(">")
+        root_tag = output[:first_tag_end]
+        declared = {match.group(1) or "" for match in NAMESPACE_DECLARATION_PATTERN.finditer(root_tag)}
+        missing = "".join(
+            f' xmlns{":" + prefix if prefix else ""}="{uri}"'
+            for prefix, uri in sorted(declarations.items()) if prefix not in declared)
+        if root_tag.endswith("/"):
+            root_tag = root_tag[:-1].rstrip()
+        return root_tag + missing + output[first_tag_end:]
+
+    def mark_dirty(self, elem: ET.Element) -> None:
+        """
+        Mark an element changed so its chunk is re-optimized.
+
+        Call this after editing elements of `root` directly. Only attribute and
+        text edits are supported; structural changes need a new document.
+        """
+        while elem is not None:
+            self._dirty.add(elem)
+            elem = self._parents.get(elem)
+
+    def transform(self, selector: str, transform: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Transform the elements matching a selector (see transform_svg_element).
+
+        Returns:
+            Dictionary with the number of matched elements and their info
+        """
+        elements = SVGSelector.match_elements(self.root, selector)
+        if not elements:
+            return {
+                "success": False,
+                "error": f"No elements found matching selector: '{selector}'"
+            }
+
+        selected_elements = SVGSelector.describe_elements(elements)
+        for element in elements:
+            SVGTransformer.transform_element(element, transform)
+            self.mark_dirty(element)
+
+        return {
+            "success": True,
+            "matched_elements": len(selected_elements),
+            "elements": selected_elements
+        }
+
+    def set_attributes(self, selector: str, attributes: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """
+        Set (or remove, with a None value) attributes on the elements matching a selector.
+
+        Returns:
+            Dictionary with the number of matched elements
+        """
+        elements = SVGSelector.match_elements(self.root, selector)
+        if not elements:
+            return {
+                "success": False,
+                "error": f"No elements found matching selector: '{selector}'"
+            }
+
+        for element in elements:
+            for name, value in attributes.items():
+                if value is None:
+                    element.attrib.pop(name, None)
+                else:
+                    element.set(name, str(value))
+            self.mark_dirty(element)
+
+        return {"success": True, "matched_elements": len(elements)}
+
+    @instrumented
+    def optimize(self) -> Dict[str, Any]:
+        """
+        Get the optimized document, re-optimizing only the dirty chunks.
+
+        Returns:
+            A dictionary containing the optimized SVG and statistics
+        """
+        start = time.perf_counter()
+        stats = {"chunks_optimized": 0}
+        optimized = self._render(self.root, stats)
+        optimized_size = len(optimized.encode('utf-8'))
+        saved_bytes = self.original_size - optimized_size
+
+        return {
+            "optimized_svg": optimized,
+            "stats": {
+                "original_size_bytes": self.original_size,
+                "optimized_size_bytes": optimized_size,
+                "bytes_saved": saved_bytes,
+                "percentage_reduction": round((saved_bytes / self.original_size) * 100, 2)
+                if self.original_size > 0 else 0,
+                "optimization_level": self.level,
+                "chunks_optimized": stats["chunks_optimized"],
+                "time_ms": round((time.perf_counter() - start) * 1000, 3)
+            }
+        }
@@ -5,15 +5,859 @@ This module provides functions for adding interactive behaviors to SVG elements
 inspired by Fabric.js. It allows for events like click, hover, and drag interactions.
 """
 
-from typing import Dict, Any, List, Optional, Union
+import re
+import json
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union, Tuple
 
-def add_event_handlers(svg_code: str, event_config: Dict[str, Any]) -> Dict[str, Any]:
+from svg_metrics import instrumented
+
+# Interactivity modes: 'inline' emits a self-contained script per call, 'runtime'
+# emits one shared runtime plus a declarative binding table merged across calls,
+# and 'delegated' does the same but dispatches every event from the SVG root
+INTERACTIVITY_MODES = ["inline", "runtime", "delegated"]
+RUNTIME_MODES = ["runtime", "delegated"]
+
+# Named easing curves as cubic-bezier control points (CSS timing functions)
+EASING_CURVES = {
+    "linear": None,
+    "ease": [0.25, 0.1, 0.25, 1.0],
+    "ease-in": [0.42, 0.0, 1.0, 1.0],
+    "ease-out": [0.0, 0.0, 0.58, 1.0],
+    "ease-in-out": [0.42, 0.0, 0.58, 1.0],
+}
+
+# Easing solver shared by the runtime and inline animations
+CUBIC_BEZIER_FUNCTION = """function cubicBezier(curve) {
+    function sample(a, b, s) {
+      return ((1 - 3 * b + 3 * a) * s + (3 * b - 6 * a)) * s * s + 3 * a * s;
+    }
+    return function (t) {
+      if (t <= 0 || t >= 1) return t;
+      var low = 0, high = 1, s = t;
+      for (var i = 0; i < 20; i++) {
+        var x = sample(curve[0], curve[2], s);
+        if (Math.abs(x - t) < 1e-5) break;
+        if (x < t) low = s; else high = s;
+        s = (low + high) / 2;
+      }
+      return sample(curve[1], curve[3], s);
+    };
+  }"""
+
+# Runtime core shared by the runtime modes: helpers and the action table
+RUNTIME_CORE = """(function () {
+  var script = document.currentScript;
+  var root = (script && script.closest("svg")) || document.documentElement;
+  var batchUpdates = !!script && script.getAttribute("data-batch") === "frame";
+  var dragState = null;
+  var pendingMove = null;
+  var pendingWrites = new Map();
+  var animations = [];
+  var frameRequested = false;
+
+  """ + CUBIC_BEZIER_FUNCTION + """
+
+  function scheduleFrame() {
+    if (frameRequested) return;
+    frameRequested = true;
+    requestAnimationFrame(flushFrame);
+  }
+
+  function writeAttribute(element, name, value) {
+    if (!batchUpdates) {
+      element.setAttribute(name, value);
+      return;
+    }
+    var attributes = pendingWrites.get(element);
+    if (!attributes) pendingWrites.set(element, attributes = {});
+    attributes[name] = value;
+    scheduleFrame();
+  }
+
+  function flushFrame() {
+    var now = Date.now();
+    animations = animations.filter(function (animation) { return advance(animation, now); });
+    if (pendingMove) applyDrag(pendingMove);
+    pendingWrites.forEach(function (attributes, element) {
+      for (var name in attributes) element.setAttribute(name, attributes[name]);
+    });
+    pendingWrites.clear();
+    frameRequested = false;
+    if (animations.length) scheduleFrame();
+  }
+
+  function advance(animation, now) {
+    var progress = Math.min((now - animation.startTime) / animation.duration, 1);
+    var eased = animation.ease ? animation.ease(progress) : progress;
+    writeAttribute(animation.element, animation.name, animation.fromValue + (animation.toValue - animation.fromValue) * eased);
+    return progress < 1;
+  }
+
+  function toSvgPoint(event) {
+    var point = root.createSVGPoint();
+    point.x = event.clientX;
+    point.y = event.clientY;
+    return point.matrixTransform(root.getScreenCTM().inverse());
+  }
+
+  function startDrag(element, event) {
+    event.preventDefault();
+    var transforms = element.transform.baseVal;
+    if (!transforms.numberOfItems) {
+      var translate = root.createSVGTransform();
+      translate.setTranslate(0, 0);
+      transforms.appendItem(translate);
+    }
+    var matrix = transforms.getItem(0).matrix;
+    var point = toSvgPoint(event);
+    dragState = { element: element, offsetX: point.x - matrix.e, offsetY: point.y - matrix.f, pointerId: event.pointerId };
+    element.classList.add("dragging");
+  }
+
+  function applyDrag(event) {
+    pendingMove = null;
+    var point = toSvgPoint(event);
+    dragState.element.transform.baseVal.getItem(0).setTranslate(point.x - dragState.offsetX, point.y - dragState.offsetY);
+  }
+
+  function moveDrag(event) {
+    if (!dragState || event.pointerId !== dragState.pointerId) return;
+    event.preventDefault();
+    if (!batchUpdates) {
+      applyDrag(event);
+      return;
+    }
+    // Coalesce pointer moves: only the latest position is applied in the next frame
+    pendingMove = event;
+    scheduleFrame();
+  }
+
+  function endDrag(event) {
+    if (!dragState || event.pointerId !== dragState.pointerId) return;
+    if (pendingMove) applyDrag(pendingMove);
+    dragState.element.classList.remove("dragging");
+    dragState = null;
+  }
+
+  function showTooltip(element, text, event) {
+    var tooltip = root.querySelector("#svg-tooltip");
+    if (!tooltip) {
+      tooltip = document.createElementNS("http://www.w3.org/2000/svg", "text");
+      tooltip.setAttribute("id", "svg-tooltip");
+      tooltip.setAttribute("font-family", "Arial");
+      tooltip.setAttribute("font-size", "12");
+      root.appendChild(tooltip);
+    }
+    var point = toSvgPoint(event);
+    tooltip.textContent = text;
+    tooltip.setAttribute("x", point.x + 10);
+    tooltip.setAttribute("y", point.y - 10);
+    tooltip.setAttribute("visibility", "visible");
+  }
+
+  var actions = {
+    setAttribute: function (element, params) {
+      if (params.attributeName) writeAttribute(element, params.attributeName, params.attributeValue);
+    },
+    toggleClass: function (element, params) {
+      element.classList.toggle(params.className);
+    },
+    animate: function (element, params) {
+      var animation = {
+        element: element,
+        name: params.attributeName,
+        fromValue: parseFloat(params.from),
+        toValue: parseFloat(params.to),
+        duration: params.duration || 500,
+        ease: params.easing ? cubicBezier(params.easing) : null,
+        startTime: Date.now()
+      };
+      if (batchUpdates) {
+        // Batched animations are advanced together by the frame flush
+        animations.push(animation);
+        scheduleFrame();
+        return;
+      }
+      (function step() {
+        if (advance(animation, Date.now())) requestAnimationFrame(step);
+      })();
+    },
+    draggable: function (element, params, event) {
+      startDrag(element, event);
+    },
+    tooltip: function (element, params, event) {
+      showTooltip(element, params.text, event);
+    },
+    custom: function (element, params, event, handler) {
+      handler.call(element, event);
+    }
+  };
+
+  function compile(spec) {
+    var params = spec.parameters || {};
+    return {
+      action: actions[spec.action],
+      params: params,
+      handler: spec.action === "custom" ? new Function("e", params.code || "") : null
+    };
+  }
+"""
+
+# Runtime binding: one listener per matched element, drag tracked at document level
+RUNTIME_DIRECT_BINDING = """
+  document.addEventListener("mousemove", moveDrag);
+  document.addEventListener("mouseup", endDrag);
+
+  function bind(bindings) {
+    bindings.forEach(function (binding) {
+      var elements = root.querySelectorAll(binding.selector);
+      binding.events.forEach(function (spec) {
+        var entry = compile(spec);
+        if (!entry.action) return;
+        elements.forEach(function (element) {
+          element.addEventListener(spec.type, function (event) {
+            entry.action(element, entry.params, event, entry.handler);
+          });
+        });
+      });
+    });
+  }
+"""
+
+# Delegated binding: one capturing listener per event type on the root, dispatched
+# through id/class/tag lookup tables; drag is a pointer-capture state machine
+RUNTIME_DELEGATED_BINDING = """
+  root.addEventListener("pointermove", moveDrag);
+  root.addEventListener("pointerup", endDrag);
+  root.addEventListener("pointercancel", endDrag);
+
+  function dispatch(table, event) {
+    // Non-bubbling events (mouseenter, focus, ...) reach the root listener once per
+    // element in the capture phase, so only their target is matched
+    var last = event.bubbles ? root : event.target.parentNode;
+    for (var node = event.target; node && node !== root && node !== last; node = node.parentNode) {
+      if (node.nodeType !== 1) continue;
+      var entries = (table.id[node.id] || []).concat(table.tag[node.localName] || []);
+      for (var i = 0; i < node.classList.length; i++) {
+        entries = entries.concat(table.cls[node.classList[i]] || []);
+      }
+      for (var j = 0; j < table.other.length; j++) {
+        if (node.matches(table.other[j].selector)) entries.push(table.other[j]);
+      }
+      for (var k = 0; k < entries.length; k++) {
+        entries[k].action(node, entries[k].params, event, entries[k].handler);
+      }
+    }
+    if (dragState && event.type === "pointerdown" && dragState.element.setPointerCapture) {
+      dragState.element.setPointerCapture(event.pointerId);
+    }
+  }
+
+  function bind(bindings) {
+    var tables = {};
+    bindings.forEach(function (binding) {
+      var selector = binding.selector.trim();
+      var simple = /^([#.]?)([\\w-]+)$/.exec(selector);
+      binding.events.forEach(function (spec) {
+        var type = spec.action === "draggable" ? "pointerdown" : spec.type;
+        var entry = compile(spec);
+        if (!entry.action) return;
+        var table = tables[type];
+        if (!table) {
+          table = tables[type] = { id: {}, cls: {}, tag: {}, other: [] };
+          root.addEventListener(type, function (event) { dispatch(table, event); }, true);
+        }
+        if (!simple) {
+          entry.selector = selector;
+          table.other.push(entry);
+          return;
+        }
+        var lookup = simple[1] === "#" ? table.id : simple[1] === "." ? table.cls : table.tag;
+        (lookup[simple[2]] = lookup[simple[2]] || []).push(entry);
+      });
+    });
+  }
+"""
+
+RUNTIME_STARTUP = """
+  function init() {
+    var table = root.querySelector('script[data-svg-mcp="bindings"]');
+    bind(table ? JSON.parse(table.textContent) : []);
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", init);
+  } else {
+    init();
+  }
+})();
+"""
+
+
+def build_runtime_script(mode: str = "runtime") -> str:
+    """
+    Assemble the shared interactivity runtime.
+
+    Args:
+        mode: 'runtime' for per-element listeners or 'delegated' for root-level dispatch
+
+    Returns:
+        The JavaScript source of the runtime
+    """
+    binding = RUNTIME_DELEGATED_BINDING if mode == "delegated" else RUNTIME_DIRECT_BINDING
+    return RUNTIME_CORE + binding + RUNTIME_STARTUP
+
+
+# Blocks emitted by the runtime mode, found again when another call merges its bindings
+RUNTIME_BLOCK_PATTERN = re.compile(
+    r'<(script|style)[^>]*data-svg-mcp="(runtime|bindings|style)"[^>]*>([\s\S]*?)</\1>\s*')
+
+
+def _easing_curve(easing: Any) -> Optional[List[float]]:
+    """
+    Resolve an easing specification to cubic-bezier control points.
+    
+    Args:
+        easing: A name from EASING_CURVES, 'cubic-bezier(x1, y1, x2, y2)' or a list of 4 numbers
+        
+    Returns:
+        The control points, or None for linear (or unrecognized) easing
+    """
+    if isinstance(easing, (list, tuple)):
+        points = list(easing)
+    elif isinstance(easing, str) and easing.strip().startswith("cubic-bezier("):
+        points = re.findall(r'-?\d*\.?\d+', easing)
+    else:
+        return EASING_CURVES.get(easing)
+    
+    try:
+        points = [float(p) for p in points]
+    except (TypeError, ValueError):
+        return None
+    return points if len(points) == 4 else None
+
+
+# Tokens after which a '/' starts a regular expression rather than a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^") | {"return", "typeof", "case", "do", "else",
+                                                   "in", "of", "new", "delete", "void", "throw"}
+
+_JS_KEYWORDS = {"break", "case", "catch", "class", "const", "continue", "debugger", "default",
+                "delete", "do", "else", "export", "extends", "false", "finally", "for",
+                "function", "if", "import", "in", "instanceof", "let", "new", "null", "of",
+                "return", "super", "switch", "this", "throw", "true", "try", "typeof", "var",
+                "void", "while", "with", "yield", "undefined", "arguments"}
+
+_IDENTIFIER_START = re.compile(r'[A-Za-z_$]')
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+_NUMBER = re.compile(r'\d[\w.]*|\.\d[\w]*')
+
+
+def _js_tokens(code: str) -> List[Tuple[str, str]]:
+    """
+    Split JavaScript into (kind, text) tokens.
+    
+    Kinds are 'space', 'newline', 'comment', 'string', 'regex', 'ident',
+    'number' and 'punct'. This is a lexer for minification, not a parser.
+    """
+    tokens = []
+    last = None  # last significant token text
+    i = 0
+    length = len(code)
+    
+    while i < length:
+        char = code[i]
+        
+        if char.isspace():
+            j = i
+            while j < length and code[j].isspace():
+                j += 1
+            text = code[i:j]
+            tokens.append(("newline" if "\n" in text else "space", text))
+            i = j
+            continue
+        
+        if code.startswith("//", i):
+            j = code.find("\n", i)
+            j = length if j < 0 else j
+            tokens.append(("comment", code[i:j]))
+            i = j
+            continue
+        
+        if code.startswith("/*", i):
+            j = code.find("*/", i + 2)
+            j = length if j < 0 else j + 2
+            tokens.append(("comment", code[i:j]))
+            i = j
+            continue
+        
+        if char in "'\"`" or (char == "/" and (last is None or last in _REGEX_PRECEDERS)):
+            j = i + 1
+            in_class = False
+            while j < length:
+                if code[j] == "\\":
+                    j += 2
+                    continue
+                if char == "/" and code[j] == "[":
+                    in_class = True
+                elif char == "/" and code[j] == "]":
+                    in_class = False
+                elif code[j] == char and not in_class:
+                    break
+                j += 1
+            j += 1
+            if char == "/":
+                while j < length and (code[j].isalnum() or code[j] == "_"):
+                    j += 1
+            kind = "regex" if char == "/" else "string"
+            tokens.append((kind, code[i:j]))
+            last = code[i:j]
+            i = j
+            continue
+        
+        match = _IDENTIFIER.match(code, i) if _IDENTIFIER_START.match(char) else _NUMBER.match(code, i)
+        if match:
+            kind = "ident" if _IDENTIFIER_START.match(char) else "number"
+            tokens.append((kind, match.group(0)))
+            last = match.group(0)
+            i = match.end()
+            continue
+        
+        tokens.append(("punct", char))
+        last = char
+        i += 1
+    
+    return tokens
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in "_$\\"
+
+
+def _join_tokens(tokens: List[Tuple[str, str]]) -> str:
+    """Join significant tokens with the minimal whitespace that keeps the meaning."""
+    output = []
+    pending_newline = False
+    pending_space = False
+    
+    for kind, text in tokens:
+        if kind == "comment":
+            continue
+        if kind == "newline":
+            pending_newline = True
+            continue
+        if kind == "space":
+            pending_space = True
+            continue
+        
+        if output:
+            prev = output[-1][-1]
+            nxt = text[0]
+            # Keep line breaks where automatic semicolon insertion could apply
+            if pending_newline and (_is_word_char(prev) or prev in ")]}'\"`+-") \
+                    and (_is_word_char(nxt) or nxt in "([{'\"`+-!~"):
+                output.append("\n")
+            elif (pending_space or pending_newline) and (
+                    (_is_word_char(prev) and _is_word_char(nxt)) or (prev in "+-" and nxt == prev)):
+                output.append(" ")
+        
+        output.append(text)
+        pending_newline = False
+        pending_space = False
+    
+    return "".join(output)
+
+
+def _short_names(reserved: set):
+    """Generate short identifiers that do not collide with reserved names."""
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    size = 1
+    while True:
+        count = len(alphabet) ** size
+        for n in range(count):
+            name = ""
+            for _ in range(size):
+                name = alphabet[n % len(alphabet)] + name
+                n //= len(alphabet)
+            if name not in reserved and name not in _JS_KEYWORDS:
+                yield name
+        size += 1
+
+
+def _shorten_locals(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Rename variables, functions and parameters declared in the script.
+    
+    Names used as object literal keys are left alone, as are property accesses
+    ('obj.name'), so renaming cannot change the shape of any object.
+    """
+    significant = [i for i, (kind, _) in enumerate(tokens) if kind not in ("space", "newline", "comment")]
+    
+    declared = {}
+    object_keys = set()
+    all_names = set()
+    
+    declaring_depth = None
+    expect_declaration = False
+    # None, "name" after the 'function' keyword, or "params" inside its parameter list
+    function_state = None
+    params_depth = 0
+    depth = 0
+    
+    for position, index in enumerate(significant):
+        kind, text = tokens[index]
+        prev = tokens[significant[position - 1]][1] if position > 0 else None
+        nxt = tokens[significant[position + 1]][1] if position + 1 < len(significant) else None
+        
+        if kind == "ident":
+            all_names.add(text)
+            if nxt == ":" and prev in ("{", ","):
+                object_keys.add(text)
+            if text in ("var", "let", "const"):
+                declaring_depth = depth
+                expect_declaration = True
+            elif text == "function":
+                function_state = "name"
+            elif prev != "." and text not in _JS_KEYWORDS and (expect_declaration or function_state):
+                declared[text] = declared.get(text, 0) + 1
+                expect_declaration = False
+            continue
+        
+        expect_declaration = False
+        if text == "(":
+            if function_state == "name":
+                function_state = "params"
+                params_depth = depth
+            depth += 1
+        elif text in "[{":
+            depth += 1
+        elif text in ")]}":
+            depth -= 1
+            if text == ")" and function_state == "params" and depth == params_depth:
+                function_state = None
+        elif text == "," and declaring_depth is not None and depth == declaring_depth:
+            expect_declaration = True
+        elif text == ";" and declaring_depth is not None and depth == declaring_depth:
+            declaring_depth = None
+    
+    candidates = [name for name in declared if name not in object_keys]
+    for name in candidates:
+        all_names.discard(name)
+    
+    names = _short_names(all_names)
+    renames = {}
+    for name in sorted(candidates, key=lambda n: (-declared[n] * len(n), n)):
+        renames[name] = next(names)
+    
+    renamed = list(tokens)
+    for position, index in enumerate(significant):
+        kind, text = tokens[index]
+        prev = tokens[significant[position - 1]][1] if position > 0 else None
+        if kind == "ident" and text in renames and prev != ".":
+            renamed[index] = (kind, renames[text])
+    return renamed
+
+
+def minify_script(script: str, rename_locals: bool = False) -> str:
+    """
+    Minify generated JavaScript.
+    
+    Args:
+        script: The JavaScript source
+        rename_locals: Shorten the names of variables, functions and parameters.
+            Only safe for code that does not share names with other scripts,
+            such as the self-contained runtime
+        
+    Returns:
+        The minified JavaScript
+    """
+    tokens = _js_tokens(script)
+    if rename_locals:
+        tokens = _shorten_locals(tokens)
+    return _join_tokens(tokens)
+
+
+def minify_style(style: str) -> str:
+    """
+    Minify a CSS style sheet.
+    
+    Args:
+        style: The CSS source
+        
+    Returns:
+        The minified CSS
+    """
+    style = re.sub(r'/\*[\s\S]*?\*/', '', style)
+    style = re.sub(r'\s+', ' ', style)
+    style = re.sub(r'\s*([{};,>])\s*', r'\1', style)
+    style = re.sub(r':\s+', ':', style)
+    return style.replace(';}', '}').strip()
+
+
+@lru_cache(maxsize=None)
+def _minified_runtime_script(mode: str) -> str:
+    """The runtime script minified, computed once per mode."""
+    return minify_script(build_runtime_script(mode), rename_locals=True)
+
+
+def _interactivity_styles(selector: str, events: List[Dict[str, Any]]) -> List[str]:
+    """CSS rules needed by the events bound to a selector."""
+    rules = []
+    has_hover = any(event.get("type") == "mouseover" for event in events)
+    has_drag = any(event.get("action", {}).get("type") == "draggable" for event in events)
+    
+    if has_hover:
+        rules.append(f'{selector}:hover {{ cursor: pointer; }}')
+    
+    if has_drag:
+        rules.append(f'{selector}.dragging {{ cursor: grabbing; }}')
+        rules.append(f'{selector} {{ cursor: grab; }}')
+    
+    return rules
+
+
+def _extract_runtime_bindings(svg_code: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Remove the runtime blocks from an SVG and return its existing binding table.
+    
+    Returns:
+        Tuple containing (SVG code without runtime blocks, list of bindings)
+    """
+    bindings = []
+    
+    def strip_block(match):
+        if match.group(2) == "bindings":
+            content = match.group(3).strip()
+            if content.startswith("<![CDATA[") and content.endswith("]]>"):
+                content = content[9:-3]
+            bindings.extend(json.loads(content))
+        return ""
+    
+    return RUNTIME_BLOCK_PATTERN.sub(strip_block, svg_code), bindings
+
+
+def _add_runtime_handlers(svg_code: str, selector: str, events: List[Dict[str, Any]],
+                          mode: str = "runtime", batch_updates: bool = False,
+                          minify: bool = False) -> Dict[str, Any]:
+    """
+    Add event handlers using the shared runtime and a declarative binding table.
+    
+    Bindings already present in the SVG are merged, so the runtime, the binding
+    table and the style block appear once no matter how many calls are made.
+    The runtime is re-emitted for the mode of the latest call.
+    """
+    svg_code, bindings = _extract_runtime_bindings(svg_code)
+    
+    binding_events = []
+    for event in events:
+        event_type = event.get("type", "")
+        action = event.get("action", {})
+        if not event_type or not action:
+            continue
+        parameters = dict(action.get("parameters", {}))
+        if "easing" in parameters:
+            parameters["easing"] = _easing_curve(parameters["easing"])
+        binding_events.append({
+            "type": event_type,
+            "action": action.get("type", ""),
+            "parameters": parameters
+        })
+    bindings.append({"selector": selector, "events": binding_events})
+    
+    # Merge style rules of all bindings, keeping the first occurrence of each rule
+    rules = []
+    for binding in bindings:
+        as_events = [{"type": e["type"], "action": {"type": e["action"]}} for e in binding["events"]]
+        binding_rules = _interactivity_styles(binding["selector"], as_events)
+        # Pointer capture needs the browser to leave touch gestures to the script
+        if mode == "delegated" and any(e["action"] == "draggable" for e in binding["events"]):
+            binding_rules.append(f'{binding["selector"]} {{ touch-action: none; }}')
+        for rule in binding_rules:
+            if rule not in rules:
+                rules.append(rule)
+    
+    # Keep the JSON safe inside CDATA and inline HTML script blocks
+    table = json.dumps(bindings, separators=(",", ":"))
+    table = table.replace("]]>", "]]\\u003e").replace("</", "<\\/")
+    
+    style_body = '\n'.join(rules) + '\n'
+    runtime_body = build_runtime_script(mode)
+    if minify:
+        style_body = minify_style(style_body)
+        runtime_body = _minified_runtime_script(mode)
+    
+    style_block = ''
+    if rules:
+        style_block = f'<style type="text/css" data-svg-mcp="style"><![CDATA[\n{style_body}]]></style>\n'
+    bindings_block = f'<script type="application/json" data-svg-mcp="bindings"><![CDATA[{table}]]></script>\n'
+    batch_attr = ' data-batch="frame"' if batch_updates else ''
+    runtime_block = f'<script type="text/javascript" data-svg-mcp="runtime"{batch_attr}><![CDATA[\n{runtime_body}]]></script>\n'
+    blocks = style_block + bindings_block + runtime_block
+    
+    # Insert before the closing tag of the outermost SVG
+    close_index = svg_code.rfind("</svg>")
+    if close_index >= 0:
+        enhanced_svg = svg_code[:close_index] + blocks + svg_code[close_index:]
+    else:
+        enhanced_svg = f"{svg_code}\n{blocks}"
+    
+    return {
+        "success": True,
+        "svg_code": enhanced_svg,
+        "events_added": len(binding_events),
+        "selectors_targeted": selector,
+        "bindings": len(bindings),
+        "block_sizes": {
+            "style": len(style_block.encode('utf-8')),
+            "bindings": len(bindings_block.encode('utf-8')),
+            "runtime": len(runtime_block.encode('utf-8'))
+        }
+    }
+
+
+def _inline_handler_body(action_type: str, parameters: Dict[str, Any]) -> str:
+    """JavaScript statements run by an inline event handler for one action."""
+    body = ''
+    
+    # The specific action implementation
+    if action_type == "setAttribute":
+        attr_name = parameters.get("attributeName", "")
+        attr_value = parameters.get("attributeValue", "")
+        body += f'      this.setAttribute("{attr_name}", "{attr_value}");\n'
+        
+    elif action_type == "toggleClass":
+        class_name = parameters.get("className", "")
+        body += f'      this.classList.toggle("{class_name}");\n'
+        
+    elif action_type == "animate":
+        attr_name = parameters.get("attributeName", "")
+        from_value = parameters.get("from", "")
+        to_value = parameters.get("to", "")
+        duration = parameters.get("duration", 500)
+        easing = _easing_curve(parameters.get("easing"))
+        
+        if easing:
+            body += f'      const ease = ({CUBIC_BEZIER_FUNCTION})({json.dumps(easing)});\n'
+        body += '      const startTime = Date.now();\n'
+        body += f'      const fromValue = {from_value};\n'
+        body += f'      const toValue = {to_value};\n'
+        body += f'      const animDuration = {duration};\n'
+        body += '      \n'
+        body += '      function animate() {\n'
+        body += '        const elapsed = Date.now() - startTime;\n'
+        body += '        const progress = Math.min(elapsed / animDuration, 1);\n'
+        progress_expr = 'ease(progress)' if easing else 'progress'
+        body += f'        const currentValue = fromValue + (toValue - fromValue) * {progress_expr};\n'
+        body += f'        this.setAttribute("{attr_name}", currentValue);\n'
+        body += '        if (progress < 1) {\n'
+        body += '          requestAnimationFrame(animate.bind(this));\n'
+        body += '        }\n'
+        body += '      }\n'
+        body += '      animate.bind(this)();\n'
+    
+    elif action_type == "draggable":
+        body += '      // Make element draggable\n'
+        body += '      let selected = false;\n'
+        body += '      let offset = { x: 0, y: 0 };\n'
+        body += '      \n'
+        body += '      this.addEventListener("mousedown", startDrag);\n'
+        body += '      document.addEventListener("mousemove", drag);\n'
+        body += '      document.addEventListener("mouseup", endDrag);\n'
+        body += '      \n'
+        body += '      function startDrag(e) {\n'
+        body += '        e.preventDefault();\n'
+        body += '        selected = true;\n'
+        body += '        \n'
+        body += '        // Get SVG point for mouse position\n'
+        body += '        const svg = this.ownerSVGElement;\n'
+        body += '        const pt = svg.createSVGPoint();\n'
+        body += '        pt.x = e.clientX;\n'
+        body += '        pt.y = e.clientY;\n'
+        body += '        const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());\n'
+        body += '        \n'
+        body += '        // Calculate offset\n'
+        body += '        if (this.transform && this.transform.baseVal.numberOfItems) {\n'
+        body += '          const transform = this.transform.baseVal.getItem(0);\n'
+        body += '          offset.x = svgP.x - transform.matrix.e;\n'
+        body += '          offset.y = svgP.y - transform.matrix.f;\n'
+        body += '        } else {\n'
+        body += '          // Create transform if it doesn\'t exist\n'
+        body += '          const transform = svg.createSVGTransform();\n'
+        body += '          transform.setTranslate(0, 0);\n'
+        body += '          this.transform.baseVal.appendItem(transform);\n'
+        body += '          offset = { x: svgP.x, y: svgP.y };\n'
+        body += '        }\n'
+        body += '      }\n'
+        body += '      \n'
+        body += '      function drag(e) {\n'
+        body += '        if (!selected) return;\n'
+        body += '        e.preventDefault();\n'
+        body += '        \n'
+        body += '        const svg = this.ownerSVGElement;\n'
+        body += '        const pt = svg.createSVGPoint();\n'
+        body += '        pt.x = e.clientX;\n'
+        body += '        pt.y = e.clientY;\n'
+        body += '        const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());\n'
+        body += '        \n'
+        body += '        const transform = this.transform.baseVal.getItem(0);\n'
+        body += '        transform.setTranslate(svgP.x - offset.x, svgP.y - offset.y);\n'
+        body += '      }\n'
+        body += '      \n'
+        body += '      function endDrag(e) {\n'
+        body += '        selected = false;\n'
+        body += '      }\n'
+        
+    elif action_type == "tooltip":
+        text = parameters.get("text", "")
+        body += '      // Create tooltip if it doesn\'t exist\n'
+        body += '      if (!document.getElementById("svg-tooltip")) {\n'
+        body += '        const tooltip = document.createElementNS("http://www.w3.org/2000/svg", "text");\n'
+        body += '        tooltip.setAttribute("id", "svg-tooltip");\n'
+        body += '        tooltip.setAttribute("visibility", "hidden");\n'
+        body += '        tooltip.setAttribute("font-family", "Arial");\n'
+        body += '        tooltip.setAttribute("font-size", "12");\n'
+        body += '        tooltip.textContent = "";\n'
+        body += '        document.querySelector("svg").appendChild(tooltip);\n'
+        body += '      }\n'
+        body += '      \n'
+        body += '      // Show tooltip\n'
+        body += '      const tooltip = document.getElementById("svg-tooltip");\n'
+        body += f'      tooltip.textContent = "{text}";\n'
+        body += '      \n'
+        body += '      // Get mouse position in SVG coordinates\n'
+        body += '      const svg = this.ownerSVGElement;\n'
+        body += '      const pt = svg.createSVGPoint();\n'
+        body += '      pt.x = e.clientX;\n'
+        body += '      pt.y = e.clientY;\n'
+        body += '      const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());\n'
+        body += '      \n'
+        body += '      // Position and show tooltip\n'
+        body += '      tooltip.setAttribute("x", svgP.x + 10);\n'
+        body += '      tooltip.setAttribute("y", svgP.y - 10);\n'
+        body += '      tooltip.setAttribute("visibility", "visible");\n'
+        
+    elif action_type == "custom":
+        custom_code = parameters.get("code", "")
+        body += f'      // Custom code\n{custom_code}\n'
+    
+    return body
+
+
+def add_event_handlers(svg_code: str, event_config: Dict[str, Any], mode: str = "inline",
+                       batch_updates: bool = False, minify: bool = False) -> Dict[str, Any]:
     """
     Add event handlers to SVG elements.
     
     Args:
         svg_code: The SVG code to enhance
         event_config: Dictionary with event configuration
+        mode: 'inline' for a self-contained script per call, 'runtime' for a
+            shared runtime with a binding table merged across calls, or
+            'delegated' for the shared runtime dispatching from the SVG root
+        batch_updates: Coalesce pointer moves, animations and attribute writes
+            into one flush per animation frame (runtime modes only)
+        minify: Minify the injected script and style blocks, sharing identical
+            inline handler bodies and shortening the runtime's local names
         
     Returns:
         Dictionary with the enhanced SVG and event information
@@ -29,174 +873,86 @@ def add_event_handlers(svg_code: str, event_config: Dict[str, Any]) -> Dict[str,
             "svg_code": svg_code
         }
     
-    # Create the script section with JavaScript functions
-    script_content = '<script type="text/javascript"><![CDATA[\n'
-    script_content += '// Function to ensure SVG is loaded before adding events\n'
-    script_content += 'document.addEventListener("DOMContentLoaded", function() {\n'
+    if mode not in INTERACTIVITY_MODES:
+        return {
+            "success": False,
+            "error": f"Invalid interactivity mode: {mode}. Valid modes: {', '.join(INTERACTIVITY_MODES)}",
+            "svg_code": svg_code
+        }
     
-    # Add code to get the SVG element(s)
-    script_content += f'  const elements = document.querySelectorAll("{selector}");\n'
-    script_content += '  if (!elements.length) {\n'
-    script_content += f'    console.warn("No elements found matching selector: {selector}");\n'
-    script_content += '    return;\n'
-    script_content += '  }\n\n'
+    if batch_updates and mode not in RUNTIME_MODES:
+        return {
+            "success": False,
+            "error": "Frame-batched updates require the 'runtime' or 'delegated' mode",
+            "svg_code": svg_code
+        }
     
-    # Process each event
+    if mode in RUNTIME_MODES:
+        return _add_runtime_handlers(svg_code, selector, events, mode, batch_updates, minify)
+    
+    # Build the handler body for each event
+    handlers = []
     for event in events:
         event_type = event.get("type", "")
         action = event.get("action", {})
         
         if not event_type or not action:
             continue
-            
-        action_type = action.get("type", "")
-        parameters = action.get("parameters", {})
         
+        handlers.append((event_type, _inline_handler_body(action.get("type", ""), action.get("parameters", {}))))
+    
+    # When minifying, identical handler bodies are emitted once as shared functions
+    shared_handlers = {}
+    if minify:
+        for _, body in handlers:
+            if body not in shared_handlers and sum(1 for _, other in handlers if other == body) > 1:
+                shared_handlers[body] = f"handler{len(shared_handlers)}"
+    
+    # Create the script section with JavaScript functions
+    script_body = '// Function to ensure SVG is loaded before adding events\n'
+    script_body += 'document.addEventListener("DOMContentLoaded", function() {\n'
+    
+    # Add code to get the SVG element(s)
+    script_body += f'  const elements = document.querySelectorAll("{selector}");\n'
+    script_body += '  if (!elements.length) {\n'
+    script_body += f'    console.warn("No elements found matching selector: {selector}");\n'
+    script_body += '    return;\n'
+    script_body += '  }\n\n'
+    
+    for body, name in shared_handlers.items():
+        script_body += f'  const {name} = function(e) {{\n{body}  }};\n\n'
+    
+    # Process each event
+    for event_type, body in handlers:
         # Create event handler function based on action type
-        script_content += f'  // Add {event_type} event handlers\n'
-        script_content += '  elements.forEach(function(element) {\n'
-        script_content += f'    element.addEventListener("{event_type}", function(e) {{\n'
-        
-        # The specific action implementation
-        if action_type == "setAttribute":
-            attr_name = parameters.get("attributeName", "")
-            attr_value = parameters.get("attributeValue", "")
-            script_content += f'      this.setAttribute("{attr_name}", "{attr_value}");\n'
-            
-        elif action_type == "toggleClass":
-            class_name = parameters.get("className", "")
-            script_content += f'      this.classList.toggle("{class_name}");\n'
-            
-        elif action_type == "animate":
-            attr_name = parameters.get("attributeName", "")
-            from_value = parameters.get("from", "")
-            to_value = parameters.get("to", "")
-            duration = parameters.get("duration", 500)
-            
-            script_content += '      const startTime = Date.now();\n'
-            script_content += f'      const fromValue = {from_value};\n'
-            script_content += f'      const toValue = {to_value};\n'
-            script_content += f'      const animDuration = {duration};\n'
-            script_content += '      \n'
-            script_content += '      function animate() {\n'
-            script_content += '        const elapsed = Date.now() - startTime;\n'
-            script_content += '        const progress = Math.min(elapsed / animDuration, 1);\n'
-            script_content += '        const currentValue = fromValue + (toValue - fromValue) * progress;\n'
-            script_content += f'        this.setAttribute("{attr_name}", currentValue);\n'
-            script_content += '        if (progress < 1) {\n'
-            script_content += '          requestAnimationFrame(animate.bind(this));\n'
-            script_content += '        }\n'
-            script_content += '      }\n'
-            script_content += '      animate.bind(this)();\n'
-        
-        elif action_type == "draggable":
-            script_content += '      // Make element draggable\n'
-            script_content += '      let selected = false;\n'
-            script_content += '      let offset = { x: 0, y: 0 };\n'
-            script_content += '      \n'
-            script_content += '      this.addEventListener("mousedown", startDrag);\n'
-            script_content += '      document.addEventListener("mousemove", drag);\n'
-            script_content += '      document.addEventListener("mouseup", endDrag);\n'
-            script_content += '      \n'
-            script_content += '      function startDrag(e) {\n'
-            script_content += '        e.preventDefault();\n'
-            script_content += '        selected = true;\n'
-            script_content += '        \n'
-            script_content += '        // Get SVG point for mouse position\n'
-            script_content += '        const svg = this.ownerSVGElement;\n'
-            script_content += '        const pt = svg.createSVGPoint();\n'
-            script_content += '        pt.x = e.clientX;\n'
-            script_content += '        pt.y = e.clientY;\n'
-            script_content += '        const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());\n'
-            script_content += '        \n'
-            script_content += '        // Calculate offset\n'
-            script_content += '        if (this.transform && this.transform.baseVal.numberOfItems) {\n'
-            script_content += '          const transform = this.transform.baseVal.getItem(0);\n'
-            script_content += '          offset.x = svgP.x - transform.matrix.e;\n'
-            script_content += '          offset.y = svgP.y - transform.matrix.f;\n'
-            script_content += '        } else {\n'
-            script_content += '          // Create transform if it doesn\'t exist\n'
-            script_content += '          const transform = svg.createSVGTransform();\n'
-            script_content += '          transform.setTranslate(0, 0);\n'
-            script_content += '          this.transform.baseVal.appendItem(transform);\n'
-            script_content += '          offset = { x: svgP.x, y: svgP.y };\n'
-            script_content += '        }\n'
-            script_content += '      }\n'
-            script_content += '      \n'
-            script_content += '      function drag(e) {\n'
-            script_content += '        if (!selected) return;\n'
-            script_content += '        e.preventDefault();\n'
-            script_content += '        \n'
-            script_content += '        const svg = this.ownerSVGElement;\n'
-            script_content += '        const pt = svg.createSVGPoint();\n'
-            script_content += '        pt.x = e.clientX;\n'
-            script_content += '        pt.y = e.clientY;\n'
-            script_content += '        const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());\n'
-            script_content += '        \n'
-            script_content += '        const transform = this.transform.baseVal.getItem(0);\n'
-            script_content += '        transform.setTranslate(svgP.x - offset.x, svgP.y - offset.y);\n'
-            script_content += '      }\n'
-            script_content += '      \n'
-            script_content += '      function endDrag(e) {\n'
-            script_content += '        selected = false;\n'
-            script_content += '      }\n'
-            
-        elif action_type == "tooltip":
-            text = parameters.get("text", "")
-            script_content += '      // Create tooltip if it doesn\'t exist\n'
-            script_content += '      if (!document.getElementById("svg-tooltip")) {\n'
-            script_content += '        const tooltip = document.createElementNS("http://www.w3.org/2000/svg", "text");\n'
-            script_content += '        tooltip.setAttribute("id", "svg-tooltip");\n'
-            script_content += '        tooltip.setAttribute("visibility", "hidden");\n'
-            script_content += '        tooltip.setAttribute("font-family", "Arial");\n'
-            script_content += '        tooltip.setAttribute("font-size", "12");\n'
-            script_content += '        tooltip.textContent = "";\n'
-            script_content += '        document.querySelector("svg").appendChild(tooltip);\n'
-            script_content += '      }\n'
-            script_content += '      \n'
-            script_content += '      // Show tooltip\n'
-            script_content += '      const tooltip = document.getElementById("svg-tooltip");\n'
-            script_content += f'      tooltip.textContent = "{text}";\n'
-            script_content += '      \n'
-            script_content += '      // Get mouse position in SVG coordinates\n'
-            script_content += '      const svg = this.ownerSVGElement;\n'
-            script_content += '      const pt = svg.createSVGPoint();\n'
-            script_content += '      pt.x = e.clientX;\n'
-            script_content += '      pt.y = e.clientY;\n'
-            script_content += '      const svgP = pt.matrixTransform(svg.getScreenCTM().inverse());\n'
-            script_content += '      \n'
-            script_content += '      // Position and show tooltip\n'
-            script_content += '      tooltip.setAttribute("x", svgP.x + 10);\n'
-            script_content += '      tooltip.setAttribute("y", svgP.y - 10);\n'
-            script_content += '      tooltip.setAttribute("visibility", "visible");\n'
-            
-        elif action_type == "custom":
-            custom_code = parameters.get("code", "")
-            script_content += f'      // Custom code\n{custom_code}\n'
-            
-        # Close the event listener function and forEach
-        script_content += '    });\n'
-        script_content += '  });\n\n'
+        script_body += f'  // Add {event_type} event handlers\n'
+        script_body += '  elements.forEach(function(element) {\n'
+        if body in shared_handlers:
+            script_body += f'    element.addEventListener("{event_type}", {shared_handlers[body]});\n'
+        else:
+            script_body += f'    element.addEventListener("{event_type}", function(e) {{\n'
+            script_body += body
+            # Close the event listener function
+            script_body += '    });\n'
+        # Close the forEach
+        script_body += '  });\n\n'
     
     # Close the DOMContentLoaded event listener
-    script_content += '});\n'
-    script_content += ']]></script>\n'
+    script_body += '});\n'
     
     # Add necessary styles for interactivity
-    style_content = '<style type="text/css"><![CDATA[\n'
+    style_body = ''
     
     # Add specific styles based on events
-    has_hover = any(event.get("type") == "mouseover" for event in events)
-    has_drag = any(event.get("action", {}).get("type") == "draggable" for event in events)
+    for rule in _interactivity_styles(selector, events):
+        style_body += f'{rule}\n'
     
-    if has_hover:
-        style_content += f'{selector}:hover {{ cursor: pointer; }}\n'
+    if minify:
+        script_body = minify_script(script_body)
+        style_body = minify_style(style_body)
     
-    if has_drag:
-        style_content += f'{selector}.dragging {{ cursor: grabbing; }}\n'
-        style_content += f'{selector} {{ cursor: grab; }}\n'
-    
-    style_content += ']]></style>\n'
+    script_content = f'<script type="text/javascript"><![CDATA[\n{script_body}]]></script>\n'
+    style_content = f'<style type="text/css"><![CDATA[\n{style_body}]]></style>\n'
     
     # Insert script and style into SVG
     if "</svg>" in svg_code:
@@ -208,12 +964,20 @@ def add_event_handlers(svg_code: str, event_config: Dict[str, Any]) -> Dict[str,
         "success": True,
         "svg_code": enhanced_svg,
         "events_added": len(events),
-        "selectors_targeted": selector
+        "selectors_targeted": selector,
+        "block_sizes": {
+            "style": len(style_content.encode('utf-8')),
+            "script": len(script_content.encode('utf-8'))
+        }
     }
 
 
+@instrumented
 def add_svg_interactivity(svg_code: str, interaction_type: str, 
-                         selector: str, configuration: Dict[str, Any]) -> Dict[str, Any]:
+                         selector: str, configuration: Dict[str, Any],
+                         mode: str = "inline", batch_updates: bool = False,
+                         minify: bool = False, size_budget: Optional[int] = None,
+                         return_patch: bool = False) -> Dict[str, Any]:
     """
     Add interactivity to SVG elements.
     
@@ -222,6 +986,16 @@ def add_svg_interactivity(svg_code: str, interaction_type: str,
         interaction_type: Type of interaction ('click', 'hover', 'drag', 'tooltip', 'custom')
         selector: CSS-like selector for target elements
         configuration: Dictionary with interaction details
+        mode: 'inline' (self-contained script per call), 'runtime' (shared
+            runtime and binding table, merged across repeated calls) or
+            'delegated' (shared runtime with one root listener per event type)
+        batch_updates: Apply attribute writes, animation steps and drag moves in a
+            single requestAnimationFrame flush (requires a runtime mode)
+        minify: Minify the injected script and style blocks
+        size_budget: Maximum size in bytes of the resulting SVG; the call fails
+            (returning the input unchanged) when the budget is exceeded
+        return_patch: Return the changes as a patch (see svg_patch.apply_patch)
+            instead of the enhanced SVG code
         
     Returns:
         Dictionary containing the enhanced SVG code and details
@@ -321,13 +1095,41 @@ def add_svg_interactivity(svg_code: str, interaction_type: str,
             })
     
     # Process the SVG with event handlers
-    result = add_event_handlers(svg_code, event_config)
+    result = add_event_handlers(svg_code, event_config, mode, batch_updates, minify)
     
-    return {
+    block_sizes = result.get("block_sizes", {})
+    if result["success"] and size_budget is not None:
+        output_size = len(result["svg_code"].encode('utf-8'))
+        if output_size > size_budget:
+            return {
+                "success": False,
+                "error": f"Interactive SVG is {output_size} bytes, over the budget of {size_budget} bytes "
+                         f"(injected blocks: {block_sizes})",
+                "svg_code": svg_code,
+                "interaction_type": interaction_type,
+                "selector": selector,
+                "events_added": 0,
+                "mode": mode,
+                "block_sizes": block_sizes
+            }
+    
+    output = {
         "success": result["success"],
         "error": result.get("error", ""),
         "svg_code": result["svg_code"],
         "interaction_type": interaction_type,
         "selector": selector,
-        "events_added": result.get("events_added", 0)
-    }
\ No newline at end of file
+        "events_added": result.get("events_added", 0),
+        "mode": mode,
+        "block_sizes": block_sizes
+    }
+    
+    if return_patch and result["success"]:
+        from svg_patch import diff_svg
+        diff = diff_svg(svg_code, result["svg_code"])
+        if not diff["success"]:
+            return dict(output, success=False, error=diff["error"], svg_code=svg_code, events_added=0)
+        del output["svg_code"]
+        output["patch"] = diff["patch"]
+    
+    return output
\ No newline at end of file
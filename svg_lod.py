@@ -0,0 +1,199 @@
+"""
+SVG Level of Detail Module for SVG-MCP.
+
+This module produces level-of-detail (LOD) variants of a document for the
+scales it is drawn at, so each zoom level of a map only carries the detail that
+is visible at that level. For each scale, elements smaller than a pixel are
+dropped, polyline paths are simplified and numbers are rounded, within a
+tolerance measured in pixels.
+
+The document is parsed, measured and serialized once; every leaf element is
+split into its numbers once, and each variant is rendered from those pieces.
+Variants are rendered in parallel. As for tiles, definitions are gathered in
+one defs element and scripts, titles and metadata are dropped.
+
+A scale is the number of pixels per user unit of the root element: at scale 1
+the viewBox is drawn at its own size in pixels, at scale 0.25 a quarter of it.
+"""
+
+import os
+import json
+import math
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from svg_geometry import IDENTITY, BBox, _scale, _stretch, compute_bboxes
+from svg_incremental import _document_prefixes
+from svg_metrics import instrumented, timed
+from svg_optimization import _NumericDocument
+from svg_tiling import TilePlan, _format, assemble_svg, build_tile_plan
+
+
+def _precision(tolerance: float, max_precision: int) -> int:
+    """Fewest decimals whose rounding moves a point by at most `tolerance`."""
+    if tolerance <= 0:
+        return max_precision
+    return min(max_precision, max(0, math.ceil(math.log10(math.sqrt(2) / (2 * tolerance)) - 1e-9)))
+
+
+def _leaf_precision(document: _NumericDocument, tolerance: float, local_tolerance: float,
+                    max_precision: int) -> int:
+    """
+    Fewest decimals keeping the rounding of a leaf's points (drift included)
+    within `tolerance`, in root units; the search starts from the precision
+    for the tolerance in the leaf's own units.
+    """
+    precision = _precision(local_tolerance, max_precision)
+    while precision < max_precision and math.sqrt(2) * document.rounding_error(precision) > tolerance:
+        precision += 1
+    return precision
+
+
+def _path_points(document: _NumericDocument, tolerance: float) -> int:
+    """Number of points in the path data of a leaf simplified at a tolerance."""
+    points = 0
+    for kind, data in document._simplified_paths(tolerance)[0]:
+        if kind == "polyline":
+            points += sum(len(subpath) for subpath, _ in data)
+        else:
+            points += sum(1 for token in data if not isinstance(token, str)) // 2
+    return points
+
+
+def _render_level(args: Tuple[TilePlan, List[Tuple[int, Optional[BBox], float]],
+                              List[Optional[_NumericDocument]], Dict[str, Any]]) -> Dict[str, Any]:
+    """Render the variant for one scale (a top-level function so process pools can pickle it)."""
+    plan, leaves, documents, level = args
+    scale = level["scale"]
+    tolerance = level["pixel_tolerance"] / scale
+    min_size = level["min_pixels"] / scale
+
+    nodes, markup = [], {}
+    dropped = points = 0
+    for (node, box, element_scale), document in zip(leaves, documents):
+        if box is not None and max(box[2] - box[0], box[3] - box[1]) < min_size:
+            dropped += 1
+            continue
+        nodes.append(node)
+        if document is not None:
+            # Tolerances are in root units; the leaf's numbers are in its own user space
+            # (its rounding error is already scaled to root units)
+            local_tolerance = tolerance / element_scale if element_scale > 0 else tolerance
+            precision = _leaf_precision(document, tolerance, local_tolerance, level["max_precision"])
+            markup[node] = document.render(precision, local_tolerance)
+            points += _path_points(document, local_tolerance)
+    svg_code = assemble_svg(plan, nodes, markup=markup)
+
+    result = {
+        "scale": scale,
+        "tolerance": tolerance,
+        "precision": _precision(tolerance, level["max_precision"]),
+        "elements": len(nodes),
+        "elements_dropped": dropped,
+        "path_points": points,
+        "size_bytes": len(svg_code.encode('utf-8'))
+    }
+    if level["path"]:
+        with open(level["path"], "w", encoding="utf-8") as f:
+            f.write(svg_code)
+        result["path"] = level["path"]
+    else:
+        result["svg_code"] = svg_code
+    return result
+
+
+@instrumented
+def generate_svg_lods(svg_code: str, scales: Sequence[float] = (0.25, 0.5, 1.0),
+                      pixel_tolerance: float = 0.5, min_pixels: float = 1.0, max_precision: int = 6,
+                      output_dir: Optional[str] = None, workers: Optional[int] = None,
+                      use_processes: bool = False) -> Dict[str, Any]:
+    """
+    Generate level-of-detail variants of an SVG document for target scales.
+
+    Args:
+        svg_code: The SVG code
+        scales: Pixels per root user unit of each variant
+        pixel_tolerance: Largest distance, in pixels, a point may move through
+            path simplification (and again through rounding)
+        min_pixels: Elements whose bounding box (stroke included) is smaller
+            than this many pixels in both directions are dropped
+        max_precision: Most decimals kept in coordinates
+        output_dir: Write variants to '<output_dir>/lod-<scale>.svg', with a
+            manifest.json, instead of returning their SVG code
+        workers: Number of parallel workers (defaults to the CPU count)
+        use_processes: Use a process pool instead of threads
+
+    Returns:
+        Dictionary containing the variants and a manifest of their sizes and
+        element counts
+    """
+    if not scales or any(scale <= 0 for scale in scales):
+        return {"success": False, "error": "Scales must be positive numbers"}
+
+    start = time.perf_counter()
+    try:
+        prefixes = _document_prefixes(svg_code)
+        with timed("parse", module="svg_lod"):
+            root = ET.fromstring(svg_code)
+    except ET.ParseError as e:
+        return {"success": False, "error": f"Error parsing SVG: {str(e)}"}
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    details: Dict[ET.Element, Tuple[Any, Dict[str, Any]]] = {}
+    boxes = compute_bboxes(root, include_stroke=True, details=details)
+    plan, tile_leaves = build_tile_plan(root, boxes, root_excluded=frozenset(), prefixes=prefixes)
+    parents = {child: parent for parent in root.iter() for child in parent}
+    leaves, documents = [], []
+    for node, box, elem in tile_leaves:
+        leaves.append((node, box, _scale(details[elem][0]) if elem in details else 1.0))
+        # The leaf's markup carries its own transform; its ancestors' is applied here
+        parent_matrix = details[parents[elem]][0] if parents.get(elem) in details else IDENTITY
+        document = _NumericDocument(plan.markup[node], scale=_stretch(parent_matrix))
+        documents.append(document if any(not isinstance(s, str) for s in document.segments) else None)
+    plan_ms = (time.perf_counter() - start) * 1000
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    levels = [{
+        "scale": scale,
+        "pixel_tolerance": pixel_tolerance,
+        "min_pixels": min_pixels,
+        "max_precision": max_precision,
+        "path": os.path.join(output_dir, f"lod-{_format(scale)}.svg") if output_dir else None
+    } for scale in scales]
+
+    start = time.perf_counter()
+    jobs = [(plan, leaves, documents, level) for level in levels]
+    if len(jobs) <= 1 or workers == 1:
+        results = [_render_level(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            results = list(executor.map(_render_level, jobs))
+    render_ms = (time.perf_counter() - start) * 1000
+
+    manifest = {
+        "original": {
+            "size_bytes": len(svg_code.encode('utf-8')),
+            "elements": len(leaves),
+            "path_points": sum(_path_points(document, 0.0) for document in documents if document is not None)
+        },
+        "levels": [{k: v for k, v in result.items() if k != "svg_code"} for result in results]
+    }
+    if output_dir:
+        with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    return {
+        "success": True,
+        "levels": results,
+        "manifest": manifest,
+        "stats": {
+            "parse_ms": round(parse_ms, 3),
+            "plan_ms": round(plan_ms, 3),
+            "render_ms": round(render_ms, 3)
+        }
+    }
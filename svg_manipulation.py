@@ -6,13 +6,30 @@ It allows for selection and transformation of SVG elements using CSS-like select
 """
 
 import re
-from typing import Dict, Any, List, Optional, Tuple, Union
-import xml.etree.ElementTree as ET
+import functools
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
 import math
 
-# Register SVG namespaces
-ET.register_namespace("", "http://www.w3.org/2000/svg")
-ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+from svg_metrics import count, instrumented, timed
+
+if TYPE_CHECKING:
+    import xml.etree.ElementTree as ET
+
+
+@functools.lru_cache(maxsize=None)
+def _element_tree():
+    """Import ElementTree and register the SVG namespaces on first use."""
+    import xml.etree.ElementTree as ET
+    ET.register_namespace("", "http://www.w3.org/2000/svg")
+    ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+    return ET
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(pattern: str) -> "re.Pattern":
+    """Compile a pattern once, on first use."""
+    return re.compile(pattern)
+
 
 class SVGSelector:
     """Class to select SVG elements using simplified CSS-like selectors."""
@@ -20,23 +37,32 @@ class SVGSelector:
     @staticmethod
     def _parse_selector(selector: str) -> Dict[str, str]:
         """Parse a CSS-like selector into components."""
-        result = {"tag": None, "id": None, "classes": [], "attrs": {}}
+        result = {"tag": None, "id": None, "classes": [], "attrs": {}, "regions": []}
+        
+        # Extract geometric pseudo-classes :within(x,y,w,h) and :intersects(x,y,w,h)
+        # first, as their numbers may contain dots
+        region_pattern = _compile(r':(within|intersects)\(([^)]*)\)')
+        for kind, args in region_pattern.findall(selector):
+            numbers = [float(n) for n in _compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?').findall(args)]
+            # Malformed regions match nothing, like unknown tags
+            result["regions"].append((kind, tuple(numbers) if len(numbers) == 4 else None))
+        selector = region_pattern.sub("", selector)
         
         # Extract ID using #
-        id_match = re.search(r'#([a-zA-Z0-9\-_]+)', selector)
+        id_match = _compile(r'#([a-zA-Z0-9\-_]+)').search(selector)
         if id_match:
             result["id"] = id_match.group(1)
             selector = selector.replace(f"#{id_match.group(1)}", "")
         
         # Extract classes using .
-        class_matches = re.findall(r'\.([a-zA-Z0-9\-_]+)', selector)
+        class_matches = _compile(r'\.([a-zA-Z0-9\-_]+)').findall(selector)
         if class_matches:
             result["classes"] = class_matches
             for cls in class_matches:
                 selector = selector.replace(f".{cls}", "")
         
         # Extract attribute selectors [attr=value]
-        attr_matches = re.findall(r'\[([a-zA-Z0-9\-_:]+)(?:=([^\]]+))?\]', selector)
+        attr_matches = _compile(r'\[([a-zA-Z0-9\-_:]+)(?:=([^\]]+))?\]').findall(selector)
         if attr_matches:
             for attr, value in attr_matches:
                 # Strip quotes from value if present
@@ -55,84 +81,144 @@ class SVGSelector:
         return result
     
     @staticmethod
-    def select_elements(svg_code: str, selector: str) -> Tuple[str, List[Dict[str, Any]]]:
+    def match_elements(root: "ET.Element", selector: str) -> "List[ET.Element]":
         """
-        Select SVG elements using a CSS-like selector.
+        Find the elements of a parsed SVG that match a CSS-like selector.
+        
+        Selectors may end with :within(x,y,w,h), matching elements whose
+        bounding box lies inside a rectangle of the root user space, or
+        :intersects(x,y,w,h), matching elements whose bounding box overlaps it.
         
         Args:
-            svg_code: The SVG XML code
-            selector: A CSS-like selector (e.g., 'circle', '#myId', '.myClass')
+            root: Root element of the parsed SVG
+            selector: A CSS-like selector (e.g., 'circle', '#myId', '.myClass',
+                'path:within(0,0,100,100)')
             
         Returns:
-            Tuple containing (modified SVG code, list of selected elements info)
+            List of matching elements in document order
         """
         # Parse the selector
         selector_parts = SVGSelector._parse_selector(selector)
         
-        try:
-            # Parse the SVG
-            root = ET.fromstring(svg_code)
+        # SVG namespace
+        ns = {"svg": "http://www.w3.org/2000/svg"}
+        
+        # Build XPath query based on selector parts
+        xpath = ".//"
+        if selector_parts["tag"]:
+            xpath += f"svg:{selector_parts['tag']}"
+        else:
+            xpath += "*"
             
-            # SVG namespace
-            ns = {"svg": "http://www.w3.org/2000/svg"}
+        # Add id condition if specified
+        if selector_parts["id"]:
+            xpath += f"[@id='{selector_parts['id']}']"
             
-            # Build XPath query based on selector parts
-            xpath = ".//"
-            if selector_parts["tag"]:
-                xpath += f"svg:{selector_parts['tag']}"
-            else:
-                xpath += "*"
-                
-            # Add id condition if specified
-            if selector_parts["id"]:
-                xpath += f"[@id='{selector_parts['id']}']"
-                
-            # Select elements
-            elements = root.findall(xpath, ns)
+        # Select elements
+        elements = root.findall(xpath, ns)
+        
+        # Further filter by classes and attributes
+        filtered_elements = []
+        for elem in elements:
+            should_include = True
             
-            # Further filter by classes and attributes
-            filtered_elements = []
-            for elem in elements:
-                should_include = True
-                
-                # Check classes
-                if selector_parts["classes"]:
-                    elem_class = elem.get("class", "")
-                    elem_classes = elem_class.split()
-                    for cls in selector_parts["classes"]:
-                        if cls not in elem_classes:
-                            should_include = False
-                            break
-                
-                # Check attributes
-                for attr, value in selector_parts["attrs"].items():
-                    if elem.get(attr) != value:
+            # Check classes
+            if selector_parts["classes"]:
+                elem_class = elem.get("class", "")
+                elem_classes = elem_class.split()
+                for cls in selector_parts["classes"]:
+                    if cls not in elem_classes:
                         should_include = False
                         break
-                
-                if should_include:
-                    filtered_elements.append(elem)
             
-            # Prepare element info for return
-            elements_info = []
-            for i, elem in enumerate(filtered_elements):
-                elem_id = elem.get("id", f"_selected_{i}")
-                if not elem.get("id"):
-                    elem.set("id", elem_id)
-                
-                # Store attributes
-                attrs = {}
-                for name, value in elem.attrib.items():
-                    attrs[name] = value
-                
-                elements_info.append({
-                    "id": elem_id,
-                    "tag": elem.tag.split("}")[-1],  # Remove namespace
-                    "attributes": attrs
-                })
+            # Check attributes
+            for attr, value in selector_parts["attrs"].items():
+                if elem.get(attr) != value:
+                    should_include = False
+                    break
+            
+            if should_include:
+                filtered_elements.append(elem)
+        
+        # Filter by bounding box
+        if selector_parts["regions"]:
+            from svg_geometry import SVGGeometry
+            geometry = SVGGeometry(root)
+            for kind, region in selector_parts["regions"]:
+                if region is None:
+                    in_region = set()
+                elif kind == "within":
+                    in_region = set(geometry.within(*region))
+                else:
+                    in_region = set(geometry.intersecting(*region))
+                filtered_elements = [elem for elem in filtered_elements if elem in in_region]
+        
+        count("selector_queries")
+        count("selector_matches", len(filtered_elements))
+        return filtered_elements
+    
+    @staticmethod
+    def describe_elements(elements: "List[ET.Element]") -> List[Dict[str, Any]]:
+        """
+        Describe selected elements, assigning an id to elements without one.
+        
+        Args:
+            elements: Elements returned by match_elements
+            
+        Returns:
+            List of selected elements info (id, tag and attributes)
+        """
+        elements_info = []
+        for i, elem in enumerate(elements):
+            elem_id = elem.get("id", f"_selected_{i}")
+            if not elem.get("id"):
+                elem.set("id", elem_id)
+            
+            # Store attributes
+            attrs = {}
+            for name, value in elem.attrib.items():
+                attrs[name] = value
+            
+            elements_info.append({
+                "id": elem_id,
+                "tag": elem.tag.split("}")[-1],  # Remove namespace
+                "attributes": attrs
+            })
+        
+        return elements_info
+    
+    @staticmethod
+    def select_elements(svg_code: str, selector: str, compact: bool = False) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Select SVG elements using a CSS-like selector.
+        
+        Args:
+            svg_code: The SVG XML code
+            selector: A CSS-like selector (e.g., 'circle', '#myId', '.myClass')
+            compact: Parse into a svg_compact.CompactDocument instead of an
+                ElementTree, using a fraction of the memory on huge documents
+                (:within and :intersects are not supported)
+            
+        Returns:
+            Tuple containing (modified SVG code, list of selected elements info)
+        """
+        ET = _element_tree()
+        try:
+            if compact:
+                from svg_compact import CompactDocument
+                document = CompactDocument(svg_code)
+                elements_info = document.describe(document.select(selector))
+                return document.tostring(), elements_info
+            
+            # Parse the SVG
+            with timed("parse", module="svg_manipulation"):
+                root = ET.fromstring(svg_code)
+            
+            elements_info = SVGSelector.describe_elements(SVGSelector.match_elements(root, selector))
             
             # Convert back to string
-            svg_code = ET.tostring(root, encoding='unicode')
+            with timed("serialize", module="svg_manipulation"):
+                svg_code = ET.tostring(root, encoding='unicode')
             return svg_code, elements_info
             
         except Exception as e:
@@ -143,6 +229,72 @@ class SVGSelector:
 class SVGTransformer:
     """Class to apply transformations to SVG elements."""
     
+    @staticmethod
+    def transform_element(element: "ET.Element", transform: Dict[str, Any]) -> None:
+        """
+        Apply transformation to a parsed SVG element in place.
+        
+        Args:
+            element: The element to transform
+            transform: Dictionary of transformations to apply
+        """
+        # Get existing transform attribute
+        existing_transform = element.get("transform", "")
+        
+        # Build new transform string
+        new_transforms = []
+        
+        # Process each transformation type
+        if "translate" in transform:
+            tx = transform["translate"].get("x", 0)
+            ty = transform["translate"].get("y", 0)
+            new_transforms.append(f"translate({tx} {ty})")
+        
+        if "rotate" in transform:
+            angle = transform["rotate"].get("angle", 0)
+            cx = transform["rotate"].get("cx")
+            cy = transform["rotate"].get("cy")
+            if cx is not None and cy is not None:
+                new_transforms.append(f"rotate({angle} {cx} {cy})")
+            else:
+                new_transforms.append(f"rotate({angle})")
+        
+        if "scale" in transform:
+            sx = transform["scale"].get("x", 1)
+            sy = transform["scale"].get("y", sx)  # Default to sx if sy is not provided
+            new_transforms.append(f"scale({sx} {sy})")
+        
+        if "skew" in transform:
+            skew_x = transform["skew"].get("x", 0)
+            skew_y = transform["skew"].get("y", 0)
+            if skew_x != 0:
+                new_transforms.append(f"skewX({skew_x})")
+            if skew_y != 0:
+                new_transforms.append(f"skewY({skew_y})")
+        
+        if "matrix" in transform:
+            matrix = transform["matrix"]
+            if isinstance(matrix, list) and len(matrix) == 6:
+                new_transforms.append(f"matrix({' '.join(map(str, matrix))})")
+        
+        # Combine with existing transform
+        if existing_transform:
+            transform_value = f"{existing_transform} {' '.join(new_transforms)}"
+        else:
+            transform_value = ' '.join(new_transforms)
+        
+        # Set the transform attribute
+        if transform_value:
+            element.set("transform", transform_value)
+        
+        # Handle direct attribute changes
+        direct_attrs = ["fill", "stroke", "stroke-width", "opacity", "x", "y", 
+                        "cx", "cy", "r", "width", "height", "rx", "ry", "d"]
+        
+        for attr in direct_attrs:
+            if attr in transform:
+                element.set(attr, str(transform[attr]))
+    
     @staticmethod
     def apply_transform(svg_code: str, element_id: str, transform: Dict[str, Any]) -> str:
         """
@@ -156,6 +308,7 @@ class SVGTransformer:
         Returns:
             Modified SVG code
         """
+        ET = _element_tree()
         try:
             # Parse the SVG
             root = ET.fromstring(svg_code)
@@ -170,62 +323,7 @@ class SVGTransformer:
             if element is None:
                 return svg_code  # Element not found
             
-            # Get existing transform attribute
-            existing_transform = element.get("transform", "")
-            
-            # Build new transform string
-            new_transforms = []
-            
-            # Process each transformation type
-            if "translate" in transform:
-                tx = transform["translate"].get("x", 0)
-                ty = transform["translate"].get("y", 0)
-                new_transforms.append(f"translate({tx} {ty})")
-            
-            if "rotate" in transform:
-                angle = transform["rotate"].get("angle", 0)
-                cx = transform["rotate"].get("cx")
-                cy = transform["rotate"].get("cy")
-                if cx is not None and cy is not None:
-                    new_transforms.append(f"rotate({angle} {cx} {cy})")
-                else:
-                    new_transforms.append(f"rotate({angle})")
-            
-            if "scale" in transform:
-                sx = transform["scale"].get("x", 1)
-                sy = transform["scale"].get("y", sx)  # Default to sx if sy is not provided
-                new_transforms.append(f"scale({sx} {sy})")
-            
-            if "skew" in transform:
-                skew_x = transform["skew"].get("x", 0)
-                skew_y = transform["skew"].get("y", 0)
-                if skew_x != 0:
-                    new_transforms.append(f"skewX({skew_x})")
-                if skew_y != 0:
-                    new_transforms.append(f"skewY({skew_y})")
-            
-            if "matrix" in transform:
-                matrix = transform["matrix"]
-                if isinstance(matrix, list) and len(matrix) == 6:
-                    new_transforms.append(f"matrix({' '.join(map(str, matrix))})")
-            
-            # Combine with existing transform
-            if existing_transform:
-                transform_value = f"{existing_transform} {' '.join(new_transforms)}"
-            else:
-                transform_value = ' '.join(new_transforms)
-            
-            # Set the transform attribute
-            if transform_value:
-                element.set("transform", transform_value)
-            
-            # Handle direct attribute changes
-            direct_attrs = ["fill", "stroke", "stroke-width", "opacity", "x", "y", 
-                            "cx", "cy", "r", "width", "height", "rx", "ry", "d"]
-            
-            for attr in direct_attrs:
-                if attr in transform:
-                    element.set(attr, str(transform[attr]))
+            SVGTransformer.transform_element(element, transform)
             
             # Convert back to string
             return ET.tostring(root, encoding='unicode')
@@ -235,7 +333,53 @@ class SVGTransformer:
             return svg_code
 
 
-def transform_svg_element(svg_code: str, selector: str, transform: Dict[str, Any]) -> Dict[str, Any]:
+def transform_svg_tree(root: "ET.Element", selector: str, transform: Dict[str, Any],
+                       return_patch: bool = False) -> Dict[str, Any]:
+    """
+    Transform the elements of a parsed SVG that match a selector, in place.
+    
+    Args:
+        root: Root element of the parsed SVG
+        selector: CSS-like selector to identify elements
+        transform: Dictionary of transformations to apply
+        return_patch: Also return the changes as a patch (see svg_patch)
+        
+    Returns:
+        Dictionary containing the results (without SVG code)
+    """
+    elements = SVGSelector.match_elements(root, selector)
+    
+    if not elements:
+        return {
+            "success": False,
+            "error": f"No elements found matching selector: '{selector}'"
+        }
+    
+    # Only attributes of the selected elements change, so their attributes are all the patch needs
+    original_attributes = [dict(element.attrib) for element in elements] if return_patch else None
+    
+    # Describe before transforming so the reported attributes are the original ones
+    selected_elements = SVGSelector.describe_elements(elements)
+    
+    for element in elements:
+        SVGTransformer.transform_element(element, transform)
+    
+    result = {
+        "success": True,
+        "matched_elements": len(selected_elements),
+        "elements": selected_elements
+    }
+    if return_patch:
+        from svg_patch import attribute_operations, element_paths
+        paths = element_paths(root, elements)
+        result["patch"] = [operation for element, before in zip(elements, original_attributes)
+                           for operation in attribute_operations(paths[element], before, element.attrib)]
+    return result
+
+
+@instrumented
+def transform_svg_element(svg_code: str, selector: str, transform: Dict[str, Any],
+                          return_patch: bool = False) -> Dict[str, Any]:
     """
     Transform SVG elements that match a selector.
     
@@ -243,31 +387,51 @@ def transform_svg_element(svg_code: str, selector: str, transform: Dict[str, Any
         svg_code: The SVG code to modify
         selector: CSS-like selector to identify elements
         transform: Dictionary of transformations to apply
+        return_patch: Return the changes as a patch (see svg_patch.apply_patch)
+            instead of the original and modified SVG code
         
     Returns:
         Dictionary containing the results
     """
+    ET = _element_tree()
     try:
-        # First, select the elements
-        modified_svg, selected_elements = SVGSelector.select_elements(svg_code, selector)
-        
-        if not selected_elements:
+        # Parse once, then select and transform the elements in the same tree
+        try:
+            with timed("parse", module="svg_manipulation"):
+                root = ET.fromstring(svg_code)
+        except ET.ParseError:
             return {
                 "success": False,
                 "error": f"No elements found matching selector: '{selector}'",
                 "modified_svg": svg_code
             }
         
-        # Apply transformations to each selected element
-        for element in selected_elements:
-            modified_svg = SVGTransformer.apply_transform(modified_svg, element["id"], transform)
+        result = transform_svg_tree(root, selector, transform, return_patch)
+        
+        if not result["success"]:
+            return {
+                "success": False,
+                "error": result["error"],
+                "modified_svg": svg_code
+            }
+        
+        if return_patch:
+            return {
+                "success": True,
+                "patch": result["patch"],
+                "matched_elements": result["matched_elements"],
+                "elements": result["elements"]
+            }
+        
+        with timed("serialize", module="svg_manipulation"):
+            modified_svg = ET.tostring(root, encoding='unicode')
         
         return {
             "success": True,
             "original_svg": svg_code,
             "modified_svg": modified_svg,
-            "matched_elements": len(selected_elements),
-            "elements": selected_elements
+            "matched_elements": result["matched_elements"],
+            "elements": result["elements"]
         }
     
     except Exception as e:
@@ -0,0 +1,96 @@
+"""
+SVG-MCP toolkit entry point.
+
+This module exposes the public API of every SVG-MCP module without importing
+them: a module is only imported when one of its names is first accessed, so
+`import svg_mcp` costs almost nothing in short-lived CLI runs and serverless
+workers.
+
+Usage:
+    import svg_mcp
+    result = svg_mcp.optimize_svg(svg_code)
+"""
+
+# Only importlib is imported here (even typing costs more than the rest of the module)
+import importlib
+
+# Public name -> module defining it
+_EXPORTS = {
+    # Optimization
+    "optimize_svg": "svg_optimization",
+    "optimize_svg_to_size": "svg_optimization",
+    "optimize_svg_files": "svg_optimization",
+    "compressed_sizes": "svg_optimization",
+    "register_optimization_rule": "svg_optimization",
+    "OPTIMIZATION_LEVELS": "svg_optimization",
+    "OPTIMIZATION_RULES": "svg_optimization",
+    "compare_svg": "svg_equivalence",
+    "verify_optimization_rules": "svg_equivalence",
+    "verify_optimization_files": "svg_equivalence",
+    "OptimizedDocument": "svg_incremental",
+    # Manipulation
+    "SVGSelector": "svg_manipulation",
+    "SVGTransformer": "svg_manipulation",
+    "transform_svg_element": "svg_manipulation",
+    "transform_svg_tree": "svg_manipulation",
+    "CompactDocument": "svg_compact",
+    "diff_svg": "svg_patch",
+    "apply_patch": "svg_patch",
+    "apply_patch_tree": "svg_patch",
+    "SVGColorMap": "svg_recolor",
+    "recolor_svg": "svg_recolor",
+    "recolor_svg_batch": "svg_recolor",
+    "SVGGeometry": "svg_geometry",
+    "compute_bboxes": "svg_geometry",
+    "hit_test_svg": "svg_geometry",
+    "generate_svg_lods": "svg_lod",
+    # Generation
+    "get_svg_component": "svg_components",
+    "list_components": "svg_components",
+    "register_component": "svg_components",
+    "register_component_pack": "svg_components",
+    "register_component_resolver": "svg_components",
+    "generate_svg_animation": "svg_animation",
+    "add_svg_interactivity": "svg_interactivity",
+    "build_sprite_sheet": "svg_sprites",
+    "import_icon_pack": "svg_icon_pack",
+    "register_icon_pack": "svg_icon_pack",
+    "IconPack": "svg_icon_pack",
+    # Pipelines, async and serving
+    "SVGPipeline": "svg_pipeline",
+    "PipelineCache": "svg_pipeline",
+    "register_pipeline_stage": "svg_pipeline",
+    "run_pipeline": "svg_pipeline",
+    "AsyncSVGExecutor": "svg_async",
+    "SVGServiceBusy": "svg_async",
+    "configure_async_executor": "svg_async",
+    "optimize_svg_async": "svg_async",
+    "transform_svg_element_async": "svg_async",
+    "generate_svg_animation_async": "svg_async",
+    "get_svg_component_async": "svg_async",
+    "add_svg_interactivity_async": "svg_async",
+    "recolor_svg_async": "svg_async",
+    "SVGToolServer": "svg_server",
+    # Metrics
+    "enable_metrics": "svg_metrics",
+    "disable_metrics": "svg_metrics",
+    "reset_metrics": "svg_metrics",
+    "dump_metrics_json": "svg_metrics",
+    "export_prometheus": "svg_metrics",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Later lookups find the name directly and skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,230 @@
+"""
+SVG Metrics Module for SVG-MCP.
+
+This module provides opt-in instrumentation for the SVG-MCP tools: wall time of
+public functions and optimization rules, bytes in/out per rule, parse and
+serialize time, selector match counts and cache hits. Measurements are collected
+into a registry that can be dumped as JSON or exported as Prometheus text.
+
+Instrumentation is disabled by default and costs a single flag check per hook.
+Enable it with enable_metrics() or by setting SVG_MCP_METRICS=1. Measurements
+taken in process pool workers stay in the worker processes.
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+# Labels are stored as a sorted tuple of (name, value) pairs
+LabelKey = Tuple[Tuple[str, str], ...]
+
+METRIC_PREFIX = "svg_mcp"
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and timers."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        # Timer values are [count, total seconds, min seconds, max seconds]
+        self._timers: Dict[Tuple[str, LabelKey], List[float]] = {}
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add a value to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """Record a duration in a timer."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                self._timers[key] = [1, seconds, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = min(timer[2], seconds)
+                timer[3] = max(timer[3], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any):
+        """Context manager recording the wall time of its block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        """Drop every recorded measurement."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def cache_hit_ratios(self) -> Dict[str, float]:
+        """Hit ratio of every cache reported through the 'cache_requests' counter."""
+        requests: Dict[str, List[float]] = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                if name != "cache_requests":
+                    continue
+                label_dict = dict(labels)
+                totals = requests.setdefault(label_dict.get("cache", ""), [0, 0])
+                totals[1] += value
+                if label_dict.get("result") == "hit":
+                    totals[0] += value
+        return {cache: round(hits / total, 4) if total else 0.0
+                for cache, (hits, total) in sorted(requests.items())}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get every measurement as plain data.
+
+        Returns:
+            Dictionary with 'counters', 'timers' and 'cache_hit_ratio' entries
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            timers = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": int(count),
+                    "total_seconds": total,
+                    "mean_seconds": total / count,
+                    "min_seconds": minimum,
+                    "max_seconds": maximum
+                }
+                for (name, labels), (count, total, minimum, maximum) in sorted(self._timers.items())
+            ]
+        return {
+            "counters": counters,
+            "timers": timers,
+            "cache_hit_ratio": self.cache_hit_ratios()
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Dump every measurement as JSON."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        """
+        Export every measurement in the Prometheus text exposition format.
+
+        Counters are exported as '<prefix>_<name>_total' and timers as
+        '<prefix>_<name>_seconds' summaries (count and sum).
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted(self._timers.items())
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{prefix}_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), (count, total, _, _) in timers:
+            metric = f"{prefix}_{name}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_count{_format_labels(labels)} {int(count)}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total:.9f}")
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get("SVG_MCP_METRICS", "") not in ("", "0"))
+
+
+def enable_metrics() -> None:
+    """Start collecting measurements."""
+    REGISTRY.enabled = True
+
+
+def disable_metrics() -> None:
+    """Stop collecting measurements (recorded values are kept)."""
+    REGISTRY.enabled = False
+
+
+def metrics_enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def reset_metrics() -> None:
+    REGISTRY.reset()
+
+
+def timed(name: str, **labels: Any):
+    """Time a block when metrics are enabled, otherwise do nothing."""
+    if not REGISTRY.enabled:
+        return nullcontext()
+    return REGISTRY.timer(name, **labels)
+
+
+def count(name: str, value: float = 1, **labels: Any) -> None:
+    """Add to a counter when metrics are enabled."""
+    if REGISTRY.enabled:
+        REGISTRY.increment(name, value, **labels)
+
+
+def count_cache(cache: str, hit: bool) -> None:
+    """Record a cache lookup for the cache hit ratio."""
+    if REGISTRY.enabled:
+        REGISTRY.increment("cache_requests", cache=cache, result="hit" if hit else "miss")
+
+
+def instrumented(func: Callable) -> Callable:
+    """Decorator recording the wall time of every call as 'function{function=<name>}'."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not REGISTRY.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            REGISTRY.observe("function", time.perf_counter() - start, function=name)
+
+    return wrapper
+
+
+def dump_metrics_json(indent: Optional[int] = 2) -> str:
+    """Dump the global registry as JSON."""
+    return REGISTRY.to_json(indent)
+
+
+def export_prometheus(prefix: str = METRIC_PREFIX) -> str:
+    """Export the global registry as Prometheus text."""
+    return REGISTRY.to_prometheus(prefix)
@@ -5,37 +5,75 @@ This module provides functions for optimizing SVG code based on SVGO principles.
 It reduces file size while preserving visual quality.
 """
 
+import os
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import math
+import time
+import functools
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable, Union
+
+try:
+    import brotli
+except ImportError:  # Brotli support is optional
+    brotli = None
+
+from svg_geometry import _stretch, parse_transform
+from svg_metrics import REGISTRY, instrumented, metrics_enabled
+
+
+# Per-thread count of text modifications made by _sub, set while a detailed
+# optimization report is being collected
+_modifications = threading.local()
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(pattern: str) -> "re.Pattern":
+    """Compile a pattern once, on first use, so importing the module compiles nothing."""
+    return re.compile(pattern)
+
+
+def _sub(pattern: str, repl: Union[str, Callable], string: str) -> str:
+    """re.sub that counts the matches it actually changes when a report is collected."""
+    if getattr(_modifications, "count", None) is None:
+        return _compile(pattern).sub(repl, string)
+    
+    def counted(match):
+        replacement = repl(match) if callable(repl) else match.expand(repl)
+        if replacement != match.group(0):
+            _modifications.count += 1
+        return replacement
+    
+    return _compile(pattern).sub(counted, string)
 
 
 def remove_comments(svg_code: str) -> str:
     """Remove comments from SVG code."""
-    return re.sub(r'<!--[\s\S]*?-->', '', svg_code)
+    return _sub(r'<!--[\s\S]*?-->', '', svg_code)
 
 
 def remove_metadata(svg_code: str) -> str:
     """Remove metadata elements from SVG code."""
-    return re.sub(r'<metadata>[\s\S]*?</metadata>', '', svg_code)
+    return _sub(r'<metadata>[\s\S]*?</metadata>', '', svg_code)
 
 
 def remove_empty_attributes(svg_code: str) -> str:
     """Remove empty attributes from SVG elements."""
-    return re.sub(r'\s+(\w+)=[\'"]{2}', '', svg_code)
+    return _sub(r'\s+(\w+)=[\'"]{2}', '', svg_code)
 
 
 def remove_editor_namespaces(svg_code: str) -> str:
     """Remove editor-specific namespace declarations."""
     pattern = r'xmlns:(inkscape|sodipodi|adobe|ai|graph|sketch)="[^"]*"'
-    return re.sub(pattern, '', svg_code)
+    return _sub(pattern, '', svg_code)
 
 
 def collapse_empty_groups(svg_code: str) -> str:
     """Collapse empty or unnecessary groups."""
-    # Remove empty groups
-    cleaned = re.sub(r'<g[^>]*>\s*</g>', '', svg_code)
+    # Remove empty groups, including self-closing ones
+    cleaned = _sub(r'<g(?:\s[^>]*?)?(?<!/)>\s*</g>|<g(?:\s[^>]*)?/>', '', svg_code)
     # Remove groups with just one element (move attributes to the child if any)
-    cleaned = re.sub(r'<g([^>]*)>\s*(<[^>]+[^/]>)([\s\S]*?)</\2>\s*</g>', 
+    cleaned = _sub(r'<g([^>]*)>\s*(<[^>]+[^/]>)([\s\S]*?)</\2>\s*</g>', 
                      lambda m: f'<{m.group(2).strip()[1:-1]} {m.group(1).strip()}>{m.group(3)}</{m.group(2).strip()[1:-1]}>',
                      cleaned)
     return cleaned
@@ -46,27 +84,27 @@ def minimize_decimal_places(svg_code: str, precision: int = 2) -> str:
     def replace_number(match):
         num = float(match.group(0))
         # Avoid scientific notation for small numbers
-        if abs(num) < 1e-precision:
+        if abs(num) < 10 ** -precision:
             return "0"
         # Format to desired precision
         return f"{num:.{precision}f}".rstrip('0').rstrip('.') if '.' in f"{num:.{precision}f}" else f"{num:.0f}"
     
     # Match numeric values in attributes while preserving non-numeric parts
     pattern = r'((?<=["\s:;,]))-?\d+\.\d+(?=["\s:;,])'
-    return re.sub(pattern, replace_number, svg_code)
+    return _sub(pattern, replace_number, svg_code)
 
 
 def remove_unnecessary_whitespace(svg_code: str) -> str:
     """Remove extra whitespace while preserving structure."""
     # Trim whitespace between tags
-    cleaned = re.sub(r'>\s+<', '><', svg_code)
+    cleaned = _sub(r'>\s+<', '><', svg_code)
     # Trim whitespace around attribute values
-    cleaned = re.sub(r'\s*=\s*(["\'])', r'=\1', cleaned)
+    cleaned = _sub(r'\s*=\s*(["\'])', r'=\1', cleaned)
     # Normalize whitespace in tags
-    cleaned = re.sub(r'<\s+', '<', cleaned)
-    cleaned = re.sub(r'\s+>', '>', cleaned)
+    cleaned = _sub(r'<\s+', '<', cleaned)
+    cleaned = _sub(r'\s+>', '>', cleaned)
     # Compress multiple spaces
-    cleaned = re.sub(r'\s{2,}', ' ', cleaned)
+    cleaned = _sub(r'\s{2,}', ' ', cleaned)
     return cleaned
 
 
@@ -110,7 +148,7 @@ def convert_styles_to_attributes(svg_code: str) -> str:
             return f'<{tag} {attrs} {normal_attrs} style="{style_attrs}">'
     
     pattern = r'<(\w+)([^>]*?)\s+style=["\']([^"\']*)["\']([^>]*)>'
-    return re.sub(pattern, style_to_attrs, svg_code)
+    return _sub(pattern, style_to_attrs, svg_code)
 
 
 def optimize_path_data(svg_code: str) -> str:
@@ -122,8 +160,8 @@ def optimize_path_data(svg_code: str) -> str:
         
         # Simplify consecutive commands of the same type
         # Ex: "M10 10 L20 20 L30 30" -> "M10 10 L20 20 30 30"
-        simplified = re.sub(r'([MLHVCSQTAmlhvcsqta])[^MLHVCSQTAmlhvcsqta]*((?:\s*-?\d+(?:\.\d+)?)+\s*)([MLHVCSQTAmlhvcsqta])', 
-                           r'\1\2\3', path_data)
+        simplified = _compile(r'([MLHVCSQTAmlhvcsqta])[^MLHVCSQTAmlhvcsqta]*((?:\s*-?\d+(?:\.\d+)?)+\s*)([MLHVCSQTAmlhvcsqta])').sub(
+            r'\1\2\3', path_data)
         
         # Replace relative with absolute when it saves space (only for simple cases)
         # This is a simplified optimization - full path optimization would be more complex
@@ -131,59 +169,205 @@ def optimize_path_data(svg_code: str) -> str:
         return f'<{tag}{attrs}d="{simplified}"{match.group(4)}>'
     
     pattern = r'<(\w+)(\s+[^>]*?)d=(["\'])([^"\']+)(["\'])([^>]*)>'
-    return re.sub(pattern, optimize_path, svg_code)
+    return _sub(pattern, optimize_path, svg_code)
+
+
+# Rules available to optimize_svg, by name
+OPTIMIZATION_RULES: Dict[str, Callable[..., str]] = {
+    "remove_comments": remove_comments,
+    "remove_metadata": remove_metadata,
+    "remove_empty_attributes": remove_empty_attributes,
+    "remove_editor_namespaces": remove_editor_namespaces,
+    "collapse_empty_groups": collapse_empty_groups,
+    "convert_styles_to_attributes": convert_styles_to_attributes,
+    "optimize_path_data": optimize_path_data,
+    "minimize_decimal_places": minimize_decimal_places,
+    "remove_unnecessary_whitespace": remove_unnecessary_whitespace,
+}
 
+# Rule lists of the optimization levels. A rule is a name from
+# OPTIMIZATION_RULES or a dictionary with a 'name' and 'params' for the rule.
+OPTIMIZATION_LEVELS: Dict[str, List[Union[str, Dict[str, Any]]]] = {
+    # Basic non-destructive optimizations
+    "light": [
+        "remove_comments",
+        "remove_metadata",
+        "remove_empty_attributes",
+        "remove_editor_namespaces",
+        "remove_unnecessary_whitespace",
+    ],
+    # Standard optimizations
+    "standard": [
+        "remove_comments",
+        "remove_metadata",
+        "remove_empty_attributes",
+        "remove_editor_namespaces",
+        "collapse_empty_groups",
+        {"name": "minimize_decimal_places", "params": {"precision": 3}},
+        "remove_unnecessary_whitespace",
+    ],
+    # Maximum optimization
+    "aggressive": [
+        "remove_comments",
+        "remove_metadata",
+        "remove_empty_attributes",
+        "remove_editor_namespaces",
+        "collapse_empty_groups",
+        "convert_styles_to_attributes",
+        "optimize_path_data",
+        {"name": "minimize_decimal_places", "params": {"precision": 2}},
+        "remove_unnecessary_whitespace",
+    ],
+}
+OPTIMIZATION_LEVELS["default"] = OPTIMIZATION_LEVELS["standard"]
 
-def optimize_svg(svg_code: str, level: str = "standard") -> Dict[str, Any]:
+
+def register_optimization_rule(name: str, rule: Callable[..., str]) -> None:
+    """
+    Register a custom optimization rule.
+    
+    Args:
+        name: Name used in rule lists
+        rule: Function taking the SVG code (plus optional keyword parameters)
+            and returning the optimized SVG code
+    """
+    OPTIMIZATION_RULES[name] = rule
+
+
+def _resolve_rules(rules: List[Union[str, Dict[str, Any], Callable[[str], str]]]) -> List[Tuple[str, Callable[[str], str]]]:
+    """Turn a rule list into (name, callable) pairs; raises KeyError for unknown rules."""
+    resolved = []
+    for rule in rules:
+        if callable(rule):
+            resolved.append((getattr(rule, "__name__", "custom"), rule))
+        elif isinstance(rule, dict):
+            func = OPTIMIZATION_RULES[rule["name"]]
+            params = rule.get("params") or {}
+            resolved.append((rule["name"], functools.partial(func, **params) if params else func))
+        else:
+            resolved.append((rule, OPTIMIZATION_RULES[rule]))
+    return resolved
+
+
+def _apply_rule(name: str, rule: Callable[[str], str], svg_code: str,
+                report: Optional[List[Dict[str, Any]]] = None) -> str:
+    """
+    Apply one optimization rule.
+    
+    Records its time and bytes in/out when metrics are enabled, and appends
+    its bytes saved, time and modification count to the report if one is given.
+    """
+    if report is None and not metrics_enabled():
+        return rule(svg_code)
+    
+    if report is not None:
+        _modifications.count = 0
+    start = time.perf_counter()
+    try:
+        result = rule(svg_code)
+    finally:
+        elapsed = time.perf_counter() - start
+        modifications = getattr(_modifications, "count", None)
+        _modifications.count = None
+    
+    bytes_in = len(svg_code.encode('utf-8'))
+    bytes_out = len(result.encode('utf-8'))
+    if metrics_enabled():
+        REGISTRY.observe("optimization_rule", elapsed, rule=name)
+        REGISTRY.increment("optimization_rule_bytes_in", bytes_in, rule=name)
+        REGISTRY.increment("optimization_rule_bytes_out", bytes_out, rule=name)
+    if report is not None:
+        time_ms = elapsed * 1000
+        report.append({
+            "rule": name,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "bytes_saved": bytes_in - bytes_out,
+            "time_ms": round(time_ms, 4),
+            "modifications": modifications,
+            "bytes_saved_per_ms": round((bytes_in - bytes_out) / time_ms, 2) if time_ms > 0 else 0.0
+        })
+    return result
+
+
+@instrumented
+def optimize_svg(svg_code: str, level: str = "standard",
+                 rules: Optional[List[Union[str, Dict[str, Any], Callable[[str], str]]]] = None,
+                 detailed: bool = False, optimize_for: str = "raw",
+                 compression_stats: bool = False) -> Dict[str, Any]:
     """
     Optimize SVG code based on SVGO principles.
     
     Args:
         svg_code: The SVG code to optimize
         level: Optimization level ('light', 'standard', 'aggressive')
+        rules: Custom ordered rule list used instead of the level's rules. Each
+            rule is a name from OPTIMIZATION_RULES, a dictionary with 'name'
+            and 'params', or a callable taking and returning SVG code
+        detailed: Add a per-rule report (bytes saved, time and number of
+            modifications) to the statistics
+        optimize_for: 'raw' minimizes the plain size. 'gzip' or 'brotli' also
+            try the COMPRESSION_REWRITES and keep only the rules that do not
+            grow the compressed size
+        compression_stats: Add compressed sizes to the statistics (always
+            added when optimizing for a compressor)
         
     Returns:
         A dictionary containing the optimized SVG and statistics
     """
     original_size = len(svg_code.encode('utf-8'))
     
-    # Apply optimizations based on level
-    if level == "light":
-        # Basic non-destructive optimizations
-        svg_code = remove_comments(svg_code)
-        svg_code = remove_metadata(svg_code)
-        svg_code = remove_empty_attributes(svg_code)
-        svg_code = remove_editor_namespaces(svg_code)
-        svg_code = remove_unnecessary_whitespace(svg_code)
-    
-    elif level == "standard" or level == "default":
-        # Standard optimizations
-        svg_code = remove_comments(svg_code)
-        svg_code = remove_metadata(svg_code)
-        svg_code = remove_empty_attributes(svg_code)
-        svg_code = remove_editor_namespaces(svg_code)
-        svg_code = collapse_empty_groups(svg_code)
-        svg_code = minimize_decimal_places(svg_code, precision=3)
-        svg_code = remove_unnecessary_whitespace(svg_code)
-    
-    elif level == "aggressive":
-        # Maximum optimization
-        svg_code = remove_comments(svg_code)
-        svg_code = remove_metadata(svg_code)
-        svg_code = remove_empty_attributes(svg_code)
-        svg_code = remove_editor_namespaces(svg_code)
-        svg_code = collapse_empty_groups(svg_code)
-        svg_code = convert_styles_to_attributes(svg_code)
-        svg_code = optimize_path_data(svg_code)
-        svg_code = minimize_decimal_places(svg_code, precision=2)
-        svg_code = remove_unnecessary_whitespace(svg_code)
+    if rules is not None:
+        level = "custom"
+    else:
+        rules = OPTIMIZATION_LEVELS.get(level, [])
+    
+    try:
+        resolved_rules = _resolve_rules(rules)
+    except KeyError as e:
+        return {
+            "error": f"Unknown optimization rule: {e.args[0]}. "
+                     f"Available rules: {', '.join(OPTIMIZATION_RULES)}",
+            "optimized_svg": svg_code
+        }
+    
+    compress = None
+    if optimize_for != "raw":
+        compress = _COMPRESSORS.get(optimize_for)
+        if compress is None:
+            return {
+                "error": f"Cannot optimize for '{optimize_for}'. "
+                         f"Available: raw, {', '.join(_COMPRESSORS)}",
+                "optimized_svg": svg_code
+            }
+        resolved_rules += [(name, OPTIMIZATION_RULES[name]) for name in COMPRESSION_REWRITES
+                           if name not in {rule_name for rule_name, _ in resolved_rules}]
+        compression_stats = True
+    
+    original_compressed = compressed_sizes(svg_code) if compression_stats else None
+    compressed_size = len(compress(svg_code.encode('utf-8'))) if compress else None
+    
+    report = [] if detailed else None
+    for name, rule in resolved_rules:
+        candidate = _apply_rule(name, rule, svg_code, report)
+        if compress is not None:
+            # Keep only rewrites that do not hurt the compressed size
+            candidate_size = len(compress(candidate.encode('utf-8')))
+            kept = candidate_size <= compressed_size
+            if report is not None:
+                report[-1]["compressed_bytes_saved"] = compressed_size - candidate_size
+                report[-1]["kept"] = kept
+            if not kept:
+                continue
+            compressed_size = candidate_size
+        svg_code = candidate
     
     # Calculate optimization statistics
     optimized_size = len(svg_code.encode('utf-8'))
     saved_bytes = original_size - optimized_size
     percentage = round((saved_bytes / original_size) * 100, 2) if original_size > 0 else 0
     
-    return {
+    result = {
         "optimized_svg": svg_code,
         "stats": {
             "original_size_bytes": original_size,
@@ -192,4 +376,819 @@ def optimize_svg(svg_code: str, level: str = "standard") -> Dict[str, Any]:
             "percentage_reduction": percentage,
             "optimization_level": level
         }
-    }
\ No newline at end of file
+    }
+    
+    if original_compressed is not None:
+        optimized_compressed = compressed_sizes(svg_code)
+        result["stats"]["compressed_size_bytes"] = {
+            name: {
+                "original": original_compressed[name],
+                "optimized": optimized_compressed[name],
+                "bytes_saved": original_compressed[name] - optimized_compressed[name]
+            }
+            for name in optimized_compressed
+        }
+        result["stats"]["optimized_for"] = optimize_for
+    
+    if report is not None:
+        result["stats"]["rules"] = report
+    
+    return result
+
+# Simplification tolerances tried by optimize_svg_to_size, as fractions of the
+# document diagonal (0 keeps every path point)
+SIMPLIFICATION_TOLERANCES = [0.0, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02]
+
+# Attributes whose numbers are never rounded
+PRESERVED_NUMERIC_ATTRIBUTES = {"id", "class", "version", "href", "xlink:href"}
+
+# Attributes whose numbers are not coordinates: transforms, stroke and font
+# lengths (also inside style), animation timing and values, and filter
+# parameters. A coordinate tolerance does not bound the effect of rounding
+# them, so lossy rounding (optimize_svg_to_size, svg_lod) copies them verbatim
+NON_GEOMETRIC_NUMERIC_ATTRIBUTES = PRESERVED_NUMERIC_ATTRIBUTES | {
+    "transform", "gradientTransform", "patternTransform", "style",
+    "stroke-width", "stroke-dasharray", "stroke-dashoffset", "stroke-miterlimit",
+    "font-size", "letter-spacing", "word-spacing", "rotate", "pathLength",
+    "values", "from", "to", "by", "keyTimes", "keySplines", "keyPoints",
+    "stdDeviation", "baseFrequency", "numOctaves", "seed", "kernelMatrix", "divisor", "bias",
+    "tableValues", "slope", "intercept", "amplitude", "exponent", "k1", "k2", "k3", "k4", "scale",
+    "surfaceScale", "diffuseConstant", "specularConstant", "specularExponent", "azimuth", "elevation",
+    "limitingConeAngle"
+}
+
+# Attributes whose transform applies to the element's own numbers and its descendants
+TRANSFORM_ATTRIBUTES = ("transform", "gradientTransform", "patternTransform")
+
+# Elements whose content is measured in another coordinate system (bounding box
+# units, a viewBox of its own) or compared as markup by svg_equivalence; lossy
+# rounding copies them verbatim, like any <svg> nested in the root
+VERBATIM_NUMERIC_ELEMENTS = {"linearGradient", "radialGradient", "pattern", "marker", "clipPath", "mask",
+                             "filter", "symbol", "svg"}
+
+# Non-geometric attributes on a 0-1 scale: kept at two decimals at least and
+# left out of the geometric error
+UNIT_INTERVAL_ATTRIBUTES = {"opacity", "fill-opacity", "stroke-opacity", "stop-opacity", "offset"}
+UNIT_INTERVAL_PRECISION = 2
+
+# Patterns are kept as strings and compiled on first use by _compile
+# Elements copied verbatim, and start tags whose attributes hold the numbers
+_NUMERIC_MARKUP_PATTERN = (
+    r'<script\b[\s\S]*?</script>|<style\b[\s\S]*?</style>|<!\[CDATA\[[\s\S]*?\]\]>|<!--[\s\S]*?-->'
+    r'|<[a-zA-Z][^<>]*>')
+_ATTRIBUTE_PATTERN = r'(?s)([\w:.-]+)(\s*=\s*)(["\'])(.*?)\3'
+_DECIMAL_PATTERN = r'(?<![\w#.])-?\d*\.\d+(?![\w.])'
+_END_TAG_PATTERN = r'</[a-zA-Z][^<>]*>'
+_PATH_TOKEN_PATTERN = r'([MmLlHhVvCcSsQqTtZz])|(-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|([,\s]+)|(.)'
+
+# Numbers taken by each path command
+_PATH_ARITY = {"M": 2, "L": 2, "T": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "Z": 0}
+
+
+def _format_number(value: float, precision: int) -> str:
+    """Shortest fixed-point form of a number at a precision ('0.50' -> '.5')."""
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip('0').rstrip('.')
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    return "0" if text in ("-0", "") else text
+
+
+def _join_numbers(parts: List[str]) -> str:
+    """Join path commands and numbers, leaving out separators the grammar does not need."""
+    out = []
+    previous_number = None
+    for part in parts:
+        if part[0].isalpha():
+            out.append(part)
+            previous_number = None
+            continue
+        if previous_number is not None and not part.startswith("-") and \
+                not (part.startswith(".") and "." in previous_number):
+            out.append(" ")
+        out.append(part)
+        previous_number = part
+    return "".join(out)
+
+
+def _parse_path(d: str) -> Optional[Tuple[str, Any]]:
+    """
+    Parse path data into ('polyline', subpaths) for paths made only of
+    moveto/lineto/closepath commands, ('path', tokens) for other paths, or
+    None for paths that cannot be safely re-rendered (arcs, malformed data).
+    """
+    tokens = []
+    for match in _compile(_PATH_TOKEN_PATTERN).finditer(d):
+        command, number, _, other = match.groups()
+        if other is not None:
+            return None
+        if command:
+            tokens.append(command)
+        elif number:
+            tokens.append(float(number))
+    if not tokens or not isinstance(tokens[0], str):
+        return None
+    
+    if any(isinstance(t, str) and t not in "MmLlZz" for t in tokens):
+        # Paths are re-rendered command by command, so every command needs whole groups of numbers
+        index = 0
+        while index < len(tokens):
+            arity = _PATH_ARITY[tokens[index].upper()]
+            count = 0
+            index += 1
+            while index < len(tokens) and not isinstance(tokens[index], str):
+                count += 1
+                index += 1
+            if (count % arity if arity else count) or (arity and not count):
+                return None
+        return "path", tokens
+    
+    subpaths = []
+    current = None
+    x = y = start_x = start_y = 0.0
+    index = 0
+    while index < len(tokens):
+        command = tokens[index]
+        index += 1
+        if command in "Zz":
+            if current is not None:
+                current[1] = True
+                x, y = start_x, start_y
+                current = None
+            continue
+        numbers = []
+        while index < len(tokens) and not isinstance(tokens[index], str):
+            numbers.append(tokens[index])
+            index += 1
+        if not numbers or len(numbers) % 2:
+            return None
+        relative = command.islower()
+        for i in range(0, len(numbers), 2):
+            dx, dy = numbers[i], numbers[i + 1]
+            x, y = (x + dx, y + dy) if relative else (dx, dy)
+            if command in "Mm" and i == 0:
+                current = [[(x, y)], False]
+                subpaths.append(current)
+                start_x, start_y = x, y
+            elif current is None:
+                current = [[(start_x, start_y), (x, y)], False]
+                subpaths.append(current)
+            else:
+                current[0].append((x, y))
+    return "polyline", [(points, closed) for points, closed in subpaths]
+
+
+def _round_path(tokens: List[Any], precision: int) -> Tuple[List[str], float]:
+    """
+    Round path tokens to a precision.
+    
+    Relative coordinates are taken from the rounded position of the previous
+    point rather than rounded on their own, so rounding errors do not add up
+    along the path.
+    
+    Returns:
+        Tuple containing (rendered tokens, largest displacement of a coordinate)
+    """
+    parts = []
+    error = 0.0
+    # True and rendered current point ([x, y, rendered x, rendered y]) and subpath start
+    point = [0.0, 0.0, 0.0, 0.0]
+    start = list(point)
+    
+    def coordinate(value: float, axis: int, relative: bool, origin: List[float]) -> float:
+        """Render one coordinate of a point relative to `origin`; returns its true and rendered position."""
+        nonlocal error
+        target = origin[axis] + value if relative else value
+        rendered = round(target - origin[axis + 2] if relative else target, precision)
+        parts.append(_format_number(rendered, precision))
+        if relative:
+            rendered += origin[axis + 2]
+        error = max(error, abs(rendered - target))
+        return target, rendered
+    
+    # Last control point of the previous segment, true and rendered, and its kind
+    control, control_kind = list(point), ""
+    
+    index = 0
+    while index < len(tokens):
+        command = tokens[index]
+        upper = command.upper()
+        parts.append(command)
+        index += 1
+        if command in "Zz":
+            point = list(start)
+            control_kind = ""
+            continue
+        arity = _PATH_ARITY[upper]
+        relative = command.islower()
+        first = True
+        while index < len(tokens) and not isinstance(tokens[index], str):
+            values = tokens[index:index + arity]
+            index += arity
+            if command in "HhVv":
+                axis = 0 if command in "Hh" else 1
+                point[axis], point[axis + 2] = coordinate(values[0], axis, relative, point)
+                control_kind = ""
+                continue
+            # S and T reflect the previous control point, whose rounding error they inherit
+            kind = "C" if upper in "CS" else "Q" if upper in "QT" else ""
+            if upper in "ST":
+                if control_kind != kind:
+                    control = list(point)
+                control = [2 * point[0] - control[0], 2 * point[1] - control[1],
+                           2 * point[2] - control[2], 2 * point[3] - control[3]]
+                error = max(error, abs(control[2] - control[0]), abs(control[3] - control[1]))
+            # Control points of relative curves are relative to the segment's start
+            origin = list(point)
+            pairs = []
+            for i in range(0, arity, 2):
+                point[0], point[2] = coordinate(values[i], 0, relative, origin)
+                point[1], point[3] = coordinate(values[i + 1], 1, relative, origin)
+                pairs.append(list(point))
+            if upper in "CSQ":
+                control = pairs[-2]
+            control_kind = kind
+            if command in "Mm" and first:
+                start = list(point)
+            first = False
+    return parts, error
+
+
+def _simplify_points(points: List[Tuple[float, float]], tolerance: float) -> Tuple[List[Tuple[float, float]], float]:
+    """
+    Ramer-Douglas-Peucker simplification of a polyline.
+    
+    Returns:
+        Tuple containing (kept points, largest distance of a dropped point)
+    """
+    if tolerance <= 0 or len(points) < 3:
+        return points, 0.0
+    
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    deviation = 0.0
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        farthest, farthest_distance = -1, 0.0
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length:
+                distance = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / length
+            else:
+                distance = math.hypot(px - x1, py - y1)
+            if distance > farthest_distance:
+                farthest, farthest_distance = i, distance
+        if farthest_distance > tolerance:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+        else:
+            deviation = max(deviation, farthest_distance)
+    return [point for point, kept in zip(points, keep) if kept], deviation
+
+
+class _NumericDocument:
+    """
+    SVG code split into literal text, attribute numbers and path data, so it
+    can be re-rendered at any precision and simplification tolerance without
+    re-parsing.
+    
+    Errors are measured in the units of the code's own coordinate system times
+    `scale`: each number is weighted by the largest stretch of the transforms
+    applying to it, so rounding inside a scaled group counts as much as it moves
+    the rendered outline.
+    """
+    
+    def __init__(self, svg_code: str, preserved_attributes: Optional[Set[str]] = None, scale: float = 1.0):
+        # Attributes whose numbers are copied verbatim
+        self.preserved_attributes = (NON_GEOMETRIC_NUMERIC_ATTRIBUTES if preserved_attributes is None
+                                     else preserved_attributes)
+        self.scale = scale
+        # Segments are literal strings, ("number", index) or ("path", index)
+        self.segments: List[Any] = []
+        self.numbers: List[float] = []
+        # Minimum precision of each number (0 for geometric values)
+        self.number_precisions: List[int] = []
+        # Length scale of the coordinate system of each number and path
+        self.number_weights: List[float] = []
+        self.paths: List[Tuple[str, Any]] = []
+        self.path_weights: List[float] = []
+        self._simplified: Dict[float, Tuple[List[Any], float]] = {}
+        self._rounding_error: Dict[int, float] = {}
+        self._split(svg_code)
+        self.diagonal = self._diagonal(svg_code)
+    
+    def _split(self, svg_code: str) -> None:
+        literal_start = 0
+        
+        def literal(end: int) -> None:
+            if end > literal_start:
+                self.segments.append(svg_code[literal_start:end])
+        
+        attribute_pattern = _compile(_ATTRIBUTE_PATTERN)
+        decimal_pattern = _compile(_DECIMAL_PATTERN)
+        # Length scale of the open elements, innermost last; None inside verbatim elements
+        weights: List[Optional[float]] = [self.scale]
+        root_seen = False
+        for markup in _compile(_NUMERIC_MARKUP_PATTERN + "|" + _END_TAG_PATTERN).finditer(svg_code):
+            text = markup.group(0)
+            if text.startswith("</"):
+                if len(weights) > 1:
+                    weights.pop()
+                continue
+            if not text[1].isalpha() or text.startswith(("<script", "<style")):
+                continue
+            tag = _compile(r'<([\w:.-]+)').match(text).group(1).split(":")[-1]
+            attributes = list(attribute_pattern.finditer(svg_code, markup.start(), markup.end()))
+            weight = weights[-1]
+            if weight is not None and tag in VERBATIM_NUMERIC_ELEMENTS and (tag != "svg" or root_seen):
+                weight = None
+            root_seen = True
+            for attribute in attributes:
+                if weight is not None and attribute.group(1) in TRANSFORM_ATTRIBUTES:
+                    weight *= _stretch(parse_transform(attribute.group(4)))
+            if not text.endswith("/>"):
+                weights.append(weight)
+            if weight is None:
+                continue
+            for attribute in attributes:
+                name, value_start = attribute.group(1), attribute.start(4)
+                value = attribute.group(4)
+                if name in self.preserved_attributes:
+                    continue
+                if name == "d":
+                    parsed = _parse_path(value)
+                    if parsed is None:
+                        continue
+                    literal(value_start)
+                    self.segments.append(("path", len(self.paths)))
+                    self.paths.append(parsed)
+                    self.path_weights.append(weight)
+                    literal_start = attribute.end(4)
+                    continue
+                minimum_precision = UNIT_INTERVAL_PRECISION if name in UNIT_INTERVAL_ATTRIBUTES else 0
+                for number in decimal_pattern.finditer(value):
+                    literal(value_start + number.start())
+                    self.segments.append(("number", len(self.numbers)))
+                    self.numbers.append(float(number.group(0)))
+                    self.number_precisions.append(minimum_precision)
+                    self.number_weights.append(weight)
+                    literal_start = value_start + number.end()
+        literal(len(svg_code))
+    
+    def _diagonal(self, svg_code: str) -> float:
+        """Diagonal of the viewBox (or width/height) used to scale tolerances."""
+        root = _compile(r'<svg\b[^>]*>').search(svg_code)
+        if root:
+            view_box = _compile(r'viewBox\s*=\s*["\']([^"\']+)["\']').search(root.group(0))
+            if view_box:
+                values = [float(v) for v in _compile(r'[\s,]+').split(view_box.group(1).strip()) if v]
+                if len(values) == 4 and (values[2] or values[3]):
+                    return math.hypot(values[2], values[3])
+            width = _compile(r'\swidth\s*=\s*["\'](\d+(?:\.\d+)?)').search(root.group(0))
+            height = _compile(r'\sheight\s*=\s*["\'](\d+(?:\.\d+)?)').search(root.group(0))
+            if width and height:
+                return math.hypot(float(width.group(1)), float(height.group(1))) or 100.0
+        return 100.0
+    
+    def _simplified_paths(self, tolerance: float) -> Tuple[List[Any], float]:
+        """Paths simplified at a tolerance (cached), with the largest deviation."""
+        if tolerance not in self._simplified:
+            simplified, deviation = [], 0.0
+            for (kind, data), weight in zip(self.paths, self.path_weights):
+                if kind == "polyline":
+                    subpaths = []
+                    for points, closed in data:
+                        kept, dropped = _simplify_points(points, tolerance)
+                        subpaths.append((kept, closed))
+                        deviation = max(deviation, weight * dropped)
+                    simplified.append((kind, subpaths))
+                else:
+                    simplified.append((kind, data))
+            self._simplified[tolerance] = (simplified, deviation)
+        return self._simplified[tolerance]
+    
+    def rounding_error(self, precision: int) -> float:
+        """Largest displacement of any geometric number rounded to a precision, weighted by its scale."""
+        if precision not in self._rounding_error:
+            # A position and a size of one shape (x + width, cx + r) can round the same way
+            error = max((2 * weight * abs(v - round(v, precision))
+                         for v, minimum, weight in zip(self.numbers, self.number_precisions, self.number_weights)
+                         if not minimum),
+                        default=0.0)
+            for (kind, data), weight in zip(self.paths, self.path_weights):
+                if kind == "polyline":
+                    values = [c for points, _ in data for point in points for c in point]
+                    error = max([error] + [weight * abs(v - round(v, precision)) for v in values])
+                else:
+                    error = max(error, weight * _round_path(data, precision)[1])
+            self._rounding_error[precision] = error
+        return self._rounding_error[precision]
+    
+    def error(self, precision: int, tolerance: float) -> float:
+        """Geometric error bound: path deviation plus the diagonal of a rounding step."""
+        return self._simplified_paths(tolerance)[1] + math.sqrt(2) * self.rounding_error(precision)
+    
+    def _render_path(self, kind: str, data: Any, precision: int) -> str:
+        parts = []
+        if kind == "polyline":
+            for points, closed in data:
+                for i, (x, y) in enumerate(points):
+                    if i < 2:
+                        parts.append("M" if i == 0 else "L")
+                    parts.append(_format_number(x, precision))
+                    parts.append(_format_number(y, precision))
+                if closed:
+                    parts.append("Z")
+        else:
+            parts = _round_path(data, precision)[0]
+        return _join_numbers(parts)
+    
+    def render(self, precision: int, tolerance: float = 0.0) -> str:
+        """Render the document at a precision and simplification tolerance."""
+        paths = self._simplified_paths(tolerance)[0]
+        out = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                out.append(segment)
+            elif segment[0] == "number":
+                index = segment[1]
+                out.append(_format_number(self.numbers[index], max(precision, self.number_precisions[index])))
+            else:
+                out.append(self._render_path(*paths[segment[1]], precision))
+        return "".join(out)
+
+
+@instrumented
+def optimize_svg_to_size(svg_code: str, target_bytes: Optional[int] = None,
+                         target_ratio: Optional[float] = None,
+                         max_error: Optional[float] = None,
+                         level: str = "standard",
+                         max_precision: int = 4) -> Dict[str, Any]:
+    """
+    Optimize SVG code down to a byte budget with the least geometric loss.
+    
+    The level's lossless rules run once; the document is then split into its
+    numbers and path data, and re-rendered while searching over number precision
+    and path simplification tolerance. For each tolerance the highest precision
+    that fits is found by binary search, and the fitting setting with the
+    smallest geometric error wins.
+    
+    Args:
+        svg_code: The SVG code to optimize
+        target_bytes: Maximum size of the result in bytes
+        target_ratio: Maximum size as a fraction of the original size (e.g. 0.5)
+        max_error: Maximum geometric error as a fraction of the document diagonal
+        level: Optimization level whose rules run before the search
+            (its decimal rounding is replaced by the search)
+        max_precision: Highest number precision tried
+        
+    Returns:
+        A dictionary containing the optimized SVG and statistics, including the
+        chosen precision and tolerance, the geometric error, whether the
+        target was met and, with max_error, whether svg_equivalence.compare_svg
+        confirmed the result within it (when it cannot, the losslessly
+        optimized SVG is returned)
+    """
+    original_size = len(svg_code.encode('utf-8'))
+    targets = [t for t in (target_bytes,
+                           int(original_size * target_ratio) if target_ratio is not None else None)
+               if t is not None]
+    if not targets:
+        return {
+            "error": "A target_bytes or target_ratio is required",
+            "optimized_svg": svg_code
+        }
+    target = min(targets)
+    
+    lossless_rules = [rule for rule in OPTIMIZATION_LEVELS.get(level, [])
+                      if (rule["name"] if isinstance(rule, dict) else rule) != "minimize_decimal_places"]
+    base = optimize_svg(svg_code, rules=lossless_rules)["optimized_svg"]
+    document = _NumericDocument(base)
+    
+    sizes: Dict[Tuple[int, float], int] = {}
+    
+    def size_at(precision: int, tolerance: float) -> int:
+        key = (precision, tolerance)
+        if key not in sizes:
+            sizes[key] = len(document.render(precision, tolerance).encode('utf-8'))
+        return sizes[key]
+    
+    precisions = list(range(max_precision, -1, -1))
+    best = None
+    fallback = None
+    
+    for fraction in SIMPLIFICATION_TOLERANCES:
+        tolerance = fraction * document.diagonal
+        # Sizes shrink as precision drops: find the first precision that fits
+        low, high = 0, len(precisions)
+        while low < high:
+            middle = (low + high) // 2
+            if size_at(precisions[middle], tolerance) <= target:
+                high = middle
+            else:
+                low = middle + 1
+        
+        # The most compact setting within the error limit, in case nothing fits
+        compact = (document.error(precisions[-1], tolerance), precisions[-1], tolerance)
+        if max_error is None or compact[0] <= max_error * document.diagonal:
+            if fallback is None or size_at(compact[1], tolerance) < size_at(fallback[1], fallback[2]):
+                fallback = compact
+        
+        if low == len(precisions):
+            continue
+        candidate = (document.error(precisions[low], tolerance), precisions[low], tolerance)
+        if max_error is not None and candidate[0] > max_error * document.diagonal:
+            continue
+        if best is None or candidate[0] < best[0]:
+            best = candidate
+            if candidate[0] == 0:
+                break
+    
+    chosen = best or fallback or (document.error(max_precision, 0.0), max_precision, 0.0)
+    error, precision, tolerance = chosen
+    optimized = document.render(precision, tolerance)
+    
+    # Confirm the result renders within max_error, raising the precision (and
+    # finally keeping every number) until it does
+    verified = None
+    if max_error is not None:
+        from svg_equivalence import compare_svg
+        limit = max_error * document.diagonal
+        settings = [(precision, tolerance)] + [(p, 0.0) for p in range(precision + (tolerance == 0.0),
+                                                                       max_precision + 1)]
+        verified = False
+        for precision, tolerance in settings:
+            optimized = document.render(precision, tolerance)
+            if compare_svg(svg_code, optimized, tolerance=limit)["equivalent"]:
+                verified = True
+                break
+        if verified:
+            error = document.error(precision, tolerance)
+        else:
+            optimized, error, precision, tolerance = base, 0.0, None, 0.0
+    optimized_size = len(optimized.encode('utf-8'))
+    saved_bytes = original_size - optimized_size
+    
+    return {
+        "optimized_svg": optimized,
+        "stats": {
+            "original_size_bytes": original_size,
+            "optimized_size_bytes": optimized_size,
+            "bytes_saved": saved_bytes,
+            "percentage_reduction": round((saved_bytes / original_size) * 100, 2) if original_size > 0 else 0,
+            "optimization_level": level,
+            "target_bytes": target,
+            "target_met": optimized_size <= target,
+            "precision": precision,
+            "simplification_tolerance": round(tolerance, 6),
+            "geometric_error": round(error, 6),
+            "relative_error": round(error / document.diagonal, 8),
+            "verified": verified,
+            "renders": len(sizes)
+        }
+    }
+
+
+# Compressors used for compression-aware optimization and precompressed output
+def _gzip_compress(data: bytes) -> bytes:
+    import gzip
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip_compress}
+if brotli is not None:
+    _COMPRESSORS["brotli"] = lambda data: brotli.compress(data, quality=11)
+
+# File extension of each precompressed artifact
+PRECOMPRESSED_EXTENSIONS = {"gzip": ".svgz", "brotli": ".svg.br"}
+
+# Rewrites that mainly help compressors; tried after the level's rules when
+# optimizing for a compressed size
+COMPRESSION_REWRITES = ["sort_attributes", "normalize_number_format"]
+
+# Attributes placed first by sort_attributes; the rest follow alphabetically
+LEADING_ATTRIBUTES = ["xmlns", "id", "class"]
+
+_START_TAG_PATTERN = r'^<([a-zA-Z][\w:.-]*)([\s\S]*?)(/?)>$'
+_PATH_DECIMAL_PATTERN = r'(?<![\d.])-?\d*\.\d+(?![\d.])'
+
+
+def compressed_sizes(svg_code: str) -> Dict[str, int]:
+    """
+    Compressed size of SVG code with every available compressor.
+    
+    Args:
+        svg_code: The SVG code to measure
+        
+    Returns:
+        Dictionary mapping 'gzip' (and 'brotli' when installed) to sizes in bytes
+    """
+    data = svg_code.encode('utf-8')
+    return {name: len(compress(data)) for name, compress in _COMPRESSORS.items()}
+
+
+def _rewrite_start_tags(svg_code: str, rewrite: Callable[[str, str, str, str], str]) -> str:
+    """Rewrite every start tag outside scripts, styles, comments and CDATA."""
+    def replace(match):
+        markup = match.group(0)
+        if not markup[1].isalpha() or markup.startswith(("<script", "<style")):
+            return markup
+        tag = _compile(_START_TAG_PATTERN).match(markup)
+        if not tag:
+            return markup
+        return rewrite(markup, tag.group(1), tag.group(2), tag.group(3))
+    
+    return _sub(_NUMERIC_MARKUP_PATTERN, replace, svg_code)
+
+
+def _attribute_order(name: str) -> Tuple[int, str]:
+    base = name.split(":")[0]
+    if base in LEADING_ATTRIBUTES:
+        return LEADING_ATTRIBUTES.index(base), name
+    return len(LEADING_ATTRIBUTES), name
+
+
+def sort_attributes(svg_code: str) -> str:
+    """Put attributes in a canonical order so repeated tags compress better."""
+    def sort_tag(markup, name, attrs_text, self_closing):
+        attributes = _compile(_ATTRIBUTE_PATTERN).findall(attrs_text)
+        # Leave tags with anything but plain attributes untouched
+        if not attributes or _compile(_ATTRIBUTE_PATTERN).sub('', attrs_text).strip():
+            return markup
+        ordered = sorted(attributes, key=lambda attribute: _attribute_order(attribute[0]))
+        rendered = " ".join(f'{attr}={quote}{value}{quote}' for attr, _, quote, value in ordered)
+        return f'<{name} {rendered}{self_closing}>'
+    
+    return _rewrite_start_tags(svg_code, sort_tag)
+
+
+def _normalize_decimal(text: str) -> str:
+    """Write a decimal in one consistent, shortest form ('0.50' -> '.5', '2.0' -> '2')."""
+    negative = text.startswith("-")
+    whole, _, fraction = text.lstrip("-").partition(".")
+    whole = whole.lstrip("0")
+    fraction = fraction.rstrip("0")
+    result = whole + ("." + fraction if fraction else "")
+    if not result:
+        # Keep the sign of a negative zero, which may separate it from the previous number
+        return "-0" if negative else "0"
+    return ("-" if negative else "") + result
+
+
+def normalize_number_format(svg_code: str) -> str:
+    """Write every decimal in attribute values in the same shortest form."""
+    def normalize_value(match):
+        return _normalize_decimal(match.group(0))
+    
+    def normalize_tag(markup, name, attrs_text, self_closing):
+        def normalize_attribute(attribute):
+            attr, equals, quote, value = attribute.groups()
+            if attr in PRESERVED_NUMERIC_ATTRIBUTES:
+                return attribute.group(0)
+            pattern = _compile(_PATH_DECIMAL_PATTERN) if attr in ("d", "points") else _compile(_DECIMAL_PATTERN)
+            return f'{attr}{equals}{quote}{pattern.sub(normalize_value, value)}{quote}'
+        
+        return f'<{name}{_compile(_ATTRIBUTE_PATTERN).sub(normalize_attribute, attrs_text)}{self_closing}>'
+    
+    return _rewrite_start_tags(svg_code, normalize_tag)
+
+
+OPTIMIZATION_RULES["sort_attributes"] = sort_attributes
+OPTIMIZATION_RULES["normalize_number_format"] = normalize_number_format
+
+
+def _optimize_file_job(args: Tuple[str, Optional[str], str, str, Tuple[str, ...]]) -> Dict[str, Any]:
+    input_path, output_path, level, optimize_for, precompress = args
+    try:
+        with open(input_path, "r", encoding="utf-8") as f:
+            svg_code = f.read()
+        
+        result = optimize_svg(svg_code, level=level, optimize_for=optimize_for)
+        if "error" in result:
+            return {"input_path": input_path, "success": False, "error": result["error"]}
+        
+        optimized = result["optimized_svg"]
+        data = optimized.encode('utf-8')
+        output_path = output_path or input_path
+        with open(output_path, "wb") as f:
+            f.write(data)
+        
+        artifacts = {}
+        for name in precompress:
+            compressed = _COMPRESSORS[name](data)
+            artifact_path = os.path.splitext(output_path)[0] + PRECOMPRESSED_EXTENSIONS[name]
+            with open(artifact_path, "wb") as f:
+                f.write(compressed)
+            artifacts[name] = {"path": artifact_path, "size_bytes": len(compressed)}
+        
+        return {
+            "input_path": input_path,
+            "output_path": output_path,
+            "success": True,
+            "stats": result["stats"],
+            "artifacts": artifacts
+        }
+    
+    except Exception as e:
+        return {"input_path": input_path, "success": False, "error": str(e)}
+
+
+@instrumented
+def optimize_svg_files(input_paths: List[str], output_dir: Optional[str] = None,
+                       level: str = "standard", optimize_for: str = "raw",
+                       precompress: Optional[List[str]] = None,
+                       workers: Optional[int] = None,
+                       use_processes: bool = True, in_place: bool = False) -> Dict[str, Any]:
+    """
+    Optimize many SVG files in parallel, optionally writing precompressed copies.
+    
+    Args:
+        input_paths: SVG files to optimize
+        output_dir: Directory for the optimized files; their paths relative to
+            the inputs' common directory are mirrored inside it
+        level: Optimization level
+        optimize_for: 'raw', 'gzip' or 'brotli' (see optimize_svg)
+        precompress: Compressors whose artifacts are written next to each output
+            ('gzip' writes .svgz, 'brotli' writes .svg.br)
+        workers: Number of parallel workers (defaults to the CPU count)
+        use_processes: Use a process pool instead of threads
+        in_place: Overwrite the input files instead (when no output_dir is given)
+        
+    Returns:
+        Dictionary containing per-file results and totals
+    """
+    precompress = tuple(precompress or ())
+    unavailable = [name for name in precompress if name not in _COMPRESSORS]
+    if unavailable:
+        return {
+            "success": False,
+            "error": f"Compressor not available: {', '.join(unavailable)}. "
+                     f"Available compressors: {', '.join(_COMPRESSORS)}",
+            "files": []
+        }
+    
+    if bool(output_dir) == bool(in_place):
+        return {
+            "success": False,
+            "error": "Give either an output directory or in_place=True to overwrite the inputs",
+            "files": []
+        }
+    
+    output_paths: List[Optional[str]] = [None] * len(input_paths)
+    if output_dir and input_paths:
+        absolute = [os.path.abspath(path) for path in input_paths]
+        try:
+            base = os.path.commonpath([os.path.dirname(path) for path in absolute])
+        except ValueError as e:
+            return {"success": False, "error": f"Cannot mirror the input paths: {str(e)}", "files": []}
+        output_paths = [os.path.join(output_dir, os.path.relpath(path, base)) for path in absolute]
+        inputs = {os.path.normcase(path) for path in absolute}
+        seen: Dict[str, str] = {}
+        for path, output_path in zip(input_paths, output_paths):
+            key = os.path.normcase(os.path.abspath(output_path))
+            if key in inputs:
+                return {
+                    "success": False,
+                    "error": f"Writing {path} to {output_path} would overwrite an input (use in_place=True)",
+                    "files": []
+                }
+            if key in seen:
+                return {
+                    "success": False,
+                    "error": f"Inputs {seen[key]} and {path} would both be written to {output_path}",
+                    "files": []
+                }
+            seen[key] = path
+        for directory in {os.path.dirname(path) for path in output_paths}:
+            os.makedirs(directory, exist_ok=True)
+    jobs = [(path, output_path, level, optimize_for, precompress)
+            for path, output_path in zip(input_paths, output_paths)]
+    
+    if len(jobs) <= 1:
+        results = [_optimize_file_job(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(_optimize_file_job, jobs, chunksize=chunksize))
+    
+    succeeded = [r for r in results if r["success"]]
+    return {
+        "success": len(succeeded) == len(results),
+        "files": results,
+        "files_optimized": len(succeeded),
+        "original_size_bytes": sum(r["stats"]["original_size_bytes"] for r in succeeded),
+        "optimized_size_bytes": sum(r["stats"]["optimized_size_bytes"] for r in succeeded),
+        "precompressed_size_bytes": {
+            name: sum(r["artifacts"][name]["size_bytes"] for r in succeeded) for name in precompress
+        }
+    }
@@ -0,0 +1,341 @@
+"""
+SVG Patch Module for SVG-MCP.
+
+This module describes the changes between two versions of an SVG document as a
+compact structural patch, and applies such patches, so clients and servers
+that keep a document (as a DOM or a parsed tree) can exchange the changes
+instead of whole documents.
+
+A patch is a JSON-serializable list of operations applied in order. Elements
+are addressed by their path, the child indices from the root element (only
+elements count, as in the DOM `children` collection):
+
+    {"op": "attribute", "path": [0, 2], "id": "a", "name": "fill", "old": "red", "new": "blue"}
+    {"op": "text", "path": [1], "old": "Hello", "new": "Hi"}
+    {"op": "tail", "path": [1], "old": "\\n", "new": null}
+    {"op": "insert", "path": [3], "markup": "<rect ... />", "tail": "\\n"}
+    {"op": "remove", "path": [3], "id": "b", "markup": "<rect ... />", "tail": "\\n"}
+
+"text" is the text before an element's first child and "tail" the text after
+the element. Old and new values are null for absent attributes and text.
+"id" is the element's id when it has one; with the old values, it lets
+apply_patch detect patches made against another version of the document.
+"""
+
+import json
+import difflib
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, Iterable, List, Optional
+
+from svg_metrics import instrumented, timed
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# Namespaced attribute names are written with these prefixes in patches
+ATTRIBUTE_PREFIXES = {XLINK_NS: "xlink", XML_NS: "xml"}
+ATTRIBUTE_NAMESPACES = {prefix: uri for uri, prefix in ATTRIBUTE_PREFIXES.items()}
+
+
+class PatchConflict(Exception):
+    """A patch does not match the document it is applied to."""
+
+
+def _qualified_name(name: str) -> str:
+    """'{http://www.w3.org/1999/xlink}href' -> 'xlink:href'."""
+    if name.startswith("{"):
+        uri, local = name[1:].split("}", 1)
+        if uri in ATTRIBUTE_PREFIXES:
+            return f"{ATTRIBUTE_PREFIXES[uri]}:{local}"
+    return name
+
+
+def _element_tree_name(name: str) -> str:
+    """'xlink:href' -> '{http://www.w3.org/1999/xlink}href'."""
+    prefix, separator, local = name.partition(":")
+    if separator and prefix in ATTRIBUTE_NAMESPACES:
+        return f"{{{ATTRIBUTE_NAMESPACES[prefix]}}}{local}"
+    return name
+
+
+def _markup(elem: ET.Element) -> str:
+    """Serialize an element without its tail."""
+    tail, elem.tail = elem.tail, None
+    try:
+        return ET.tostring(elem, encoding="unicode")
+    finally:
+        elem.tail = tail
+
+
+def _with_id(operation: Dict[str, Any], elem_id: Optional[str]) -> Dict[str, Any]:
+    if elem_id is not None:
+        operation["id"] = elem_id
+    return operation
+
+
+def attribute_operations(path: List[int], before: Dict[str, str], after: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Operations changing an element's attributes from `before` to `after`.
+
+    The id attribute is changed last, so every operation carries the id the
+    element has when it is applied.
+    """
+    # New attributes are added in their order in `after`
+    names = list(before) + [name for name in after if name not in before]
+    names.sort(key=lambda name: name == "id")
+    elem_id = before.get("id")
+    return [_with_id({
+        "op": "attribute",
+        "path": list(path),
+        "name": _qualified_name(name),
+        "old": before.get(name),
+        "new": after.get(name)
+    }, elem_id) for name in names if before.get(name) != after.get(name)]
+
+
+def element_paths(root: ET.Element, elements: Iterable[ET.Element]) -> Dict[ET.Element, List[int]]:
+    """Paths of some elements of a tree, found in one walk."""
+    targets = set(elements)
+    paths: Dict[ET.Element, List[int]] = {}
+    if root in targets:
+        paths[root] = []
+    stack = [(root, [])]
+    while stack and len(paths) < len(targets):
+        elem, path = stack.pop()
+        for index, child in enumerate(elem):
+            child_path = path + [index]
+            if child in targets:
+                paths[child] = child_path
+            if len(child):
+                stack.append((child, child_path))
+    return paths
+
+
+def _child_key(elem: ET.Element) -> Any:
+    """Key matching children across versions: the id, or the attributes and text of elements without one."""
+    if elem.get("id") is not None:
+        return (elem.tag, elem.get("id"))
+    return (elem.tag, None, hash((tuple(elem.attrib.items()), elem.text)))
+
+
+def _same_elements(old_children: List[ET.Element], new_children: List[ET.Element]) -> bool:
+    """Whether replaced children are the same elements, modified (same tags and ids in the same order)."""
+    return len(old_children) == len(new_children) and all(
+        old.tag == new.tag and old.get("id") == new.get("id") for old, new in zip(old_children, new_children))
+
+
+def _diff(old: ET.Element, new: ET.Element, path: List[int], operations: List[Dict[str, Any]]) -> None:
+    operations.extend(attribute_operations(path, old.attrib, new.attrib))
+    if (old.text or None) != (new.text or None):
+        operations.append(_with_id({"op": "text", "path": path, "old": old.text, "new": new.text}, new.get("id")))
+
+    old_children, new_children = list(old), list(new)
+    if [child.tag for child in old_children] == [child.tag for child in new_children] and \
+            [child.get("id") for child in old_children] == [child.get("id") for child in new_children]:
+        opcodes = [("equal", 0, len(old_children), 0, len(new_children))]
+    else:
+        # Keys with the attributes keep runs of similar elements without ids from being misaligned
+        old_keys = [_child_key(child) for child in old_children]
+        new_keys = [_child_key(child) for child in new_children]
+        opcodes = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False).get_opcodes()
+
+    # Later children first, so the paths of earlier ones are still those of the old tree
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        if tag == "equal" or tag == "replace" and _same_elements(old_children[i1:i2], new_children[j1:j2]):
+            for offset in range(i2 - i1):
+                old_child, new_child = old_children[i1 + offset], new_children[j1 + offset]
+                child_path = path + [i1 + offset]
+                _diff(old_child, new_child, child_path, operations)
+                if (old_child.tail or None) != (new_child.tail or None):
+                    operations.append(_with_id({"op": "tail", "path": child_path, "old": old_child.tail,
+                                                "new": new_child.tail}, new_child.get("id")))
+            continue
+        for index in reversed(range(i1, i2)):
+            child = old_children[index]
+            operations.append(_with_id({"op": "remove", "path": path + [index], "markup": _markup(child),
+                                        "tail": child.tail}, child.get("id")))
+        for offset, child in enumerate(new_children[j1:j2]):
+            operations.append({"op": "insert", "path": path + [i1 + offset], "markup": _markup(child),
+                               "tail": child.tail})
+
+
+def diff_svg_trees(old_root: ET.Element, new_root: ET.Element) -> List[Dict[str, Any]]:
+    """
+    Patch turning one parsed SVG document into another.
+
+    Children are matched by tag and id; unmatched children are removed and
+    inserted whole, matched ones are compared recursively.
+
+    Raises:
+        ValueError: If the root elements have different tags
+    """
+    if old_root.tag != new_root.tag:
+        raise ValueError(f"Root elements differ: {old_root.tag} and {new_root.tag}")
+    operations: List[Dict[str, Any]] = []
+    _diff(old_root, new_root, [], operations)
+    return operations
+
+
+@instrumented
+def diff_svg(old_svg: str, new_svg: str) -> Dict[str, Any]:
+    """
+    Compute the patch turning one SVG document into another.
+
+    Args:
+        old_svg: The original SVG code
+        new_svg: The modified SVG code
+
+    Returns:
+        Dictionary containing the patch and its size
+    """
+    try:
+        with timed("parse", module="svg_patch"):
+            old_root = ET.fromstring(old_svg)
+            new_root = ET.fromstring(new_svg)
+        patch = diff_svg_trees(old_root, new_root)
+    except (ET.ParseError, ValueError) as e:
+        return {"success": False, "error": f"Error comparing SVG documents: {str(e)}"}
+
+    return {
+        "success": True,
+        "patch": patch,
+        "stats": {
+            "operations": len(patch),
+            "patch_size_bytes": len(json.dumps(patch).encode('utf-8')),
+            "document_size_bytes": len(new_svg.encode('utf-8'))
+        }
+    }
+
+
+def invert_patch(patch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Patch undoing another patch."""
+    inverse = []
+    for operation in reversed(patch):
+        kind = operation["op"]
+        if kind in ("attribute", "text", "tail"):
+            undo = dict(operation, old=operation["new"], new=operation["old"])
+            if kind == "attribute" and operation["name"] == "id":
+                undo.pop("id", None)
+                if operation["new"] is not None:
+                    undo["id"] = operation["new"]
+        elif kind == "insert":
+            undo = _with_id(dict(operation, op="remove"), ET.fromstring(operation["markup"]).get("id"))
+        elif kind == "remove":
+            undo = {"op": "insert", "path": operation["path"], "markup": operation["markup"],
+                    "tail": operation.get("tail")}
+        else:
+            raise ValueError(f"Unknown patch operation: {kind}")
+        inverse.append(undo)
+    return inverse
+
+
+def _locate(root: ET.Element, path: List[int]) -> ET.Element:
+    elem = root
+    for index in path:
+        if not 0 <= index < len(elem):
+            raise PatchConflict(f"No element at path {path}")
+        elem = elem[index]
+    return elem
+
+
+def _apply_operation(root: ET.Element, operation: Dict[str, Any], strict: bool) -> None:
+    kind, path = operation["op"], operation["path"]
+    if kind == "insert":
+        parent = _locate(root, path[:-1])
+        if not path or not 0 <= path[-1] <= len(parent):
+            raise PatchConflict(f"Cannot insert at path {path}")
+        child = ET.fromstring(operation["markup"])
+        child.tail = operation.get("tail")
+        parent.insert(path[-1], child)
+        return
+    if kind not in ("attribute", "text", "tail", "remove"):
+        raise PatchConflict(f"Unknown patch operation: {kind}")
+
+    elem = _locate(root, path)
+    if strict and elem.get("id") != operation.get("id"):
+        raise PatchConflict(f"Element at path {path} has id {elem.get('id')!r}, expected {operation.get('id')!r}")
+    if kind == "remove":
+        if not path:
+            raise PatchConflict("Cannot remove the root element")
+        _locate(root, path[:-1]).remove(elem)
+    elif kind == "attribute":
+        name = _element_tree_name(operation["name"])
+        if strict and elem.get(name) != operation["old"]:
+            raise PatchConflict(f"Attribute {operation['name']} at path {path} is {elem.get(name)!r}, "
+                                f"expected {operation['old']!r}")
+        if operation["new"] is None:
+            elem.attrib.pop(name, None)
+        else:
+            elem.set(name, operation["new"])
+    else:
+        current = elem.text if kind == "text" else elem.tail
+        if strict and (current or None) != (operation["old"] or None):
+            raise PatchConflict(f"The {kind} of the element at path {path} does not match the patch")
+        if kind == "text":
+            elem.text = operation["new"]
+        else:
+            elem.tail = operation["new"]
+
+
+def apply_patch_tree(root: ET.Element, patch: List[Dict[str, Any]], strict: bool = True) -> Dict[str, Any]:
+    """
+    Apply a patch to a parsed SVG document, in place.
+
+    The patch is applied entirely or not at all: when an operation does not
+    match the document, the operations already applied are undone.
+
+    Args:
+        root: Root element of the parsed SVG
+        patch: Operations from diff_svg or a return_patch result
+        strict: Check element ids and old values before changing anything
+
+    Returns:
+        Dictionary containing the number of operations applied
+    """
+    applied = []
+    try:
+        for operation in patch:
+            _apply_operation(root, operation, strict)
+            applied.append(operation)
+    except (PatchConflict, KeyError, TypeError, ET.ParseError) as e:
+        for undo in invert_patch(applied):
+            _apply_operation(root, undo, False)
+        return {
+            "success": False,
+            "error": f"Patch does not apply: {str(e)}",
+            "operations_applied": 0
+        }
+
+    return {"success": True, "operations_applied": len(applied)}
+
+
+@instrumented
+def apply_patch(svg_code: str, patch: List[Dict[str, Any]], strict: bool = True) -> Dict[str, Any]:
+    """
+    Apply a patch to SVG code.
+
+    Args:
+        svg_code: The SVG code to patch
+        patch: Operations from diff_svg or a return_patch result
+        strict: Check element ids and old values before changing anything
+
+    Returns:
+        Dictionary containing the patched SVG code
+    """
+    try:
+        with timed("parse", module="svg_patch"):
+            root = ET.fromstring(svg_code)
+    except ET.ParseError as e:
+        return {"success": False, "error": f"Error parsing SVG: {str(e)}", "svg_code": svg_code}
+
+    result = apply_patch_tree(root, patch, strict)
+    if not result["success"]:
+        return dict(result, svg_code=svg_code)
+
+    with timed("serialize", module="svg_patch"):
+        result["svg_code"] = ET.tostring(root, encoding="unicode")
+    return result
@@ -0,0 +1,331 @@
+"""
+SVG Pipeline Module for SVG-MCP.
+
+This module chains the SVG-MCP tools (generation, transformation, recoloring,
+interactivity and optimization) into a declarative pipeline. Stages run over a
+shared document that is only parsed or serialized when a stage needs the other
+representation, stage outputs are cached, and each run reports per-stage timing.
+"""
+
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Callable
+import xml.etree.ElementTree as ET
+
+from svg_animation import generate_svg_animation
+from svg_components import get_svg_component
+from svg_interactivity import add_svg_interactivity
+from svg_manipulation import transform_svg_tree
+from svg_metrics import REGISTRY, count_cache, metrics_enabled
+from svg_optimization import optimize_svg
+from svg_recolor import SVGColorMap
+
+
+class SVGDocument:
+    """SVG document shared by pipeline stages, held as text, as a tree, or both."""
+
+    def __init__(self, svg_code: Optional[str] = None):
+        self._text = svg_code
+        self._root: Optional[ET.Element] = None
+        self.parse_ms = 0.0
+        self.serialize_ms = 0.0
+
+    @property
+    def has_text(self) -> bool:
+        return self._text is not None
+
+    @property
+    def text(self) -> str:
+        """The SVG code, serialized from the tree if the tree was modified."""
+        if self._text is None:
+            if self._root is None:
+                return ""
+            start = time.perf_counter()
+            self._text = ET.tostring(self._root, encoding='unicode')
+            elapsed = time.perf_counter() - start
+            self.serialize_ms += elapsed * 1000
+            if metrics_enabled():
+                REGISTRY.observe("serialize", elapsed, module="svg_pipeline")
+        return self._text
+
+    @text.setter
+    def text(self, svg_code: str) -> None:
+        self._text = svg_code
+        self._root = None
+
+    @property
+    def root(self) -> ET.Element:
+        """The parsed tree, parsed from the text on first access."""
+        if self._root is None:
+            start = time.perf_counter()
+            self._root = ET.fromstring(self._text or "")
+            elapsed = time.perf_counter() - start
+            self.parse_ms += elapsed * 1000
+            if metrics_enabled():
+                REGISTRY.observe("parse", elapsed, module="svg_pipeline")
+        return self._root
+
+    def tree_modified(self) -> None:
+        """Invalidate the text after the tree has been changed in place."""
+        self._text = None
+
+
+class PipelineCache:
+    """Least-recently-used cache of stage outputs keyed by stage chain digests."""
+
+    def __init__(self, max_entries: int = 256, name: str = "pipeline"):
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, record: bool = True) -> Optional[Any]:
+        """Look up an entry; with record=False the lookup is not counted as a hit or miss."""
+        value = self._entries.get(key)
+        if record:
+            self.record(value is not None)
+        if value is None:
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def record(self, hit: bool) -> None:
+        """Count one lookup, for callers that probe several keys per request."""
+        count_cache(self.name, hit)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Stage kinds: 'source' stages create a new document and ignore their input,
+# 'tree' stages edit the parsed tree in place, 'text' stages rewrite the SVG code
+def _component_stage(doc: SVGDocument, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = get_svg_component(**params)
+    if "error" in result:
+        return {"success": False, "error": result["error"]}
+    doc.text = result["svg_code"]
+    return {"success": True}
+
+
+def _animation_stage(doc: SVGDocument, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = generate_svg_animation(**params)
+    doc.text = result["svg_code"]
+    return {"success": True, "duration": result["duration"]}
+
+
+def _transform_stage(doc: SVGDocument, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = transform_svg_tree(doc.root, params.get("selector", ""), params.get("transform", {}))
+    if result["success"]:
+        doc.tree_modified()
+        return {"success": True, "matched_elements": result["matched_elements"]}
+    return result
+
+
+def _recolor_stage(doc: SVGDocument, params: Dict[str, Any]) -> Dict[str, Any]:
+    color_map = SVGColorMap(doc.root)
+    mapping = params.get("mapping") or color_map.palette_mapping(
+        params.get("palette", "default"), params.get("source_palette"))
+    replacements = color_map.apply(mapping)
+    if replacements:
+        doc.tree_modified()
+    return {"success": True, "replacements": replacements}
+
+
+def _interactivity_stage(doc: SVGDocument, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = add_svg_interactivity(doc.text, **params)
+    if not result["success"]:
+        return {"success": False, "error": result["error"]}
+    doc.text = result["svg_code"]
+    return {"success": True, "events_added": result["events_added"]}
+
+
+def _optimize_stage(doc: SVGDocument, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = optimize_svg(doc.text, **params)
+    if "error" in result:
+        return {"success": False, "error": result["error"]}
+    doc.text = result["optimized_svg"]
+    return {"success": True, "stats": result["stats"]}
+
+
+# Registered stages: name -> (kind, runner)
+PIPELINE_STAGES: Dict[str, Tuple[str, Callable[[SVGDocument, Dict[str, Any]], Dict[str, Any]]]] = {
+    "component": ("source", _component_stage),
+    "animation": ("source", _animation_stage),
+    "transform": ("tree", _transform_stage),
+    "recolor": ("tree", _recolor_stage),
+    "interactivity": ("text", _interactivity_stage),
+    "optimize": ("text", _optimize_stage),
+}
+
+
+def register_pipeline_stage(name: str, kind: str,
+                            runner: Callable[[SVGDocument, Dict[str, Any]], Dict[str, Any]]) -> None:
+    """
+    Register a custom pipeline stage.
+
+    Args:
+        name: Name used in stage definitions
+        kind: 'source', 'tree' or 'text' (which representation the stage works on)
+        runner: Function taking (document, params) and returning a result
+            dictionary with at least a 'success' key
+    """
+    if kind not in ("source", "tree", "text"):
+        raise ValueError(f"Invalid stage kind: {kind}")
+    PIPELINE_STAGES[name] = (kind, runner)
+
+
+def _digest(*parts: Any) -> str:
+    """Stable digest of stage definitions and inputs."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class SVGPipeline:
+    """Declarative chain of SVG-MCP stages run over a shared document."""
+
+    def __init__(self, stages: List[Dict[str, Any]], cache: Optional[PipelineCache] = None):
+        """
+        Create a pipeline.
+
+        Args:
+            stages: List of stage definitions, each a dictionary with a 'stage'
+                name (see PIPELINE_STAGES) and optional 'params' passed to the
+                underlying function
+            cache: Cache of stage outputs, shareable between pipelines
+        """
+        self.stages = stages
+        self.cache = cache if cache is not None else PipelineCache()
+
+    def _stage_keys(self, svg_code: Optional[str]) -> List[str]:
+        """Cache key of each stage output: a digest of the input and every stage so far."""
+        keys = []
+        key = _digest("input", svg_code or "")
+        for stage in self.stages:
+            if PIPELINE_STAGES[stage["stage"]][0] == "source":
+                key = _digest("source")
+            key = _digest(key, stage["stage"], stage.get("params", {}))
+            keys.append(key)
+        return keys
+
+    def run(self, svg_code: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run the pipeline.
+
+        Args:
+            svg_code: Input SVG code (optional when the first stage is a source)
+
+        Returns:
+            Dictionary containing the resulting SVG, per-stage reports and timing
+        """
+        run_start = time.perf_counter()
+
+        for stage in self.stages:
+            if stage.get("stage") not in PIPELINE_STAGES:
+                return {
+                    "success": False,
+                    "error": f"Unknown pipeline stage: {stage.get('stage')}. "
+                             f"Valid stages: {', '.join(PIPELINE_STAGES)}",
+                    "svg_code": svg_code
+                }
+
+        keys = self._stage_keys(svg_code)
+        hits_before = self.cache.hits
+
+        # Resume after the last stage whose output is cached; the probes count as one lookup
+        doc = SVGDocument(svg_code)
+        start_index = 0
+        for index in range(len(self.stages) - 1, -1, -1):
+            cached = self.cache.get(keys[index], record=False)
+            if cached is not None:
+                doc = SVGDocument(cached)
+                start_index = index + 1
+                break
+        if self.stages:
+            self.cache.record(start_index > 0)
+
+        reports = [{"stage": stage["stage"], "cached": True, "time_ms": 0.0}
+                   for stage in self.stages[:start_index]]
+
+        for index in range(start_index, len(self.stages)):
+            stage = self.stages[index]
+            kind, runner = PIPELINE_STAGES[stage["stage"]]
+
+            # The previous output gets serialized for this stage anyway, so cache it
+            if kind == "text" and index > 0 and not doc.has_text:
+                self.cache.put(keys[index - 1], doc.text)
+
+            stage_start = time.perf_counter()
+            try:
+                details = runner(doc, stage.get("params", {}))
+            except Exception as e:
+                details = {"success": False, "error": f"{type(e).__name__}: {str(e)}"}
+            elapsed = (time.perf_counter() - stage_start) * 1000
+            if metrics_enabled():
+                REGISTRY.observe("pipeline_stage", elapsed / 1000, stage=stage["stage"])
+
+            if not details.pop("success", True):
+                return {
+                    "success": False,
+                    "error": f"Stage '{stage['stage']}' failed: {details.get('error', '')}",
+                    "failed_stage": index,
+                    "svg_code": svg_code,
+                    "stages": reports
+                }
+
+            if kind != "tree":
+                self.cache.put(keys[index], doc.text)
+
+            reports.append({
+                "stage": stage["stage"],
+                "cached": False,
+                "time_ms": round(elapsed, 3),
+                "details": details
+            })
+
+        output = doc.text
+        if keys and start_index < len(self.stages):
+            self.cache.put(keys[-1], output)
+
+        return {
+            "success": True,
+            "svg_code": output,
+            "stages": reports,
+            "timing": {
+                "total_ms": round((time.perf_counter() - run_start) * 1000, 3),
+                "parse_ms": round(doc.parse_ms, 3),
+                "serialize_ms": round(doc.serialize_ms, 3)
+            },
+            "cache_hits": self.cache.hits - hits_before
+        }
+
+
+def run_pipeline(stages: List[Dict[str, Any]], svg_code: Optional[str] = None,
+                 cache: Optional[PipelineCache] = None) -> Dict[str, Any]:
+    """
+    Run a list of stages once.
+
+    Args:
+        stages: Stage definitions (see SVGPipeline)
+        svg_code: Input SVG code (optional when the first stage is a source)
+        cache: Optional shared cache of stage outputs
+
+    Returns:
+        Dictionary containing the resulting SVG, per-stage reports and timing
+    """
+    return SVGPipeline(stages, cache).run(svg_code)
@@ -0,0 +1,376 @@
+"""
+SVG Recoloring Module for SVG-MCP.
+
+This module recolors existing SVG documents to a color palette. A document is
+parsed once into a map of every color usage (paint attributes, inline styles,
+<style> sheets and SMIL animation values), which can then be remapped to any
+number of palettes without re-parsing.
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple, Union
+import xml.etree.ElementTree as ET
+
+from svg_components import COLOR_PALETTES
+from svg_metrics import instrumented, timed
+
+ET.register_namespace("", "http://www.w3.org/2000/svg")
+ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+
+# Attributes and CSS properties holding a color
+COLOR_PROPERTIES = ["fill", "stroke", "stop-color", "flood-color", "lighting-color", "color"]
+
+# SMIL attributes holding animated values
+ANIMATION_VALUE_ATTRIBUTES = ["values", "from", "to", "by"]
+
+# Palette roles in the order they are assigned to source colors
+PALETTE_ROLES = ["primary", "secondary", "accent", "neutral"]
+
+NAMED_COLORS = {
+    "black": "#000000", "white": "#ffffff", "red": "#ff0000", "green": "#008000",
+    "blue": "#0000ff", "yellow": "#ffff00", "cyan": "#00ffff", "aqua": "#00ffff",
+    "magenta": "#ff00ff", "fuchsia": "#ff00ff", "gray": "#808080", "grey": "#808080",
+    "silver": "#c0c0c0", "maroon": "#800000", "olive": "#808000", "lime": "#00ff00",
+    "teal": "#008080", "navy": "#000080", "purple": "#800080", "orange": "#ffa500",
+    "pink": "#ffc0cb", "brown": "#a52a2a", "gold": "#ffd700", "indigo": "#4b0082",
+    "violet": "#ee82ee", "crimson": "#dc143c", "coral": "#ff7f50", "salmon": "#fa8072",
+    "khaki": "#f0e68c", "lavender": "#e6e6fa", "turquoise": "#40e0d0", "tan": "#d2b48c",
+    "beige": "#f5f5dc", "ivory": "#fffff0", "darkgray": "#a9a9a9", "darkgrey": "#a9a9a9",
+    "lightgray": "#d3d3d3", "lightgrey": "#d3d3d3", "darkblue": "#00008b",
+    "darkgreen": "#006400", "darkred": "#8b0000", "lightblue": "#add8e6",
+    "lightgreen": "#90ee90", "steelblue": "#4682b4", "slategray": "#708090",
+    "skyblue": "#87ceeb", "tomato": "#ff6347", "orchid": "#da70d6", "plum": "#dda0dd",
+}
+
+# Color tokens inside a value: hex, rgb()/rgba() or a bare word (checked against
+# NAMED_COLORS). url() references are matched first so ids like "#fade" are skipped.
+COLOR_TOKEN_PATTERN = re.compile(r'url\([^)]*\)|#[0-9a-fA-F]{3,8}\b|rgba?\([^)]*\)|\b[a-zA-Z]+\b')
+
+# Color declarations inside inline styles and style sheets
+COLOR_DECLARATION_PATTERN = re.compile(
+    r'((?:^|[;{\s])(?:' + '|'.join(COLOR_PROPERTIES) + r')\s*:\s*)([^;}]+)')
+
+# Channels of an rgb()/rgba() color, with an optional percent sign
+COLOR_CHANNEL_PATTERN = re.compile(r'(-?(?:\d+\.?\d*|\.\d+))(%?)')
+
+
+def normalize_color(value: str) -> Optional[str]:
+    """
+    Normalize a CSS color to lowercase '#rrggbb', or '#rrggbbaa' when it is
+    not opaque.
+
+    Args:
+        value: Color value (hex, rgb()/rgba() or a named color)
+
+    Returns:
+        The normalized color, or None if the value is not a plain color
+    """
+    value = value.strip().lower()
+    if not value:
+        return None
+
+    if value.startswith("#"):
+        digits = value[1:]
+        if len(digits) in (3, 4) and all(c in "0123456789abcdef" for c in digits):
+            digits = "".join(c * 2 for c in digits)
+        if len(digits) in (6, 8) and all(c in "0123456789abcdef" for c in digits):
+            return "#" + (digits if digits[6:] != "ff" else digits[:6])
+        return None
+
+    if value.startswith("rgb"):
+        channels = COLOR_CHANNEL_PATTERN.findall(value)
+        if len(channels) not in (3, 4):
+            return None
+        rgb = []
+        for number, percent in channels[:3]:
+            channel = float(number) * 2.55 if percent else float(number)
+            rgb.append(max(0, min(255, int(round(channel)))))
+        color = "#{:02x}{:02x}{:02x}".format(*rgb)
+        alpha = _alpha(channels)
+        return color + "{:02x}".format(int(round(alpha * 255))) if alpha < 1 else color
+
+    return NAMED_COLORS.get(value)
+
+
+def _alpha(channels: List[Tuple[str, str]]) -> float:
+    """Opacity of parsed rgb()/rgba() channels, between 0 and 1."""
+    if len(channels) < 4:
+        return 1.0
+    number, percent = channels[3]
+    return max(0.0, min(1.0, float(number) / 100 if percent else float(number)))
+
+
+def _with_alpha(target: str, token: str, color: str) -> str:
+    """
+    Carry the opacity of a translucent source color over to its replacement.
+
+    Args:
+        target: Replacement color
+        token: Source color as written in the document
+        color: Normalized source color ('#rrggbbaa')
+
+    Returns:
+        The replacement with the source opacity, in the source's notation; a
+        replacement that is not a plain opaque color is returned unchanged
+    """
+    opaque = normalize_color(target)
+    if opaque is None or len(opaque) != 7:
+        return target
+    if token.startswith("#"):
+        return opaque + color[7:]
+    alpha = _alpha(COLOR_CHANNEL_PATTERN.findall(token))
+    r, g, b = (int(opaque[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({r}, {g}, {b}, {format(round(alpha, 4), 'g')})"
+
+
+def _color_distance(a: str, b: str) -> int:
+    """Squared RGB distance between two normalized colors (opacity is ignored)."""
+    return sum((int(a[i:i + 2], 16) - int(b[i:i + 2], 16)) ** 2 for i in (1, 3, 5))
+
+
+def _resolve_palette(palette: Union[str, Dict[str, str]]) -> Dict[str, str]:
+    """Get a palette by name or pass a palette dictionary through."""
+    if isinstance(palette, dict):
+        return palette
+    return COLOR_PALETTES.get(palette, COLOR_PALETTES["default"])
+
+
+class SVGColorMap:
+    """Parsed SVG document with an index of every color usage."""
+
+    def __init__(self, svg_code: Union[str, ET.Element]):
+        """
+        Parse an SVG document and collect its color usages.
+
+        Args:
+            svg_code: The SVG code to index, or an already parsed root element
+        """
+        if isinstance(svg_code, ET.Element):
+            self.root = svg_code
+        else:
+            with timed("parse", module="svg_recolor"):
+                self.root = ET.fromstring(svg_code)
+        # Each usage is (element, attribute name or None for text, original value)
+        self.usages: List[Tuple[ET.Element, Optional[str], str]] = []
+        self.colors: Dict[str, int] = {}
+        self._index()
+
+    def _count_tokens(self, value: str) -> bool:
+        """Count the colors in a value; returns whether any were found."""
+        found = False
+        for token in COLOR_TOKEN_PATTERN.findall(value):
+            color = normalize_color(token)
+            if color:
+                # Translucent colors count towards their opaque color
+                self.colors[color[:7]] = self.colors.get(color[:7], 0) + 1
+                found = True
+        return found
+
+    def _count_declarations(self, value: str) -> bool:
+        """Count the colors in CSS color declarations; returns whether any were found."""
+        found = False
+        for match in COLOR_DECLARATION_PATTERN.finditer(value):
+            found = self._count_tokens(match.group(2)) or found
+        return found
+
+    def _index(self) -> None:
+        for elem in self.root.iter():
+            tag = elem.tag.split("}")[-1]
+
+            for attr in COLOR_PROPERTIES:
+                value = elem.get(attr)
+                if value and self._count_tokens(value):
+                    self.usages.append((elem, attr, value))
+
+            style = elem.get("style")
+            if style and self._count_declarations(style):
+                self.usages.append((elem, "style", style))
+
+            if tag in ("animate", "set") and elem.get("attributeName") in COLOR_PROPERTIES:
+                for attr in ANIMATION_VALUE_ATTRIBUTES:
+                    value = elem.get(attr)
+                    if value and self._count_tokens(value):
+                        self.usages.append((elem, attr, value))
+
+            if tag == "style" and elem.text and self._count_declarations(elem.text):
+                self.usages.append((elem, None, elem.text))
+
+    def palette_mapping(self, palette: Union[str, Dict[str, str]],
+                        source_palette: Optional[Union[str, Dict[str, str]]] = None) -> Dict[str, str]:
+        """
+        Build a color mapping from the document's colors to a palette.
+
+        With a source palette, each source role maps to the same role in the
+        target palette. Otherwise the most used colors take the roles in order
+        (primary, secondary, accent, neutral) and any remaining color maps to
+        the role of its nearest ranked color.
+
+        Args:
+            palette: Target palette name or dictionary
+            source_palette: Palette the document was generated with, if known
+
+        Returns:
+            Dictionary mapping normalized source colors to target colors
+        """
+        target = _resolve_palette(palette)
+
+        if source_palette is not None:
+            source = _resolve_palette(source_palette)
+            mapping = {}
+            for role, color in source.items():
+                normalized = normalize_color(color)
+                if normalized and role in target:
+                    mapping[normalized] = target[role]
+            return mapping
+
+        ranked = sorted(self.colors, key=lambda c: (-self.colors[c], c))
+        roles = [role for role in PALETTE_ROLES if role in target]
+        anchors = dict(zip(ranked, roles))
+
+        mapping = {color: target[role] for color, role in anchors.items()}
+        if not anchors:
+            return mapping
+        for color in ranked[len(anchors):]:
+            nearest = min(anchors, key=lambda anchor: _color_distance(color, anchor))
+            mapping[color] = mapping[nearest]
+        return mapping
+
+    def apply(self, mapping: Dict[str, str]) -> int:
+        """
+        Apply a color mapping to every usage of the parsed tree in a single pass.
+
+        Usages are rewritten from their original values, so the mapping can be
+        applied again later with another palette. A translucent color without
+        its own entry uses the entry of its opaque color and keeps its opacity.
+
+        Args:
+            mapping: Dictionary mapping source colors to target colors
+
+        Returns:
+            Number of replaced colors
+        """
+        normalized_mapping = {}
+        for source, target in mapping.items():
+            normalized = normalize_color(source)
+            if normalized:
+                normalized_mapping[normalized] = target
+
+        replacements = 0
+
+        def replace_token(match):
+            nonlocal replacements
+            token = match.group(0)
+            color = normalize_color(token)
+            if color is None:
+                return token
+            if color in normalized_mapping:
+                replacements += 1
+                return normalized_mapping[color]
+            if color[:7] in normalized_mapping:
+                replacements += 1
+                return _with_alpha(normalized_mapping[color[:7]], token, color)
+            return token
+
+        def replace_declaration(match):
+            return match.group(1) + COLOR_TOKEN_PATTERN.sub(replace_token, match.group(2))
+
+        for elem, attr, original in self.usages:
+            if attr is None:
+                elem.text = COLOR_DECLARATION_PATTERN.sub(replace_declaration, original)
+            elif attr == "style":
+                elem.set(attr, COLOR_DECLARATION_PATTERN.sub(replace_declaration, original))
+            else:
+                elem.set(attr, COLOR_TOKEN_PATTERN.sub(replace_token, original))
+
+        return replacements
+
+    def recolor(self, mapping: Dict[str, str]) -> Tuple[str, int]:
+        """
+        Apply a color mapping to every usage in a single pass.
+
+        The document keeps its original colors between calls, so the same map
+        can be recolored to several palettes.
+
+        Args:
+            mapping: Dictionary mapping source colors to target colors
+
+        Returns:
+            Tuple containing (recolored SVG code, number of replaced colors)
+        """
+        replacements = self.apply(mapping)
+        with timed("serialize", module="svg_recolor"):
+            return ET.tostring(self.root, encoding='unicode'), replacements
+
+
+@instrumented
+def recolor_svg(svg_code: str, palette: Union[str, Dict[str, str]] = "default",
+                source_palette: Optional[Union[str, Dict[str, str]]] = None,
+                mapping: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Recolor an SVG document to a palette.
+
+    Args:
+        svg_code: The SVG code to recolor
+        palette: Target palette name (see COLOR_PALETTES) or palette dictionary
+        source_palette: Palette the document was generated with, for role-to-role mapping
+        mapping: Explicit mapping of source colors to target colors (overrides palettes)
+
+    Returns:
+        Dictionary containing the recolored SVG and the applied color mapping
+    """
+    try:
+        color_map = SVGColorMap(svg_code)
+    except ET.ParseError as e:
+        return {
+            "success": False,
+            "error": f"Error parsing SVG: {str(e)}",
+            "svg_code": svg_code
+        }
+
+    if mapping is None:
+        mapping = color_map.palette_mapping(palette, source_palette)
+
+    recolored, replacements = color_map.recolor(mapping)
+
+    return {
+        "success": True,
+        "svg_code": recolored,
+        "source_colors": color_map.colors,
+        "color_mapping": mapping,
+        "replacements": replacements
+    }
+
+
+def _recolor_job(args: Tuple[str, Any, Any, Any]) -> Dict[str, Any]:
+    svg_code, palette, source_palette, mapping = args
+    return recolor_svg(svg_code, palette, source_palette, mapping)
+
+
+def recolor_svg_batch(svg_codes: List[str], palette: Union[str, Dict[str, str]] = "default",
+                      source_palette: Optional[Union[str, Dict[str, str]]] = None,
+                      mapping: Optional[Dict[str, str]] = None,
+                      workers: Optional[int] = None,
+                      use_processes: bool = True) -> List[Dict[str, Any]]:
+    """
+    Recolor many SVG documents to the same palette in parallel.
+
+    Args:
+        svg_codes: The SVG documents to recolor
+        palette: Target palette name or dictionary
+        source_palette: Palette the documents were generated with, if known
+        mapping: Explicit color mapping applied to every document
+        workers: Number of parallel workers (defaults to the CPU count)
+        use_processes: Use a process pool instead of threads
+
+    Returns:
+        List of recolor_svg results, in input order
+    """
+    jobs = [(svg_code, palette, source_palette, mapping) for svg_code in svg_codes]
+    if len(jobs) <= 1:
+        return [_recolor_job(job) for job in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        chunksize = max(1, len(jobs) // ((workers or 4) * 4))
+        return list(executor.map(_recolor_job, jobs, chunksize=chunksize))
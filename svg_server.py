@@ -0,0 +1,431 @@
+"""
+SVG Server Module for SVG-MCP.
+
+This module serves the SVG-MCP tools over JSON-RPC 2.0, either on stdio
+(newline-delimited messages, as MCP clients launch it) or over HTTP (one
+message or batch per POST). It speaks the MCP tool methods (initialize,
+tools/list, tools/call) and also accepts the tool names as plain JSON-RPC
+methods.
+
+Tool calls run on an AsyncSVGExecutor worker pool. Identical calls that arrive
+while one is running are coalesced onto it, and successful results are kept in
+a shared cache, so concurrent clients asking for the same output do the work once.
+
+Usage:
+    python svg_server.py                      # stdio
+    python svg_server.py --http 8765 --workers 4 --processes
+"""
+
+import sys
+import json
+import asyncio
+import inspect
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Union
+
+from svg_animation import generate_svg_animation
+from svg_async import AsyncSVGExecutor, SVGServiceBusy
+from svg_components import get_svg_component
+from svg_equivalence import compare_svg
+from svg_geometry import hit_test_svg
+from svg_interactivity import INTERACTIVITY_MODES, add_svg_interactivity
+from svg_manipulation import transform_svg_element
+from svg_optimization import optimize_svg
+from svg_pipeline import PipelineCache, _digest
+
+SERVER_NAME = "svg-mcp"
+SERVER_VERSION = "1.0.0"
+PROTOCOL_VERSION = "2025-06-18"
+
+# JSON-RPC error codes (the last two are server-defined)
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_BUSY = -32000
+REQUEST_TIMEOUT = -32001
+
+TOOLS = {
+    "optimize_svg": {
+        "function": optimize_svg,
+        "description": "Optimize SVG code by removing unnecessary elements and attributes.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "svg_code": {"type": "string"},
+                "level": {"type": "string", "enum": ["light", "standard", "aggressive"]},
+                "rules": {"type": "array"},
+                "detailed": {"type": "boolean"},
+                "optimize_for": {"type": "string", "enum": ["raw", "gzip", "brotli"]},
+                "compression_stats": {"type": "boolean"}
+            },
+            "required": ["svg_code"]
+        }
+    },
+    "transform_svg_element": {
+        "function": transform_svg_element,
+        "description": "Transform SVG elements that match a selector.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "svg_code": {"type": "string"},
+                "selector": {"type": "string"},
+                "transform": {"type": "object"},
+                "return_patch": {"type": "boolean"}
+            },
+            "required": ["svg_code", "selector", "transform"]
+        }
+    },
+    "generate_svg_animation": {
+        "function": generate_svg_animation,
+        "description": "Generate an SVG animation based on a prompt.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "prompt": {"type": "string"},
+                "duration": {"type": "integer"},
+                "animation_type": {"type": "string"}
+            },
+            "required": ["prompt"]
+        }
+    },
+    "get_svg_component": {
+        "function": get_svg_component,
+        "description": "Get a predefined SVG component.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "component_type": {"type": "string"},
+                "variant": {"type": "string"},
+                "size": {"type": "integer"},
+                "color": {"type": "string"},
+                "palette": {"type": "string"}
+            },
+            "required": ["component_type", "variant"]
+        }
+    },
+    "add_svg_interactivity": {
+        "function": add_svg_interactivity,
+        "description": "Add interactivity to SVG elements that match a selector.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "svg_code": {"type": "string"},
+                "interaction_type": {"type": "string"},
+                "selector": {"type": "string"},
+                "configuration": {"type": "object"},
+                "mode": {"type": "string", "enum": list(INTERACTIVITY_MODES)},
+                "batch_updates": {"type": "boolean"},
+                "minify": {"type": "boolean"},
+                "size_budget": {"type": "integer"},
+                "return_patch": {"type": "boolean"}
+            },
+            "required": ["svg_code", "interaction_type", "selector", "configuration"]
+        }
+    },
+    "hit_test_svg": {
+        "function": hit_test_svg,
+        "description": "Find the SVG elements painted at a point (topmost first), for server-side click handling.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "svg_code": {"type": "string"},
+                "x": {"type": "number"},
+                "y": {"type": "number"},
+                "tolerance": {"type": "number"}
+            },
+            "required": ["svg_code", "x", "y"]
+        }
+    },
+    "compare_svg": {
+        "function": compare_svg,
+        "description": "Check that an optimized SVG renders like the original, without rasterizing.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "original_svg": {"type": "string"},
+                "optimized_svg": {"type": "string"},
+                "tolerance": {"type": "number"},
+                "max_differences": {"type": "integer"}
+            },
+            "required": ["original_svg", "optimized_svg"]
+        }
+    }
+}
+
+
+class JSONRPCError(Exception):
+    """Error returned to the client as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _tool_failed(result: Any) -> bool:
+    return not isinstance(result, dict) or "error" in result or result.get("success") is False
+
+
+class SVGToolServer:
+    """Transport-independent JSON-RPC handler for the SVG-MCP tools."""
+
+    def __init__(self, executor: Optional[AsyncSVGExecutor] = None,
+                 cache: Optional[PipelineCache] = None, timeout: Optional[float] = None):
+        """
+        Create a server.
+
+        Args:
+            executor: Worker pool for tool calls (a thread pool by default)
+            cache: Shared result cache (256 entries by default)
+            timeout: Per-call timeout in seconds
+        """
+        self.executor = executor or AsyncSVGExecutor()
+        self.cache = cache if cache is not None else PipelineCache(name="server")
+        self.timeout = timeout
+        self._in_flight: Dict[str, "asyncio.Future"] = {}
+        self.stats = {"requests": 0, "tool_calls": 0, "executed": 0, "cache_hits": 0, "coalesced": 0}
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Call a tool, reusing a cached result or an identical call in flight.
+
+        Raises:
+            JSONRPCError: If the tool or its arguments are invalid
+            SVGServiceBusy: If the worker pool queue is full
+            asyncio.TimeoutError: If the call did not finish in time
+        """
+        tool = TOOLS.get(name)
+        if tool is None:
+            raise JSONRPCError(INVALID_PARAMS, f"Unknown tool: '{name}'")
+        if not isinstance(arguments, dict):
+            raise JSONRPCError(INVALID_PARAMS, "Tool arguments must be an object")
+        try:
+            inspect.signature(tool["function"]).bind(**arguments)
+        except TypeError as e:
+            raise JSONRPCError(INVALID_PARAMS, f"Invalid arguments for '{name}': {e}")
+
+        self.stats["tool_calls"] += 1
+        key = _digest(name, arguments)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(key, tool["function"], arguments))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        # Shielded so one caller going away does not cancel the work for the others
+        return await asyncio.shield(task)
+
+    async def _execute(self, key: str, function: Any, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["executed"] += 1
+        result = await self.executor.run(function, timeout=self.timeout, **arguments)
+        if not _tool_failed(result):
+            self.cache.put(key, result)
+        return result
+
+    async def _dispatch(self, method: str, params: Any) -> Any:
+        if method == "initialize":
+            requested = params.get("protocolVersion") if isinstance(params, dict) else None
+            return {
+                "protocolVersion": requested or PROTOCOL_VERSION,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION}
+            }
+        if method == "ping":
+            return {}
+        if method == "tools/list":
+            return {
+                "tools": [
+                    {"name": name, "description": tool["description"], "inputSchema": tool["inputSchema"]}
+                    for name, tool in TOOLS.items()
+                ]
+            }
+        if method == "tools/call":
+            if not isinstance(params, dict) or "name" not in params:
+                raise JSONRPCError(INVALID_PARAMS, "tools/call needs a tool 'name'")
+            result = await self.call_tool(params["name"], params.get("arguments") or {})
+            return {
+                "content": [{"type": "text", "text": json.dumps(result)}],
+                "structuredContent": result,
+                "isError": _tool_failed(result)
+            }
+        if method == "server/stats":
+            return self.get_stats()
+        if method in TOOLS:
+            return await self.call_tool(method, params if params is not None else {})
+        raise JSONRPCError(METHOD_NOT_FOUND, f"Method not found: '{method}'")
+
+    async def handle_message(self, message: Any) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Handle a decoded JSON-RPC message or batch.
+
+        Returns:
+            The response (None for notifications and all-notification batches)
+        """
+        if isinstance(message, list):
+            if not message:
+                return _error_response(None, INVALID_REQUEST, "Empty batch")
+            responses = await asyncio.gather(*(self.handle_message(m) for m in message))
+            return [r for r in responses if r is not None] or None
+
+        if (not isinstance(message, dict) or message.get("jsonrpc") != "2.0"
+                or not isinstance(message.get("method"), str)):
+            return _error_response(message.get("id") if isinstance(message, dict) else None,
+                                   INVALID_REQUEST, "Invalid JSON-RPC request")
+
+        self.stats["requests"] += 1
+        request_id = message.get("id")
+        is_notification = "id" not in message
+        try:
+            result = await self._dispatch(message["method"], message.get("params"))
+        except JSONRPCError as e:
+            response = _error_response(request_id, e.code, e.message)
+        except SVGServiceBusy as e:
+            response = _error_response(request_id, SERVER_BUSY, str(e))
+        except asyncio.TimeoutError:
+            response = _error_response(request_id, REQUEST_TIMEOUT, "Request timed out")
+        except Exception as e:
+            response = _error_response(request_id, INTERNAL_ERROR, f"Internal error: {e}")
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return None if is_notification else response
+
+    async def handle_text(self, text: Union[str, bytes]) -> Optional[str]:
+        """Handle a raw JSON-RPC payload, returning the encoded response (if any)."""
+        try:
+            message = json.loads(text)
+        except ValueError as e:
+            return json.dumps(_error_response(None, PARSE_ERROR, f"Parse error: {e}"))
+        response = await self.handle_message(message)
+        return json.dumps(response) if response is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counters, cache state and worker pool load."""
+        return {
+            **self.stats,
+            "cache_entries": len(self.cache),
+            "in_flight_calls": len(self._in_flight),
+            "pool_in_flight": self.executor.in_flight,
+            "pool_queued": self.executor.queued
+        }
+
+
+def _error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+async def serve_stdio(server: SVGToolServer, stdin=None, stdout=None) -> None:
+    """
+    Serve newline-delimited JSON-RPC messages until stdin closes.
+
+    Messages are handled concurrently, so responses may arrive out of order.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    async def respond(line: str) -> None:
+        response = await server.handle_text(line)
+        if response is not None:
+            stdout.write(response + "\n")
+            stdout.flush()
+
+    while True:
+        line = await loop.run_in_executor(None, stdin.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.ensure_future(respond(line))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+
+def make_http_server(server: SVGToolServer, host: str = "127.0.0.1", port: int = 8765):
+    """
+    Create an HTTP server handing POSTed JSON-RPC payloads to `server`.
+
+    Requests are handled on an event loop running in a background thread, so
+    identical concurrent requests are coalesced just as on stdio. GET returns
+    the server stats.
+
+    Returns:
+        (http_server, loop); call http_server.serve_forever() to start serving
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="svg-mcp-loop", daemon=True).start()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Optional[str] = None) -> None:
+            payload = body.encode("utf-8") if body is not None else b""
+            self.send_response(status)
+            if body is not None:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            response = asyncio.run_coroutine_threadsafe(server.handle_text(body), loop).result()
+            # Notifications get an empty "accepted" response
+            self._send(200 if response is not None else 202, response)
+
+        def do_GET(self):
+            self._send(200, json.dumps(server.get_stats()))
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler), loop
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the SVG-MCP tools over JSON-RPC")
+    parser.add_argument("--http", type=int, metavar="PORT", help="Serve HTTP on this port instead of stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, help="Worker pool size")
+    parser.add_argument("--processes", action="store_true", help="Use a process pool")
+    parser.add_argument("--max-queue", type=int, default=100, help="Calls allowed to wait for a worker")
+    parser.add_argument("--cache-size", type=int, default=256, help="Result cache entries")
+    parser.add_argument("--timeout", type=float, help="Per-call timeout in seconds")
+    args = parser.parse_args(argv)
+
+    executor = AsyncSVGExecutor(max_workers=args.workers, use_processes=args.processes,
+                                max_queue=args.max_queue)
+    server = SVGToolServer(executor, PipelineCache(args.cache_size, name="server"), args.timeout)
+
+    try:
+        if args.http is not None:
+            http_server, loop = make_http_server(server, args.host, args.http)
+            print(f"Serving SVG-MCP on http://{args.host}:{args.http}", file=sys.stderr)
+            try:
+                http_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                http_server.server_close()
+                loop.call_soon_threadsafe(loop.stop)
+        else:
+            asyncio.run(serve_stdio(server))
+    finally:
+        executor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+SVG Sprite Sheet Module for SVG-MCP.
+
+This module packs SVG components (icons, loaders, backgrounds) into a single
+sprite sheet of <symbol> definitions. Clients fetch the sheet once and reference
+each component with <use href="#id">.
+"""
+
+import re
+import hashlib
+from typing import Dict, Any, List, Optional, Set
+import xml.etree.ElementTree as ET
+
+from svg_components import get_svg_component
+from svg_metrics import instrumented, timed
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# Root attributes that only make sense on a standalone document
+STANDALONE_ATTRIBUTES = {"width", "height", "x", "y", "version"}
+
+
+def _symbol_id(prefix: str, name: str, taken: Optional[Set[str]] = None) -> str:
+    """
+    Build a stable, XML-safe symbol id from a component name.
+
+    Names that slugify to an id in `taken` (such as 'icon home' and
+    'icon-home') get a numeric suffix, so the first one keeps the plain id.
+    """
+    slug = re.sub(r'[^a-zA-Z0-9\-_]+', '-', name).strip('-').lower()
+    symbol_id = f"{prefix}-{slug}" if prefix else slug
+    if taken:
+        base, suffix = symbol_id, 2
+        while symbol_id in taken:
+            symbol_id = f"{base}-{suffix}"
+            suffix += 1
+    return symbol_id
+
+
+def _component_name(spec: Dict[str, Any]) -> str:
+    """Default name for a component spec: '<component_type>-<variant>'."""
+    return spec.get("name") or f"{spec.get('component_type', '')}-{spec.get('variant', '')}"
+
+
+def _generation_params(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Parameters forwarded to get_svg_component for a sprite spec."""
+    return {key: value for key, value in spec.items() if key != "name"}
+
+
+def _namespace_internal_ids(symbol: ET.Element, symbol_id: str) -> None:
+    """Prefix ids inside a symbol so several components can share one document."""
+    renamed = {}
+    for elem in symbol.iter():
+        if elem is symbol:
+            continue
+        elem_id = elem.get("id")
+        if elem_id:
+            renamed[elem_id] = f"{symbol_id}-{elem_id}"
+            elem.set("id", renamed[elem_id])
+
+    if not renamed:
+        return
+
+    def replace_reference(match):
+        return f"url(#{renamed.get(match.group(1), match.group(1))})"
+
+    for elem in symbol.iter():
+        for name, value in list(elem.attrib.items()):
+            if "url(#" in value:
+                elem.set(name, re.sub(r'url\(#([^)]+)\)', replace_reference, value))
+            elif name in ("href", f"{{{XLINK_NS}}}href") and value.startswith("#"):
+                elem.set(name, f"#{renamed.get(value[1:], value[1:])}")
+
+
+def component_to_symbol(svg_code: str, symbol_id: str) -> ET.Element:
+    """
+    Convert a standalone SVG document into a <symbol> element.
+
+    Args:
+        svg_code: The SVG code of the component
+        symbol_id: The id to assign to the symbol
+
+    Returns:
+        The <symbol> element holding the component's content
+    """
+    with timed("parse", module="svg_sprites"):
+        root = ET.fromstring(svg_code)
+    symbol = ET.Element(f"{{{SVG_NS}}}symbol")
+    symbol.set("id", symbol_id)
+
+    # Keep viewBox and inheritable presentation attributes from the root
+    for name, value in root.attrib.items():
+        if name not in STANDALONE_ATTRIBUTES:
+            symbol.set(name, value)
+
+    for child in list(root):
+        symbol.append(child)
+
+    _namespace_internal_ids(symbol, symbol_id)
+    return symbol
+
+
+@instrumented
+def build_sprite_sheet(components: List[Dict[str, Any]], id_prefix: str = "svg") -> Dict[str, Any]:
+    """
+    Pack several SVG components into a single sprite sheet.
+
+    Args:
+        components: List of component specs. Each spec takes the parameters of
+            get_svg_component ('component_type', 'variant', 'size', 'color',
+            'palette', ...) plus an optional 'name' used as the manifest key
+            (defaults to '<component_type>-<variant>')
+        id_prefix: Prefix applied to every symbol id
+
+    Returns:
+        Dictionary containing the sprite sheet SVG, a manifest mapping names to
+        symbol ids and a content hash suitable for cache busting
+    """
+    if not components:
+        return {
+            "success": False,
+            "error": "No components provided for the sprite sheet",
+            "svg_code": ""
+        }
+
+    sheet = ET.Element(f"{{{SVG_NS}}}svg")
+    sheet.set("style", "display:none")
+
+    manifest = {}
+    seen_params = {}
+    symbol_ids: Set[str] = set()
+
+    for spec in components:
+        name = _component_name(spec)
+        params = _generation_params(spec)
+
+        # Identical specs are packed once; conflicting specs under one name are an error
+        if name in seen_params:
+            if seen_params[name] == params:
+                continue
+            return {
+                "success": False,
+                "error": f"Duplicate component name with different parameters: '{name}'",
+                "svg_code": ""
+            }
+        seen_params[name] = params
+
+        component = get_svg_component(**params)
+        if "error" in component:
+            return {
+                "success": False,
+                "error": f"Cannot build component '{name}': {component['error']}",
+                "svg_code": ""
+            }
+
+        symbol_id = _symbol_id(id_prefix, name, symbol_ids)
+        symbol_ids.add(symbol_id)
+        try:
+            symbol = component_to_symbol(component["svg_code"], symbol_id)
+        except ET.ParseError as e:
+            return {
+                "success": False,
+                "error": f"Cannot parse component '{name}': {str(e)}",
+                "svg_code": ""
+            }
+        sheet.append(symbol)
+
+        manifest[name] = {
+            "id": symbol_id,
+            "component_type": spec.get("component_type"),
+            "variant": spec.get("variant"),
+            "viewBox": symbol.get("viewBox"),
+            "use": f'<use href="#{symbol_id}"/>'
+        }
+
+    with timed("serialize", module="svg_sprites"):
+        svg_code = ET.tostring(sheet, encoding='unicode')
+    content_hash = hashlib.sha1(svg_code.encode('utf-8')).hexdigest()[:16]
+
+    return {
+        "success": True,
+        "svg_code": svg_code,
+        "manifest": manifest,
+        "symbols": len(manifest),
+        "hash": content_hash
+    }
@@ -0,0 +1,361 @@
+"""
+SVG Tiling Module for SVG-MCP.
+
+This module splits very large SVG documents (maps in particular) into tiles
+for a zoom grid, so clients only download the part of the document they show.
+The document is parsed and measured once, element bounding boxes go into a
+grid index, and each tile only carries the elements that intersect it, inside
+their original groups.
+
+Every leaf element and every definition is serialized once and reused by all
+the tiles that include it. Each tile embeds only the definitions (gradients,
+clip paths, symbols, ...) its elements reference, and stylesheets are copied
+into every tile. Scripts, titles and metadata are dropped. Tiles are assembled
+in parallel.
+
+Tiles at zoom level z are squares of side max(width, height) / 2**z in
+document units, laid out from the top-left corner of the document bounds.
+"""
+
+import os
+import re
+import math
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from svg_geometry import (BBox, CONTAINER_TAGS, NON_RENDERED_TAGS, GridIndex, compute_bboxes,
+                          document_bounds, expand, local_name)
+from svg_incremental import NAMESPACE_DECLARATION_PATTERN, _document_prefixes, _tostring
+from svg_metrics import instrumented, timed
+
+SVG_NS = "http://www.w3.org/2000/svg"
+
+# Elements left out of tiles
+DROPPED_TAGS = {"script", "title", "desc", "metadata"}
+
+# Root attributes replaced by each tile's own geometry
+TILE_ROOT_ATTRIBUTES = {"width", "height", "viewBox", "x", "y"}
+
+REFERENCE_PATTERN = re.compile(r'url\(\s*#([^)\s]+)\s*\)|href="#([^"]+)"')
+
+
+def _references(text: str) -> frozenset:
+    return frozenset(a or b for a, b in REFERENCE_PATTERN.findall(text))
+
+
+def _format(value: float) -> str:
+    return format(value, ".10g")
+
+
+class TilePlan:
+    """
+    Serialized form of a document shared by all tiles.
+
+    Nodes are numbered in document order. Containers keep their start and end
+    tags; leaves keep their whole serialized markup. Rendered elements with an
+    id map to the range of nodes they span, so a tile that references one (a
+    <use>, say) can include it. The plan holds only strings and numbers, so it
+    is cheap to send to worker processes.
+    """
+
+    def __init__(self, prefixes: Optional[Dict[str, str]] = None):
+        self.prefixes = prefixes or {}
+        self.markup: List[str] = []
+        self.end_tags: List[str] = []
+        self.parents: List[int] = []
+        self.references: List[frozenset] = []
+        self.definitions: Dict[str, Tuple[str, frozenset]] = {}
+        self.anonymous_definitions: List[str] = []
+        self.targets: Dict[str, Tuple[int, int]] = {}
+        self.styles: List[str] = []
+        self.namespaces: Dict[str, str] = {"": SVG_NS}
+        self.root_start: str = "<svg"
+
+    def _serialize(self, elem: ET.Element) -> str:
+        """Serialize an element without its tail, moving its namespace declarations to the tile root."""
+        tail, elem.tail = elem.tail, None
+        try:
+            text = _tostring(elem, self.prefixes)
+        finally:
+            elem.tail = tail
+        first_tag_end = text.index(">")
+
+        def strip_declaration(match):
+            self.namespaces[match.group(1) or ""] = match.group(2)
+            return ""
+
+        return NAMESPACE_DECLARATION_PATTERN.sub(strip_declaration, text[:first_tag_end]) + text[first_tag_end:]
+
+    def _start_tag(self, elem: ET.Element, excluded: frozenset = frozenset()) -> str:
+        attributes = {k: v for k, v in elem.attrib.items() if k not in excluded}
+        text = self._serialize(ET.Element(elem.tag, attributes))
+        return text[:text.rindex("/")].rstrip()
+
+    def add_definitions(self, elem: ET.Element) -> None:
+        tag = local_name(elem.tag)
+        if tag == "defs":
+            for child in elem:
+                if local_name(child.tag):
+                    self.add_definitions(child)
+        elif tag == "style":
+            self.styles.append(self._serialize(elem))
+        elif tag not in DROPPED_TAGS:
+            markup = self._serialize(elem)
+            if elem.get("id"):
+                self.definitions[elem.get("id")] = (markup, _references(markup))
+            else:
+                self.anonymous_definitions.append(markup)
+
+    def add_node(self, markup: str, end_tag: str, parent: int) -> int:
+        self.markup.append(markup)
+        self.end_tags.append(end_tag)
+        self.parents.append(parent)
+        self.references.append(_references(markup))
+        return len(self.markup) - 1
+
+
+def build_tile_plan(root: ET.Element, boxes: Dict[ET.Element, BBox],
+                    root_excluded: frozenset = frozenset(TILE_ROOT_ATTRIBUTES),
+                    prefixes: Optional[Dict[str, str]] = None
+                    ) -> Tuple[TilePlan, List[Tuple[int, Optional[BBox], ET.Element]]]:
+    """
+    Serialize a document for tiling.
+
+    Args:
+        root: Root element of the parsed SVG
+        boxes: Bounding boxes from compute_bboxes
+        root_excluded: Root attributes left out of the plan's root start tag
+        prefixes: Namespace prefixes of the document, by URI (from
+            svg_incremental._document_prefixes)
+
+    Returns:
+        The plan and the (node, bounding box, element) triples of its leaves;
+        leaves without a box are shown on every tile
+    """
+    plan = TilePlan(prefixes)
+    plan.root_start = plan._start_tag(root, root_excluded)
+    leaves: List[Tuple[int, Optional[BBox], ET.Element]] = []
+
+    def add(elem: ET.Element, parent: int) -> None:
+        tag = local_name(elem.tag)
+        if not tag or tag in DROPPED_TAGS:
+            return
+        if tag in NON_RENDERED_TAGS:
+            plan.add_definitions(elem)
+            return
+        if tag in CONTAINER_TAGS and len(elem):
+            start_tag = plan._start_tag(elem) + ">"
+            node = plan.add_node(start_tag, f"</{start_tag[1:].split(None, 1)[0].rstrip('>')}>", parent)
+            for child in elem:
+                add(child, node)
+        else:
+            node = plan.add_node(plan._serialize(elem), "", parent)
+            leaves.append((node, boxes.get(elem), elem))
+        if elem.get("id") and elem.get("id") not in plan.definitions:
+            plan.targets[elem.get("id")] = (node, len(plan.markup))
+
+    for child in root:
+        add(child, -1)
+    return plan, leaves
+
+
+def assemble_svg(plan: TilePlan, nodes: Sequence[int], root_attributes: str = "",
+                 markup: Optional[Dict[int, str]] = None) -> str:
+    """
+    Assemble a document from a plan with some of its leaves.
+
+    Args:
+        plan: The serialized document
+        nodes: Leaves to include (their ancestors are included too)
+        root_attributes: Markup added to the root start tag
+        markup: Replacement markup for some of the leaves
+
+    Returns:
+        The SVG code, with the definitions the leaves reference and the styles;
+        rendered elements the leaves reference are included as well
+    """
+    markup = markup or {}
+
+    # Keep the selected leaves and their ancestors, in document order
+    children: Dict[int, List[int]] = {}
+    included = set()
+    pending: List[str] = []
+
+    def include(node: int) -> None:
+        while node != -1 and node not in included:
+            included.add(node)
+            pending.extend(plan.references[node])
+            parent = plan.parents[node]
+            children.setdefault(parent, []).append(node)
+            node = parent
+
+    for node in nodes:
+        include(node)
+
+    # Definitions and rendered elements referenced by the tile, directly or
+    # through other references
+    needed = set()
+    while pending:
+        ref = pending.pop()
+        if ref in needed:
+            continue
+        if ref in plan.definitions:
+            needed.add(ref)
+            pending.extend(plan.definitions[ref][1])
+        elif ref in plan.targets:
+            needed.add(ref)
+            for node in range(*plan.targets[ref]):
+                include(node)
+
+    declarations = "".join(f' xmlns{":" + prefix if prefix else ""}="{uri}"'
+                           for prefix, uri in sorted(plan.namespaces.items()))
+    parts = [f'{plan.root_start}{declarations}{root_attributes}>']
+    parts.extend(plan.styles)
+    definitions = plan.anonymous_definitions + [markup for ref, (markup, _) in plan.definitions.items()
+                                                if ref in needed]
+    if definitions:
+        parts.append("<defs>")
+        parts.extend(definitions)
+        parts.append("</defs>")
+
+    def emit(parent: int) -> None:
+        for node in sorted(children.get(parent, ())):
+            parts.append(markup.get(node, plan.markup[node]))
+            emit(node)
+            parts.append(plan.end_tags[node])
+
+    emit(-1)
+    parts.append(f"</{plan.root_start[1:].split(None, 1)[0]}>")
+    return "".join(parts)
+
+
+def _render_tile(args: Tuple[TilePlan, Dict[str, Any]]) -> Dict[str, Any]:
+    """Assemble one tile from the plan (a top-level function so process pools can pickle it)."""
+    plan, tile = args
+    x, y, width, height = tile["view_box"]
+    svg_code = assemble_svg(plan, tile["nodes"], f' viewBox="{_format(x)} {_format(y)} {_format(width)} '
+                                                 f'{_format(height)}" width="{tile["tile_size"]}" '
+                                                 f'height="{tile["tile_size"]}"')
+
+    result = {
+        "zoom": tile["zoom"],
+        "column": tile["column"],
+        "row": tile["row"],
+        "view_box": list(tile["view_box"]),
+        "elements": len(tile["nodes"]),
+        "size_bytes": len(svg_code.encode('utf-8'))
+    }
+    if tile["path"]:
+        os.makedirs(os.path.dirname(tile["path"]), exist_ok=True)
+        with open(tile["path"], "w", encoding="utf-8") as f:
+            f.write(svg_code)
+        result["path"] = tile["path"]
+    else:
+        result["svg_code"] = svg_code
+    return result
+
+
+@instrumented
+def tile_svg(svg_code: str, zoom_levels: Sequence[int] = (0, 1, 2), tile_size: int = 256,
+             margin: float = 0.0, output_dir: Optional[str] = None, skip_empty: bool = True,
+             workers: Optional[int] = None, use_processes: bool = False) -> Dict[str, Any]:
+    """
+    Split an SVG document into tiles for a zoom grid.
+
+    Args:
+        svg_code: The SVG code to tile
+        zoom_levels: Zoom levels to generate (level z has 2**z tiles across
+            the longer side of the document)
+        tile_size: Width and height of each tile in pixels
+        margin: Extra distance (in document units) around each tile within
+            which elements are still included
+        output_dir: Write tiles to '<output_dir>/<zoom>/<column>/<row>.svg'
+            instead of returning their SVG code
+        skip_empty: Leave out tiles with no elements
+        workers: Number of parallel workers (defaults to the CPU count)
+        use_processes: Use a process pool instead of threads
+
+    Returns:
+        Dictionary containing the tiles and statistics
+    """
+    if not zoom_levels or any(zoom < 0 for zoom in zoom_levels):
+        return {"success": False, "error": "Zoom levels must be non-negative integers"}
+
+    start = time.perf_counter()
+    try:
+        prefixes = _document_prefixes(svg_code)
+        with timed("parse", module="svg_tiling"):
+            root = ET.fromstring(svg_code)
+    except ET.ParseError as e:
+        return {"success": False, "error": f"Error parsing SVG: {str(e)}"}
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    boxes = compute_bboxes(root, include_stroke=True)
+    bounds = document_bounds(root) or boxes.get(root)
+    if bounds is None or bounds[2] <= bounds[0] or bounds[3] <= bounds[1]:
+        return {"success": False, "error": "Cannot determine the document bounds (no viewBox, size or geometry)"}
+
+    plan, leaves = build_tile_plan(root, boxes, prefixes=prefixes)
+    side = max(bounds[2] - bounds[0], bounds[3] - bounds[1])
+    index = GridIndex(side / 2 ** max(zoom_levels))
+    unbounded = []
+    for node, box, _ in leaves:
+        if box is None:
+            unbounded.append(node)
+        else:
+            index.insert(node, box)
+    index_ms = (time.perf_counter() - start) * 1000
+
+    tiles, skipped = [], 0
+    for zoom in zoom_levels:
+        tile_side = side / 2 ** zoom
+        columns = max(1, math.ceil((bounds[2] - bounds[0]) / tile_side - 1e-9))
+        rows = max(1, math.ceil((bounds[3] - bounds[1]) / tile_side - 1e-9))
+        for column in range(columns):
+            for row in range(rows):
+                x, y = bounds[0] + column * tile_side, bounds[1] + row * tile_side
+                nodes = index.query(expand((x, y, x + tile_side, y + tile_side), margin))
+                if not nodes and skip_empty:
+                    skipped += 1
+                    continue
+                tiles.append({
+                    "zoom": zoom,
+                    "column": column,
+                    "row": row,
+                    "view_box": (x, y, tile_side, tile_side),
+                    "tile_size": tile_size,
+                    "nodes": sorted(nodes + unbounded),
+                    "path": os.path.join(output_dir, str(zoom), str(column), f"{row}.svg") if output_dir else None
+                })
+
+    start = time.perf_counter()
+    jobs = [(plan, tile) for tile in tiles]
+    if len(jobs) <= 1 or workers == 1:
+        results = [_render_tile(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(_render_tile, jobs, chunksize=chunksize))
+    render_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "success": True,
+        "bounds": list(bounds),
+        "tiles": results,
+        "stats": {
+            "original_size_bytes": len(svg_code.encode('utf-8')),
+            "tiles": len(results),
+            "tiles_skipped_empty": skipped,
+            "tile_size_bytes": sum(r["size_bytes"] for r in results),
+            "elements_indexed": len(index),
+            "elements_on_every_tile": len(unbounded),
+            "shared_definitions": len(plan.definitions) + len(plan.anonymous_definitions),
+            "parse_ms": round(parse_ms, 3),
+            "index_ms": round(index_ms, 3),
+            "render_ms": round(render_ms, 3)
+        }
+    }